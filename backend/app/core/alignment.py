@@ -0,0 +1,159 @@
+import os
+import unicodedata
+from collections import deque
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from .html_text import html_to_plain_text_with_offsets
+
+load_dotenv()
+
+# 모델이 원문을 조금 바꿔 적었을 때 받아들일 최소 유사도와, 퍼지 검색을 시도할 원문의 최대 길이
+ALIGN_FUZZY_MIN_RATIO = float(os.getenv("ALIGN_FUZZY_MIN_RATIO", "0.8"))
+ALIGN_FUZZY_MAX_CHARS = int(os.getenv("ALIGN_FUZZY_MAX_CHARS", "300"))
+# 창의 양 끝을 움직여 볼 최대 글자 수 (후보 수는 이 값의 제곱에 비례)
+ALIGN_FUZZY_SLACK = int(os.getenv("ALIGN_FUZZY_SLACK", "8"))
+
+def _compact(text: str) -> str:
+    # 공백 차이(띄어쓰기, 줄바꿈)는 무시하고 비교한다
+    return "".join(unicodedata.normalize("NFC", text).split())
+
+class AhoCorasick:
+    # 여러 원문을 본문 한 번 훑기로 모두 찾는다
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        for index, pattern in enumerate(patterns):
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = nxt
+            self.output[node].append(index)
+        self.lengths = [len(p) for p in patterns]
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fail = self.fail[node]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find_all(self, text: str) -> Dict[int, List[int]]:
+        # 패턴 번호 -> 등장한 시작 위치 목록 (앞에서부터)
+        found: Dict[int, List[int]] = {}
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for index in self.output[node]:
+                found.setdefault(index, []).append(i - self.lengths[index] + 1)
+        return found
+
+class SpanAligner:
+    # 에세이 HTML 하나에 대해 첨삭 원문이 plain text와 HTML의 어디에 있는지 찾는다.
+    # 같은 표현이 여러 번 나오면 아직 다른 첨삭이 차지하지 않은 가장 앞의 것을 고른다.
+    def __init__(self, html: str):
+        self.plain_text, self._html_starts, self._html_ends = html_to_plain_text_with_offsets(html)
+        # 공백을 뺀 본문과, 그 글자가 plain text의 몇 번째 글자인지
+        self._compact_index = [i for i, ch in enumerate(self.plain_text) if not ch.isspace()]
+        self._compact = unicodedata.normalize("NFC", "".join(self.plain_text[i] for i in self._compact_index))
+        if len(self._compact) != len(self._compact_index):
+            # NFC로 길이가 바뀌는 본문(자모 분리 입력 등)은 정규화하지 않고 그대로 비교한다
+            self._compact = "".join(self.plain_text[i] for i in self._compact_index)
+        self._taken: List[Tuple[int, int]] = []
+
+    def _is_free(self, start: int, end: int) -> bool:
+        return all(end <= s or start >= e for s, e in self._taken)
+
+    def _span(self, compact_start: int, compact_end: int, match: str) -> dict:
+        start = self._compact_index[compact_start]
+        end = self._compact_index[compact_end - 1] + 1
+        self._taken.append((compact_start, compact_end))
+        return {
+            "start": start,
+            "end": end,
+            "html_start": self._html_starts[start],
+            "html_end": self._html_ends[end - 1],
+            "match": match,
+        }
+
+    def _pick(self, positions: List[int], length: int) -> Optional[dict]:
+        for position in positions:
+            if self._is_free(position, position + length):
+                return self._span(position, position + length, "exact")
+        if positions:
+            # 모두 겹치면 첫 번째 위치를 그대로 쓴다 (같은 곳을 두 번 고친 경우)
+            return self._span(positions[0], positions[0] + length, "exact")
+        return None
+
+    def _fuzzy(self, pattern: str) -> Optional[dict]:
+        if not pattern or len(pattern) > ALIGN_FUZZY_MAX_CHARS or not self._compact:
+            return None
+        matcher = SequenceMatcher(None, self._compact, pattern, autojunk=False)
+        anchor = matcher.find_longest_match(0, len(self._compact), 0, len(pattern))
+        if anchor.size == 0:
+            return None
+        # 가장 긴 공통 조각을 기준으로 원문 길이만큼의 창을 잡고, 양 끝을 조금씩 움직여 가장 비슷한 구간을 고른다
+        guess = anchor.a - anchor.b
+        slack = max(2, min(len(pattern) // 5, ALIGN_FUZZY_SLACK))
+        best_ratio, best = 0.0, None
+        scorer = SequenceMatcher(None, "", pattern, autojunk=False)
+        for start in range(max(0, guess - slack), min(len(self._compact), guess + slack) + 1):
+            for end in range(start + max(1, len(pattern) - slack), min(len(self._compact), start + len(pattern) + slack) + 1):
+                scorer.set_seq1(self._compact[start:end])
+                if scorer.real_quick_ratio() <= best_ratio or scorer.quick_ratio() <= best_ratio:
+                    continue
+                ratio = scorer.ratio()
+                if ratio > best_ratio:
+                    best_ratio, best = ratio, (start, end)
+        if best is None or best_ratio < ALIGN_FUZZY_MIN_RATIO:
+            return None
+        return self._span(best[0], best[1], "fuzzy")
+
+    def align(self, original_text: str) -> Optional[dict]:
+        # 스트리밍처럼 첨삭이 하나씩 들어올 때 쓴다
+        pattern = _compact(original_text)
+        if not pattern:
+            return None
+        positions = []
+        position = self._compact.find(pattern)
+        while position != -1:
+            positions.append(position)
+            position = self._compact.find(pattern, position + 1)
+        return self._pick(positions, len(pattern)) or self._fuzzy(pattern)
+
+    def align_all(self, original_texts: List[str]) -> List[Optional[dict]]:
+        patterns = [_compact(text) for text in original_texts]
+        found = AhoCorasick(patterns).find_all(self._compact)
+        spans: List[Optional[dict]] = [None] * len(patterns)
+        # 정확히 찾은 것부터 자리를 잡고, 퍼지 매칭은 남은 자리에서 한다
+        for index, pattern in enumerate(patterns):
+            if pattern:
+                spans[index] = self._pick(found.get(index, []), len(pattern))
+        for index, pattern in enumerate(patterns):
+            if spans[index] is None:
+                spans[index] = self._fuzzy(pattern)
+        return spans
+
+def with_span(correction, span: Optional[dict]):
+    # 위치를 못 찾으면 위치 필드를 비워 둔다 (클라이언트가 직접 찾아야 함)
+    return correction.model_copy(update=span or {"start": None, "end": None, "html_start": None, "html_end": None, "match": None})
+
+def align_corrections(html: str, corrections: list) -> list:
+    aligner = SpanAligner(html)
+    spans = aligner.align_all([c.original_text for c in corrections])
+    return [with_span(c, span) for c, span in zip(corrections, spans)]
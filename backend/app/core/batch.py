@@ -0,0 +1,453 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from postgrest.exceptions import APIError
+from .openai_client import OPENAI_MODEL, build_messages, create_chat_completion, get_client, parse_correction_item, run_precheck
+from .rate_limit import BULK, request_class
+from .alignment import align_corrections
+from .chunking import merge_corrections
+from .text_stats import essay_plain_text
+from . import correction_cache
+from .http_cache import forget_etag
+from ..repositories import essays as essays_repo
+from ..repositories import correction_sessions as sessions_repo
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# openai: OpenAI Batch API (24시간 안에 처리, 비용 절반)
+# local: 입력 파일을 이 프로세스에서 직접 처리하는 대체 구현 (오프라인 테스트용)
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "openai")
+# 실행 상태(state.json), 입력/결과 파일을 두는 곳. 재시작 후 이어서 진행할 수 있도록 영구 디스크에 둔다
+BATCH_DIR = os.getenv("BATCH_DIR", "batch_runs")
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+# 에세이를 읽고 세션을 넣을 때 한 번에 처리할 행 수
+BATCH_PAGE_SIZE = int(os.getenv("BATCH_PAGE_SIZE", "200"))
+BATCH_INSERT_SIZE = int(os.getenv("BATCH_INSERT_SIZE", "100"))
+# 결과를 넣을 때 동시에 부르는 세션 저장 RPC 수
+BATCH_INSERT_CONCURRENCY = int(os.getenv("BATCH_INSERT_CONCURRENCY", "10"))
+BATCH_LOCAL_CONCURRENCY = int(os.getenv("BATCH_LOCAL_CONCURRENCY", "4"))
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# 실행 상태: building -> submitted -> ingesting -> completed (중간에 실패하면 failed)
+BUILDING = "building"
+SUBMITTED = "submitted"
+INGESTING = "ingesting"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class BatchError(Exception):
+    pass
+
+def _read_jsonl(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _parse_jsonl(text: str) -> List[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+class OpenAIBatchBackend:
+    name = "openai"
+
+    async def submit(self, input_path: str, run_id: str) -> str:
+        client = get_client()
+        with open(input_path, "rb") as f:
+            uploaded = await client.files.create(file=f, purpose="batch")
+        batch = await client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+            metadata={"run_id": run_id},
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> dict:
+        batch = await get_client().batches.retrieve(batch_id)
+        counts = batch.request_counts
+        progress = {
+            "total": counts.total if counts else 0,
+            "completed": counts.completed if counts else 0,
+            "failed": counts.failed if counts else 0,
+        }
+        # expired여도 그때까지 끝난 요청의 결과는 받을 수 있다
+        if batch.status in ("completed", "expired"):
+            return {"status": COMPLETED, **progress}
+        if batch.status in ("failed", "cancelling", "cancelled"):
+            return {"status": FAILED, "error": f"batch {batch.status}", **progress}
+        return {"status": SUBMITTED, **progress}
+
+    async def results(self, batch_id: str) -> List[dict]:
+        client = get_client()
+        batch = await client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await client.files.content(file_id)
+                lines.extend(_parse_jsonl(content.text))
+        return lines
+
+class LocalBatchBackend:
+    # 입력 파일의 요청을 지금 설정된 모델 클라이언트로 하나씩 처리해 OpenAI Batch와 같은 형식의 결과 파일을 만든다.
+    # OPENAI_BASE_URL을 가짜 서버로 돌리면 네트워크 없이 전체 흐름을 시험할 수 있다.
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.join(root, "local")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, batch_id: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{batch_id}.{suffix}.jsonl")
+
+    async def submit(self, input_path: str, run_id: str) -> str:
+        batch_id = f"local_{uuid.uuid4().hex}"
+        shutil.copyfile(input_path, self._path(batch_id, "input"))
+        return batch_id
+
+    async def poll(self, batch_id: str) -> dict:
+        # 결과 파일에 이미 있는 요청은 건너뛰므로 중간에 멈춰도 이어서 처리한다
+        requests = _read_jsonl(self._path(batch_id, "input"))
+        output_path = self._path(batch_id, "output")
+        done = {line["custom_id"] for line in _read_jsonl(output_path)}
+        semaphore = asyncio.Semaphore(BATCH_LOCAL_CONCURRENCY)
+        write_lock = asyncio.Lock()
+
+        async def run(request: dict) -> None:
+            async with semaphore:
+                try:
+                    response = await create_chat_completion(**request["body"])
+                    line = {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": response.model_dump()}, "error": None}
+                except Exception as e:
+                    line = {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+            async with write_lock:
+                with open(output_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        with request_class(BULK, may_reject=False):
+            await asyncio.gather(*(run(r) for r in requests if r["custom_id"] not in done))
+        lines = _read_jsonl(output_path)
+        return {
+            "status": COMPLETED,
+            "total": len(requests),
+            "completed": sum(1 for line in lines if line["error"] is None),
+            "failed": sum(1 for line in lines if line["error"] is not None),
+        }
+
+    async def results(self, batch_id: str) -> List[dict]:
+        return _read_jsonl(self._path(batch_id, "output"))
+
+def create_backend(name: str = BATCH_BACKEND, root: str = BATCH_DIR):
+    if name == "openai":
+        return OpenAIBatchBackend()
+    if name == "local":
+        return LocalBatchBackend(root)
+    raise ValueError(f"Unknown BATCH_BACKEND: {name}")
+
+def _run_dir(run_id: str, root: str = BATCH_DIR) -> str:
+    return os.path.join(root, run_id)
+
+def load_state(run_id: str, root: str = BATCH_DIR) -> Optional[dict]:
+    path = os.path.join(_run_dir(run_id, root), "state.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state: dict, root: str = BATCH_DIR) -> None:
+    # 임시 파일에 쓴 뒤 바꿔 끼워서 중간에 죽어도 state.json이 깨지지 않게 한다
+    state["updated_at"] = time.time()
+    path = os.path.join(_run_dir(state["id"], root), "state.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def list_states(root: str = BATCH_DIR) -> List[dict]:
+    if not os.path.isdir(root):
+        return []
+    states = [load_state(name, root) for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))]
+    return sorted((s for s in states if s), key=lambda s: s["created_at"], reverse=True)
+
+def summarize(state: dict) -> dict:
+    # 응답용: 처리한 에세이 id 목록 대신 개수만 보여준다
+    summary = {k: v for k, v in state.items() if k not in ("ingested", "failed")}
+    summary["ingested"] = len(state["ingested"])
+    summary["failed"] = len(state["failed"])
+    summary["failures"] = dict(list(state["failed"].items())[:20])
+    return summary
+
+class BatchRun:
+    # 한 주제의 제출된 에세이 전체를 일괄 첨삭하는 실행 하나.
+    # 모든 단계는 state.json을 보고 이어서 할 수 있도록 멱등하게 만든다.
+    def __init__(self, state: dict, root: str = BATCH_DIR):
+        self.state = state
+        self.root = root
+        self.dir = _run_dir(state["id"], root)
+        self.backend = create_backend(state["backend"], root)
+
+    @classmethod
+    def create(cls, topic_id: str, root: str = BATCH_DIR, backend: str = BATCH_BACKEND) -> "BatchRun":
+        now = time.time()
+        state = {
+            "id": uuid.uuid4().hex,
+            "topic_id": topic_id,
+            "backend": backend,
+            "model": OPENAI_MODEL,
+            "status": BUILDING,
+            "batch_id": None,
+            "total": 0,
+            "progress": {},
+            "ingested": [],
+            "failed": {},
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        os.makedirs(_run_dir(state["id"], root), exist_ok=True)
+        save_state(state, root)
+        return cls(state, root)
+
+    @classmethod
+    def load(cls, run_id: str, root: str = BATCH_DIR) -> Optional["BatchRun"]:
+        state = load_state(run_id, root)
+        return cls(state, root) if state else None
+
+    @property
+    def finished(self) -> bool:
+        return self.state["status"] in (COMPLETED, FAILED)
+
+    def _save(self) -> None:
+        save_state(self.state, self.root)
+
+    def clear_error(self) -> None:
+        # 멈춘 실행을 다시 지켜보게 할 때 지난 오류를 지운다
+        self.state["error"] = None
+        self._save()
+
+    async def build(self) -> None:
+        # 제출된 에세이를 id 순서로 읽어 요청 파일(input.jsonl)과 본문 스냅숏(essays.jsonl)을 만든다
+        input_path = os.path.join(self.dir, "input.jsonl")
+        essays_path = os.path.join(self.dir, "essays.jsonl")
+        total = 0
+        after_id = None
+        with open(input_path, "w", encoding="utf-8") as requests_file, open(essays_path, "w", encoding="utf-8") as essays_file:
+            while True:
+                essays = await essays_repo.list_submitted_essays(self.state["topic_id"], after_id, BATCH_PAGE_SIZE)
+                if not essays:
+                    break
+                after_id = essays[-1]["id"]
+                numbers = self._session_numbers(await sessions_repo.list_sessions_for([e["id"] for e in essays]))
+                for essay in essays:
+                    # 이미 3회 첨삭한 에세이는 넣지 않는다
+                    if len(numbers.get(essay["id"], [])) >= 3:
+                        self.state["failed"][essay["id"]] = "최대 3회까지만 첨삭 가능합니다."
+                        continue
+                    clean_text = essay_plain_text(essay)
+                    request = {
+                        "custom_id": essay["id"],
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": {
+                            "model": OPENAI_MODEL,
+                            "messages": build_messages(clean_text, run_precheck(clean_text)),
+                            "response_format": {"type": "json_object"},
+                        },
+                    }
+                    requests_file.write(json.dumps(request, ensure_ascii=False) + "\n")
+                    essays_file.write(json.dumps({"id": essay["id"], "plain_text": clean_text}, ensure_ascii=False) + "\n")
+                    total += 1
+                if len(essays) < BATCH_PAGE_SIZE:
+                    break
+        self.state["total"] = total
+
+    async def submit(self) -> None:
+        if self.state["total"] == 0:
+            self.state["status"] = COMPLETED
+            return
+        self.state["batch_id"] = await self.backend.submit(os.path.join(self.dir, "input.jsonl"), self.state["id"])
+        self.state["status"] = SUBMITTED
+
+    async def poll(self) -> None:
+        progress = await self.backend.poll(self.state["batch_id"])
+        self.state["progress"] = {k: v for k, v in progress.items() if k != "status"}
+        if progress["status"] == FAILED:
+            self.state["status"] = FAILED
+            self.state["error"] = progress.get("error")
+        elif progress["status"] == COMPLETED:
+            self.state["status"] = INGESTING
+
+    @staticmethod
+    def _session_numbers(sessions: List[dict]) -> Dict[str, List[int]]:
+        numbers: Dict[str, List[int]] = {}
+        for session in sessions:
+            numbers.setdefault(session["essay_id"], []).append(session["session_number"])
+        return numbers
+
+    def _parse_result(self, line: dict) -> dict:
+        if line.get("error"):
+            raise BatchError(line["error"].get("message") or str(line["error"]))
+        response = line.get("response") or {}
+        if response.get("status_code") != 200:
+            raise BatchError(f"status {response.get('status_code')}")
+        content = response["body"]["choices"][0]["message"]["content"]
+        data = json.loads(content)
+        return {
+            "corrections": [parse_correction_item(c) for c in data.get("corrections", [])],
+            "overall_feedback": data.get("overall_feedback", ""),
+        }
+
+    async def ingest(self) -> None:
+        # 결과를 BATCH_INSERT_SIZE개씩 묶어 correction_sessions에 넣는다.
+        # 묶음마다 state.json에 처리한 id를 남기고, 이미 이 실행으로 들어간 세션은 다시 넣지 않는다.
+        snapshots = {e["id"]: e["plain_text"] for e in _read_jsonl(os.path.join(self.dir, "essays.jsonl"))}
+        done = set(self.state["ingested"]) | set(self.state["failed"])
+        results = {}
+        for line in await self.backend.results(self.state["batch_id"]):
+            essay_id = line["custom_id"]
+            if essay_id in done:
+                continue
+            try:
+                result = self._parse_result(line)
+                # 요청 때 프롬프트에 넘긴 규칙 검사 결과를 모델 첨삭 앞에 붙인다
+                found = run_precheck(snapshots.get(essay_id, ""))
+                result["corrections"] = merge_corrections([found, result["corrections"]])
+                results[essay_id] = result
+            except Exception as e:
+                self.state["failed"][essay_id] = str(e)
+        pending = list(results)
+        for i in range(0, len(pending), BATCH_INSERT_SIZE):
+            await self._ingest_chunk(pending[i:i + BATCH_INSERT_SIZE], results, snapshots)
+        # 결과 파일에 아예 없는 요청도 실패로 남긴다
+        missing = set(snapshots) - set(self.state["ingested"]) - set(self.state["failed"])
+        for essay_id in missing:
+            self.state["failed"][essay_id] = "no result"
+        self.state["status"] = COMPLETED
+
+    async def _ingest_chunk(self, essay_ids: List[str], results: dict, snapshots: dict) -> None:
+        essays = {e["id"]: e for e in await essays_repo.get_essays_by_ids(essay_ids)}
+        sessions = await sessions_repo.list_sessions_for(essay_ids)
+        already = {s["essay_id"] for s in sessions if (s.get("metadata") or {}).get("batch_run_id") == self.state["id"]}
+        semaphore = asyncio.Semaphore(BATCH_INSERT_CONCURRENCY)
+
+        async def save(essay_id: str) -> None:
+            essay = essays.get(essay_id)
+            if essay is None:
+                self.state["failed"][essay_id] = "Essay not found"
+                return
+            result = results[essay_id]
+            snapshot = snapshots.get(essay_id) or essay_plain_text(essay)
+            corrections = await asyncio.to_thread(align_corrections, essay["content"], result["corrections"])
+            # 회차 번호는 학생 요청과 같은 RPC가 에세이 행을 잠그고 고른다.
+            # 그 사이 학생이 회차를 채웠으면 이 에세이만 실패로 남기고 나머지는 계속 넣는다
+            async with semaphore:
+                try:
+                    await sessions_repo.create_session(
+                        essay_id=essay_id,
+                        corrections=[c.model_copy(update={"essay_id": essay_id}).model_dump(mode="json") for c in corrections],
+                        overall_feedback=result["overall_feedback"],
+                        content_snapshot=snapshot,
+                        metadata={"mode": "batch", "batch_run_id": self.state["id"]},
+                    )
+                except APIError as e:
+                    if e.code not in ("P0001", "P0002"):
+                        raise
+                    self.state["failed"][essay_id] = e.message if e.code == "P0001" else "Essay not found"
+                    return
+            # 나중에 학생이 같은 글로 첨삭을 요청하면 모델을 다시 부르지 않도록 캐시에도 넣는다
+            await correction_cache.store(snapshot, result)
+            await forget_etag(f"sessions:{essay_id}")
+
+        await asyncio.gather(*(save(essay_id) for essay_id in essay_ids if essay_id not in already))
+        self.state["ingested"].extend(essay_id for essay_id in essay_ids if essay_id not in self.state["failed"])
+        self._save()
+
+    async def prepare(self) -> dict:
+        # 요청 파일을 만들어 제출하는 데까지만 한다 (결과 대기는 BatchRunner가 맡는다)
+        try:
+            if self.state["status"] == BUILDING:
+                await self.build()
+                self._save()
+                await self.submit()
+                self._save()
+        except Exception as e:
+            logger.exception("Error preparing batch run %s", self.state["id"])
+            self.state["error"] = str(e)
+            self._save()
+            raise
+        return self.state
+
+    async def advance(self) -> dict:
+        # 현재 상태에서 할 수 있는 만큼 진행한다 (제출 결과가 아직 없으면 그대로 돌아온다)
+        await self.prepare()
+        try:
+            if self.state["status"] == SUBMITTED:
+                await self.poll()
+                self._save()
+            if self.state["status"] == INGESTING:
+                await self.ingest()
+                self._save()
+        except Exception as e:
+            logger.exception("Error advancing batch run %s", self.state["id"])
+            self.state["error"] = str(e)
+            self._save()
+            raise
+        return self.state
+
+class BatchRunner:
+    # 실행마다 끝날 때까지 주기적으로 advance를 부르는 task를 띄운다.
+    # 서버가 다시 뜨면 끝나지 않은 실행을 이어서 본다. 여러 워커 프로세스 중 하나만 맡도록 파일 락을 건다.
+    def __init__(self, root: str = BATCH_DIR, poll_interval: float = BATCH_POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        for state in list_states(self.root):
+            if state["status"] not in (COMPLETED, FAILED):
+                self.watch(state["id"])
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def watch(self, run_id: str) -> None:
+        task = self._tasks.get(run_id)
+        if task is None or task.done():
+            self._tasks[run_id] = asyncio.create_task(self._watch(run_id))
+
+    async def _watch(self, run_id: str) -> None:
+        fd = os.open(os.path.join(_run_dir(run_id, self.root), "run.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # 다른 워커가 이미 보고 있다
+                return
+            while True:
+                run = BatchRun.load(run_id, self.root)
+                if run is None or run.finished:
+                    return
+                try:
+                    await run.advance()
+                except Exception as e:
+                    # 다음 주기에 다시 시도한다. 오류는 상태에 남겨 어드민 조회에서 보이게 한다
+                    logger.warning("Batch run %s failed to advance, retrying in %ss: %s", run_id, self.poll_interval, e)
+                    run.state["error"] = str(e)
+                    run._save()
+                if run.finished:
+                    return
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            os.close(fd)
+
+batch_runner = BatchRunner()
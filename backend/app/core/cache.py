@@ -0,0 +1,157 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from .metrics import CACHE_LOOKUPS
+
+# 백엔드는 모두 같은 비동기 인터페이스(get/set/delete/clear)를 가진다.
+# 값은 JSON으로 직렬화 가능한 dict만 저장한다.
+
+class MemoryCache:
+    # 프로세스 내 LRU + TTL 캐시
+    name = "memory"
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+class SQLiteCache:
+    # 워커 재시작 후에도 유지되는 파일 캐시. 같은 파일을 여러 워커가 공유할 수 있다.
+    name = "sqlite"
+
+    def __init__(self, path: str, ttl: float = 86400):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0])
+
+    def _set(self, key: str, value: dict, ttl: float) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def _delete(self, key: Optional[str]) -> None:
+        with self._lock:
+            if key is None:
+                self._conn.execute("DELETE FROM cache")
+            else:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl or self.ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._delete, None)
+
+class RedisCache:
+    # redis 패키지가 설치된 경우에만 사용 가능 (로컬 Redis 호환 서버 포함)
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float = 86400, prefix: str = "berryessay:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("redis 캐시 백엔드를 쓰려면 redis 패키지를 설치해야 합니다.")
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: dict, ttl: Optional[float] = None) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=int(ttl or self.ttl))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        async for key in self._redis.scan_iter(match=self.prefix + "*"):
+            await self._redis.delete(key)
+
+class CacheStats:
+    # name은 /metrics의 cache 라벨로 쓴다
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        CACHE_LOOKUPS.labels(self.name, "hit" if hit else "miss").inc()
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+def create_cache(backend: str, ttl: float, maxsize: int = 1024, path: str = "", url: str = "", prefix: str = "berryessay:"):
+    if backend == "memory":
+        return MemoryCache(maxsize=maxsize, ttl=ttl)
+    if backend == "sqlite":
+        return SQLiteCache(path, ttl=ttl)
+    if backend == "redis":
+        return RedisCache(url, ttl=ttl, prefix=prefix)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,61 @@
+import re
+from typing import List
+
+# 문장 끝(. ! ? 。 …) 뒤의 공백, 또는 줄바꿈에서 자른다
+_SENTENCE_END = re.compile(r"(?<=[.!?。…])\s+|\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+def split_paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n|\n", text) if p.strip()]
+
+def build_windows(text: str, max_chars: int = 1500, overlap_sentences: int = 1) -> List[str]:
+    # 문단/문장 경계에서 max_chars 이하의 창으로 나누고,
+    # 창 경계의 문장이 잘리지 않도록 앞 창의 마지막 문장을 다음 창에 겹쳐 넣는다
+    sentences = []
+    for paragraph in split_paragraphs(text):
+        sentences.extend(split_sentences(paragraph))
+    if not sentences:
+        return []
+
+    windows = []
+    current: List[str] = []
+    size = 0
+    for sentence in sentences:
+        if current and size + len(sentence) + 1 > max_chars:
+            windows.append(" ".join(current))
+            current = current[-overlap_sentences:] if overlap_sentences else []
+            size = sum(len(s) + 1 for s in current)
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        windows.append(" ".join(current))
+    return windows
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+def merge_corrections(groups: List[list]) -> list:
+    # 겹치는 구간에서 같은 원문을 두 번 고친 경우 먼저 나온 것만 남긴다.
+    # 같은 종류의 첨삭끼리 원문이 포함 관계이면 더 긴 쪽을 남긴다.
+    merged = []
+    for group in groups:
+        for correction in group:
+            original = _normalize(correction.original_text)
+            keep = True
+            for i, kept in enumerate(merged):
+                kept_original = _normalize(kept.original_text)
+                if original == kept_original:
+                    keep = False
+                elif kept.category == correction.category and original in kept_original:
+                    keep = False
+                elif kept.category == correction.category and kept_original in original:
+                    merged[i] = correction
+                    keep = False
+                if not keep:
+                    break
+            if keep:
+                merged.append(correction)
+    return merged
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import unicodedata
+from typing import Optional
+from dotenv import load_dotenv
+from .cache import CacheStats, create_cache
+from .singleflight import SingleFlight
+from .openai_client import CORRECTION_CONFIG, OPENAI_MODEL, PROMPT_VERSION, correct_essay, parse_correction_item
+
+load_dotenv()
+
+# memory | sqlite | redis | none
+CORRECTION_CACHE_BACKEND = os.getenv("CORRECTION_CACHE_BACKEND", "memory")
+CORRECTION_CACHE_TTL = float(os.getenv("CORRECTION_CACHE_TTL", "86400"))
+CORRECTION_CACHE_MAXSIZE = int(os.getenv("CORRECTION_CACHE_MAXSIZE", "512"))
+CORRECTION_CACHE_PATH = os.getenv("CORRECTION_CACHE_PATH", "correction_cache.sqlite3")
+CORRECTION_CACHE_URL = os.getenv("CORRECTION_CACHE_URL", "redis://localhost:6379/0")
+
+_cache = None
+_cache_ready = False
+stats = CacheStats("correction")
+# 캐시에 아직 없는 같은 글이 동시에 들어오면 모델 호출을 한 번으로 합친다
+_model_flight = SingleFlight()
+
+def get_cache():
+    global _cache, _cache_ready
+    if not _cache_ready:
+        _cache = create_cache(
+            CORRECTION_CACHE_BACKEND,
+            ttl=CORRECTION_CACHE_TTL,
+            maxsize=CORRECTION_CACHE_MAXSIZE,
+            path=CORRECTION_CACHE_PATH,
+            url=CORRECTION_CACHE_URL,
+        )
+        _cache_ready = True
+    return _cache
+
+def normalize_text(clean_text: str) -> str:
+    # 유니코드 정규화 + 공백 차이 무시
+    return " ".join(unicodedata.normalize("NFC", clean_text).split())
+
+def cache_key(
+    clean_text: str,
+    model: str = OPENAI_MODEL,
+    prompt_version: str = PROMPT_VERSION,
+    config: str = CORRECTION_CONFIG,
+) -> str:
+    # 같은 글 + 같은 프롬프트 + 같은 모델 + 같은 규칙 검사/창 나누기 설정이면 같은 결과를 재사용한다
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, config, normalize_text(clean_text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _serialize(result: dict) -> dict:
+    return {
+        "corrections": [c.model_dump(mode="json") for c in result["corrections"]],
+        "overall_feedback": result["overall_feedback"],
+    }
+
+def _deserialize(value: dict) -> dict:
+    return {
+        "corrections": [parse_correction_item(c) for c in value["corrections"]],
+        "overall_feedback": value["overall_feedback"],
+    }
+
+async def lookup(clean_text: str) -> Optional[dict]:
+    cache = get_cache()
+    if cache is None:
+        return None
+    value = await cache.get(cache_key(clean_text))
+    stats.record(value is not None)
+    return _deserialize(value) if value is not None else None
+
+async def store(clean_text: str, result: dict) -> None:
+    cache = get_cache()
+    if cache is not None:
+        await cache.set(cache_key(clean_text), _serialize(result))
+
+async def get_correction_cached(clean_text: str) -> dict:
+    # 캐시를 먼저 확인하고, 없을 때만 모델을 호출한다
+    cached = await lookup(clean_text)
+    if cached is not None:
+        return cached
+    return await _model_flight.do(cache_key(clean_text), lambda: _correct_and_store(clean_text))
+
+async def _correct_and_store(clean_text: str) -> dict:
+    result = await correct_essay(clean_text)
+    await store(clean_text, result)
+    return result
+
+def cache_stats() -> dict:
+    cache = get_cache()
+    return {"backend": cache.name if cache else "none", **stats.as_dict()}
@@ -0,0 +1,119 @@
+import re
+from html import unescape
+from typing import List, Tuple
+
+# 에디터(TipTap / Toast UI)가 만드는 HTML은 태그 종류가 적고 중첩이 얕다.
+# 트리를 만들지 않고 태그/텍스트 토큰을 한 번 훑으면서 텍스트만 모은다.
+_TOKEN = re.compile(r"<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*>|<[^>]*>|[^<]+", re.S)
+
+# 문단(줄)이 바뀌는 태그
+BLOCK_TAGS = frozenset({
+    "p", "div", "br", "hr", "li", "ul", "ol", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "table", "tr", "section", "article",
+})
+# 내용까지 통째로 버리는 태그
+SKIP_TAGS = frozenset({"script", "style", "template"})
+
+_BREAK = "\x00"
+
+def html_to_plain_text(html: str) -> str:
+    # 문단 경계는 줄바꿈 하나로 남기고, 문단 안의 공백은 하나로 합친다
+    if not html:
+        return ""
+    parts = []
+    append = parts.append
+    skipping = 0
+    for match in _TOKEN.finditer(html):
+        name = match.group(2)
+        if name is not None:
+            name = name.lower()
+            if name in SKIP_TAGS:
+                skipping = max(0, skipping - 1) if match.group(1) else skipping + 1
+            elif name in BLOCK_TAGS:
+                append(_BREAK)
+            continue
+        token = match.group(0)
+        if token[0] == "<" or skipping:
+            continue
+        append(token)
+    text = unescape("".join(parts))
+    lines = []
+    for segment in text.split(_BREAK):
+        line = " ".join(segment.split())
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+# html.unescape와 같은 규칙으로 엔티티 하나를 잡는다
+_ENTITY = re.compile(r"&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)")
+
+def html_to_plain_text_with_offsets(html: str) -> Tuple[str, List[int], List[int]]:
+    # html_to_plain_text와 같은 텍스트를 만들면서, 텍스트의 i번째 글자가
+    # HTML의 [starts[i], ends[i]) 구간에서 왔는지 함께 돌려준다
+    chars: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    skipping = 0
+    for match in _TOKEN.finditer(html or ""):
+        name = match.group(2)
+        if name is not None:
+            name = name.lower()
+            if name in SKIP_TAGS:
+                skipping = max(0, skipping - 1) if match.group(1) else skipping + 1
+            elif name in BLOCK_TAGS:
+                chars.append(_BREAK)
+                starts.append(match.start())
+                ends.append(match.start())
+            continue
+        token = match.group(0)
+        if token[0] == "<" or skipping:
+            continue
+        base = match.start()
+        pos = 0
+        for entity in _ENTITY.finditer(token):
+            for i in range(pos, entity.start()):
+                chars.append(token[i])
+                starts.append(base + i)
+                ends.append(base + i + 1)
+            # 엔티티에서 나온 글자는 모두 엔티티 전체 구간을 가리킨다
+            for ch in unescape(entity.group(0)):
+                chars.append(ch)
+                starts.append(base + entity.start())
+                ends.append(base + entity.end())
+            pos = entity.end()
+        for i in range(pos, len(token)):
+            chars.append(token[i])
+            starts.append(base + i)
+            ends.append(base + i + 1)
+
+    text: List[str] = []
+    text_starts: List[int] = []
+    text_ends: List[int] = []
+    line_start = 0
+    pending_space = False
+    for ch, start, end in zip(chars, starts, ends):
+        if ch == _BREAK:
+            pending_space = False
+            if len(text) > line_start:
+                # 줄바꿈은 앞 줄의 마지막 글자 바로 뒤를 가리킨다
+                text.append("\n")
+                text_starts.append(text_ends[-1])
+                text_ends.append(text_ends[-1])
+                line_start = len(text)
+            continue
+        if ch.isspace():
+            pending_space = len(text) > line_start
+            continue
+        if pending_space:
+            text.append(" ")
+            text_starts.append(text_ends[-1])
+            text_ends.append(start)
+            pending_space = False
+        text.append(ch)
+        text_starts.append(start)
+        text_ends.append(end)
+    if text and text[-1] == "\n":
+        text.pop()
+        text_starts.pop()
+        text_ends.pop()
+    return "".join(text), text_starts, text_ends
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from .cache import CacheStats, create_cache
+
+load_dotenv()
+
+# 리소스별 최신 ETag를 잠시 기억해 두고, 클라이언트가 같은 ETag를 보내면 DB를 읽지 않고 304를 준다.
+# none | redis | memory. 기본값 none이면 버전을 기억하지 않고 DB를 읽은 뒤 ETag를 비교한다 (304는 그대로 준다).
+# memory는 워커마다 따로 기억해 다른 워커가 수정한 뒤에도 옛 버전으로 304를 줄 수 있으므로 워커가 하나일 때만 쓴다
+ETAG_CACHE_BACKEND = os.getenv("ETAG_CACHE_BACKEND", "none")
+# 이 앱을 거치지 않은 수정(스크립트, 다른 워커)은 최대 이 시간(초)만큼 늦게 보일 수 있다
+ETAG_CACHE_TTL = float(os.getenv("ETAG_CACHE_TTL", "30"))
+ETAG_CACHE_URL = os.getenv("ETAG_CACHE_URL", "redis://localhost:6379/0")
+
+# 캐시해 두되 쓰기 전에 매번 ETag로 확인하게 한다 (본인 글, 어드민 화면)
+PRIVATE_REVALIDATE = "private, no-cache"
+
+_cache = None
+_cache_ready = False
+stats = CacheStats("etag")
+
+def get_cache():
+    global _cache, _cache_ready
+    if not _cache_ready:
+        _cache = create_cache(
+            ETAG_CACHE_BACKEND,
+            ttl=ETAG_CACHE_TTL,
+            maxsize=4096,
+            url=ETAG_CACHE_URL,
+            prefix="berryessay:etag:",
+        )
+        _cache_ready = True
+    return _cache
+
+def compute_etag(data) -> str:
+    # 같은 내용이면 같은 값이 나오도록 키를 정렬해 직렬화한 뒤 해시한다
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+def row_etag(row: dict) -> str:
+    # updated_at은 트리거가 갱신하므로 본문 전체를 해시하지 않아도 된다
+    if row.get("updated_at"):
+        return compute_etag([row.get("id"), row["updated_at"]])
+    return compute_etag(row)
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 프록시가 압축하면서 W/를 붙여 돌려보내는 경우도 같은 값으로 본다
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    # 클라이언트가 가진 버전과 같으면 본문 없이 304를 돌려준다. 다르면 응답에 헤더만 붙이고 None
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def cached_not_modified(request: Request, key: str, cache_control: str) -> Optional[Response]:
+    # 기억해 둔 ETag와 If-None-Match가 같으면 DB를 읽기 전에 304를 준다
+    cache = get_cache()
+    if cache is None or not request.headers.get("if-none-match"):
+        return None
+    value = await cache.get(key)
+    stats.record(value is not None)
+    if value is None or not etag_matches(request, value["etag"]):
+        return None
+    return Response(status_code=304, headers={"ETag": value["etag"], "Cache-Control": cache_control})
+
+async def remember_etag(key: str, etag: str) -> None:
+    cache = get_cache()
+    if cache is not None:
+        await cache.set(key, {"etag": etag})
+
+async def forget_etag(*keys: str) -> None:
+    # 리소스를 고치거나 지운 뒤에 부른다
+    cache = get_cache()
+    if cache is not None:
+        for key in keys:
+            await cache.delete(key)
+
+def cache_stats() -> dict:
+    cache = get_cache()
+    return {"backend": cache.name if cache else "none", **stats.as_dict()}
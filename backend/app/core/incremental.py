@@ -0,0 +1,138 @@
+import math
+import os
+from difflib import SequenceMatcher
+from typing import List, Optional
+from dotenv import load_dotenv
+from .chunking import merge_corrections, split_sentences
+from .openai_client import build_messages, parse_correction_item, summarize_feedback
+from .rate_limit import LLM_CHARS_PER_TOKEN
+
+load_dotenv()
+
+INCREMENTAL_CORRECTION = os.getenv("INCREMENTAL_CORRECTION", "true").lower() == "true"
+# 바뀐 문단이 이 비율을 넘으면 나눠 보내는 이득이 없으므로 전체를 다시 첨삭한다
+INCREMENTAL_MAX_CHANGED_RATIO = float(os.getenv("INCREMENTAL_MAX_CHANGED_RATIO", "0.6"))
+# 바뀐 문단 앞뒤로 함께 보낼 문장 수 (문맥용, 이 부분의 첨삭은 버린다)
+INCREMENTAL_CONTEXT_SENTENCES = int(os.getenv("INCREMENTAL_CONTEXT_SENTENCES", "1"))
+
+def _paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in text.split("\n") if p.strip()]
+
+def _compact(text: str) -> str:
+    return "".join(text.split())
+
+def prompt_tokens(text: str) -> int:
+    # 실제 보낼 메시지 기준의 입력 토큰 추정치
+    return math.ceil(sum(len(m["content"]) for m in build_messages(text)) / LLM_CHARS_PER_TOKEN)
+
+def changed_paragraphs(previous: List[str], current: List[str]) -> List[bool]:
+    # 현재 문단마다 이전 회차와 달라졌는지 (공백 차이는 무시)
+    matcher = SequenceMatcher(None, [_compact(p) for p in previous], [_compact(p) for p in current], autojunk=False)
+    changed = [True] * len(current)
+    for block in matcher.get_matching_blocks():
+        for j in range(block.b, block.b + block.size):
+            changed[j] = False
+    return changed
+
+class IncrementalPlan:
+    # 이전 회차와 비교해 이번에 모델에 보낼 글과 그대로 이어 쓸 첨삭을 정한다.
+    # mode: "full" (전체 첨삭), "incremental" (바뀐 문단만), "unchanged" (바뀐 곳 없음)
+    def __init__(self, clean_text: str, previous_session: Optional[dict] = None):
+        self.clean_text = clean_text
+        self.mode = "full"
+        self.request_text = clean_text
+        self.carried = []
+        self.previous_feedback = ""
+        self._changed_compact = ""
+        paragraphs = _paragraphs(clean_text)
+        self.metadata = {"mode": "full", "paragraphs_total": len(paragraphs), "paragraphs_changed": len(paragraphs)}
+
+        snapshot = (previous_session or {}).get("content_snapshot")
+        if INCREMENTAL_CORRECTION and snapshot is not None and paragraphs:
+            changed = changed_paragraphs(_paragraphs(snapshot), paragraphs)
+            if sum(changed) <= len(paragraphs) * INCREMENTAL_MAX_CHANGED_RATIO:
+                self._plan(paragraphs, changed, previous_session)
+
+        tokens_full = prompt_tokens(clean_text)
+        tokens_sent = prompt_tokens(self.request_text) if self.mode != "unchanged" else 0
+        self.metadata.update({
+            "mode": self.mode,
+            "carried_forward": len(self.carried),
+            "estimated_prompt_tokens_full": tokens_full,
+            "estimated_prompt_tokens_sent": tokens_sent,
+            "estimated_prompt_tokens_saved": tokens_full - tokens_sent,
+        })
+
+    def _plan(self, paragraphs: List[str], changed: List[bool], previous_session: dict) -> None:
+        unchanged_compact = _compact("\n".join(p for p, c in zip(paragraphs, changed) if not c))
+        # 바뀌지 않은 문단에 원문이 그대로 남아 있는 이전 첨삭만 이어 쓴다
+        for data in previous_session.get("corrections") or []:
+            correction = parse_correction_item(data)
+            if _compact(correction.original_text) and _compact(correction.original_text) in unchanged_compact:
+                self.carried.append(correction)
+        self.previous_feedback = previous_session.get("overall_feedback") or ""
+        self.metadata["paragraphs_changed"] = sum(changed)
+        if not any(changed):
+            self.mode = "unchanged"
+            self.request_text = ""
+            return
+
+        # 연속으로 바뀐 문단 묶음마다 앞 문단의 마지막 문장, 뒤 문단의 첫 문장을 문맥으로 붙인다
+        segments = []
+        changed_parts = []
+        i = 0
+        while i < len(paragraphs):
+            if not changed[i]:
+                i += 1
+                continue
+            j = i
+            while j < len(paragraphs) and changed[j]:
+                j += 1
+            block = paragraphs[i:j]
+            changed_parts.extend(block)
+            lines = []
+            if i > 0 and INCREMENTAL_CONTEXT_SENTENCES:
+                lines.append(" ".join(split_sentences(paragraphs[i - 1])[-INCREMENTAL_CONTEXT_SENTENCES:]))
+            lines.extend(block)
+            if j < len(paragraphs) and INCREMENTAL_CONTEXT_SENTENCES:
+                lines.append(" ".join(split_sentences(paragraphs[j])[:INCREMENTAL_CONTEXT_SENTENCES]))
+            segments.append("\n".join(lines))
+            i = j
+        self.mode = "incremental"
+        self.request_text = "\n".join(segments)
+        self._changed_compact = _compact("\n".join(changed_parts))
+
+    def keep(self, correction) -> bool:
+        # 문맥으로만 붙인 문장에 대한 첨삭은 버린다 (그 문단은 이전 첨삭을 이어 쓴다)
+        if self.mode != "incremental":
+            return True
+        original = _compact(correction.original_text)
+        return bool(original) and original in self._changed_compact
+
+    def accept(self, correction, emitted: list) -> bool:
+        # emitted: 이미 내보낸 첨삭 (이어 쓴 첨삭 포함). 스트리밍은 내보낸 첨삭을 되돌릴 수 없으므로
+        # merge_corrections가 버리거나 앞의 첨삭과 바꿔 끼울 새 첨삭은 받지 않는다
+        if self.mode == "full":
+            return True
+        if not self.keep(correction):
+            return False
+        merged = merge_corrections([emitted, [correction]])
+        return merged[-1] is correction and len(merged) == len(merge_corrections([emitted])) + 1
+
+    async def finish(self, corrections: list, overall_feedback: str) -> dict:
+        # 이어 쓴 첨삭과 새 첨삭을 합치고, 총평은 이전 총평과 새로 받은 총평을 합친다.
+        # 스트리밍(accept를 하나씩 부른다)과 같은 결과가 나오도록 같은 규칙으로 고른다
+        if self.mode == "full":
+            return {"corrections": corrections, "overall_feedback": overall_feedback}
+        merged = list(self.carried)
+        for correction in corrections:
+            if self.accept(correction, merged):
+                merged.append(correction)
+        return {"corrections": merged, "overall_feedback": await self.merge_feedback(overall_feedback)}
+
+    async def merge_feedback(self, overall_feedback: str) -> str:
+        if self.mode == "incremental":
+            return await summarize_feedback([self.previous_feedback, overall_feedback])
+        if self.mode == "unchanged":
+            return self.previous_feedback
+        return overall_feedback
@@ -0,0 +1,282 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from .log import request_id_var
+from .metrics import JOB_FAILURES, JOB_QUEUE_DEPTH
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# memory | sqlite
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAXSIZE = int(os.getenv("JOB_QUEUE_MAXSIZE", "1000"))
+# 이 시간(초) 이상 running 상태로 남은 작업은 재시작 시 실패 처리한다
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "900"))
+# 끝난 작업은 이 시간(초)이 지나면 지운다. 정리는 작업을 넣을 때 JOB_PRUNE_INTERVAL(초)마다 한 번 한다
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+JOB_PRUNE_INTERVAL = float(os.getenv("JOB_PRUNE_INTERVAL", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+class QueueFullError(Exception):
+    pass
+
+def _new_job(kind: str, payload: dict) -> dict:
+    now = time.time()
+    return {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "status": QUEUED,
+        "payload": payload,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+class MemoryJobStore:
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+
+    async def create(self, kind: str, payload: dict) -> dict:
+        job = _new_job(kind, payload)
+        self._jobs[job["id"]] = job
+        return dict(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def claim(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            return None
+        job.update(status=RUNNING, updated_at=time.time())
+        return dict(job)
+
+    async def finish(self, job_id: str, status: str, result=None, error: Optional[str] = None) -> None:
+        self._jobs[job_id].update(status=status, result=result, error=error, updated_at=time.time())
+
+    async def pending(self) -> list:
+        return [job_id for job_id, job in self._jobs.items() if job["status"] == QUEUED]
+
+    async def fail_stale(self, older_than: float) -> int:
+        return 0
+
+    async def prune(self, older_than: float) -> int:
+        cutoff = time.time() - older_than
+        expired = [job_id for job_id, job in self._jobs.items() if job["status"] in FINISHED and job["updated_at"] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+class SQLiteJobStore:
+    # 외부 브로커 없이 워커 재시작 후에도 작업 상태를 유지한다
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self._conn.commit()
+
+    @staticmethod
+    def _row(row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _run(self, sql: str, params: tuple = (), fetch: bool = False):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchall() if fetch else None
+            self._conn.commit()
+            return rows if fetch else cursor.rowcount
+
+    async def create(self, kind: str, payload: dict) -> dict:
+        job = _new_job(kind, payload)
+        await asyncio.to_thread(
+            self._run,
+            "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job["id"], kind, QUEUED, json.dumps(payload), job["created_at"], job["updated_at"]),
+        )
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        rows = await asyncio.to_thread(self._run, "SELECT * FROM jobs WHERE id = ?", (job_id,), True)
+        return self._row(rows[0]) if rows else None
+
+    async def claim(self, job_id: str) -> Optional[dict]:
+        # 여러 프로세스가 같은 작업을 집지 않도록 상태 전이를 조건부 UPDATE로 한다
+        claimed = await asyncio.to_thread(
+            self._run,
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, QUEUED),
+        )
+        return await self.get(job_id) if claimed else None
+
+    async def finish(self, job_id: str, status: str, result=None, error: Optional[str] = None) -> None:
+        await asyncio.to_thread(
+            self._run,
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error, time.time(), job_id),
+        )
+
+    async def pending(self) -> list:
+        rows = await asyncio.to_thread(
+            self._run, "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,), True
+        )
+        return [row["id"] for row in rows]
+
+    async def fail_stale(self, older_than: float) -> int:
+        return await asyncio.to_thread(
+            self._run,
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+            (FAILED, "worker stopped before the job finished", time.time(), RUNNING, time.time() - older_than),
+        )
+
+    async def prune(self, older_than: float) -> int:
+        return await asyncio.to_thread(
+            self._run,
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (*FINISHED, time.time() - older_than),
+        )
+
+class JobQueue:
+    # 제한된 수의 asyncio 워커가 등록된 kind별 핸들러로 작업을 처리한다
+    def __init__(self, store, workers: int = JOB_WORKERS, maxsize: int = JOB_QUEUE_MAXSIZE, result_ttl: float = JOB_RESULT_TTL):
+        self.store = store
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._pruned_at = 0.0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._handlers: Dict[str, Callable[[dict], Awaitable[dict]]] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._tasks: list = []
+
+    def register(self, kind: str, handler: Callable[[dict], Awaitable[dict]]) -> None:
+        self._handlers[kind] = handler
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self.store.fail_stale(JOB_STALE_AFTER)
+        await self._prune()
+        for job_id in await self.store.pending():
+            if self._queue.full():
+                break
+            self._queue.put_nowait(job_id)
+        JOB_QUEUE_DEPTH.set(self.depth())
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, kind: str, payload: dict) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        if self._queue.full():
+            raise QueueFullError("작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.")
+        if time.monotonic() - self._pruned_at >= JOB_PRUNE_INTERVAL:
+            await self._prune()
+        job = await self.store.create(kind, payload)
+        self._events[job["id"]] = asyncio.Event()
+        self._queue.put_nowait(job["id"])
+        JOB_QUEUE_DEPTH.set(self.depth())
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.store.get(job_id)
+
+    async def _prune(self) -> None:
+        self._pruned_at = time.monotonic()
+        removed = await self.store.prune(self.result_ttl)
+        if removed:
+            logger.info("Pruned %d finished jobs", removed)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        # long-poll: 끝나거나 timeout이 지날 때까지 기다린다.
+        # 다른 프로세스가 처리 중인 작업은 이벤트가 없으므로 저장소를 주기적으로 다시 본다.
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.store.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            event = self._events.get(job_id)
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                else:
+                    await asyncio.sleep(min(0.5, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(self.depth())
+            try:
+                job = await self.store.claim(job_id)
+                if job is None:
+                    continue
+                # 작업 안에서 남기는 로그는 job id로 묶는다 (요청 쪽에는 job_id가 응답으로 남는다)
+                request_id_var.set(f"job-{job_id[:8]}")
+                try:
+                    result = await self._handlers[job["kind"]](job["payload"])
+                    await self.store.finish(job_id, SUCCEEDED, result=result)
+                except asyncio.CancelledError:
+                    await self.store.finish(job_id, FAILED, error="cancelled")
+                    raise
+                except Exception as e:
+                    detail = getattr(e, "detail", None) or str(e)
+                    logger.error("Job %s (%s) failed: %s", job_id, job["kind"], detail)
+                    JOB_FAILURES.labels(job["kind"]).inc()
+                    await self.store.finish(job_id, FAILED, error=str(detail))
+            finally:
+                event = self._events.pop(job_id, None)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
+
+def create_store():
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH)
+    return MemoryJobStore()
+
+job_queue = JobQueue(create_store())
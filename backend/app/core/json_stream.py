@@ -0,0 +1,59 @@
+import json
+from typing import List, Optional
+
+class CorrectionStreamParser:
+    # 스트리밍으로 들어오는 JSON 조각을 받아, 최상위 객체의 특정 배열(예: "corrections")
+    # 안에서 닫힌 객체가 나올 때마다 바로 돌려준다. 전체 문서는 끝에 result()로 파싱한다.
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[dict]:
+        self._text += chunk
+        text = self._text
+        items = []
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":":
+                if self._depth == 1:
+                    self._key = self._last_string
+            elif ch == "{" or ch == "[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._key == self.array_key:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item_start = i
+            elif ch == "}" or ch == "]":
+                if ch == "}" and self._item_start is not None and self._depth == self._array_depth + 1:
+                    items.append(json.loads(text[self._item_start:i + 1]))
+                    self._item_start = None
+                elif ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+        self._pos = len(text)
+        return items
+
+    def result(self) -> dict:
+        return json.loads(self._text)
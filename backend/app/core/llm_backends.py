@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+from typing import Callable, List, Optional
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# openai: 실제 OpenAI API (OPENAI_BASE_URL로 호환 서버를 가리킬 수도 있다)
+# fake: benchmarks/fake_llm_server.py 같은 로컬 가짜 서버 (돈/네트워크 없이 부하 테스트)
+# cassette: 요청별로 응답을 파일에 녹화했다가 그대로 재생한다
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_FAKE_URL = os.getenv("LLM_FAKE_URL", "http://127.0.0.1:8100/v1")
+LLM_CASSETTE_DIR = os.getenv("LLM_CASSETTE_DIR", "cassettes")
+# replay: 녹화된 응답만 쓴다 (없으면 에러) / record: 항상 실제로 호출해 덮어쓴다 / auto: 있으면 재생, 없으면 녹화
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "auto")
+# 녹화할 때 실제로 부를 백엔드 (openai | fake)
+LLM_CASSETTE_INNER = os.getenv("LLM_CASSETTE_INNER", "openai")
+
+class CassetteMiss(Exception):
+    pass
+
+class OpenAIBackend:
+    # OpenAI 호환 API를 쓰는 백엔드 (실제 OpenAI와 가짜 서버가 같은 구현을 쓴다)
+    def __init__(self, client: AsyncOpenAI, name: str = "openai"):
+        self.client = client
+        self.name = name
+
+    async def create(self, **params):
+        # stream=True면 AsyncStream(청크 반복 + close)을, 아니면 ChatCompletion을 돌려준다
+        return await self.client.chat.completions.create(**params)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+class _ReplayStream:
+    # 녹화된 청크를 AsyncStream처럼 돌려준다
+    def __init__(self, chunks: List[dict]):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield ChatCompletionChunk.model_validate(chunk)
+
+    async def close(self) -> None:
+        pass
+
+class _RecordingStream:
+    # 실제 스트림을 그대로 흘려보내면서 청크를 모아 끝까지 받으면 녹화한다
+    def __init__(self, stream, save: Callable[[dict], None]):
+        self._stream = stream
+        self._save = save
+
+    async def __aiter__(self):
+        chunks = []
+        async for chunk in self._stream:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        self._save({"chunks": chunks})
+
+    async def close(self) -> None:
+        await self._stream.close()
+
+class CassetteBackend:
+    # 요청 내용(model, messages, 옵션)의 해시를 파일 이름으로 응답을 저장한다.
+    # 같은 요청은 같은 응답을 받으므로 부하 테스트와 회귀 테스트를 결정적으로 돌릴 수 있다.
+    name = "cassette"
+
+    def __init__(self, directory: str, mode: str = "auto", inner=None):
+        if mode not in ("replay", "record", "auto"):
+            raise ValueError(f"Unknown LLM_CASSETTE_MODE: {mode}")
+        if mode != "replay" and inner is None:
+            raise ValueError("cassette record mode needs an inner backend")
+        self.directory = directory
+        self.mode = mode
+        self.inner = inner
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def request_key(params: dict) -> str:
+        # 스트리밍 여부와 관계없이 같은 요청이면 같은 키를 쓴다 (stream_options 등 전송 옵션 제외)
+        body = {k: v for k, v in params.items() if k not in ("stream", "stream_options", "timeout")}
+        return hashlib.sha256(json.dumps(body, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, stream: bool) -> str:
+        return os.path.join(self.directory, f"{key}{'.stream' if stream else ''}.json")
+
+    def _load(self, path: str) -> Optional[dict]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _writer(self, path: str, params: dict) -> Callable[[dict], None]:
+        def save(recorded: dict) -> None:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"request": params, **recorded}, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        return save
+
+    async def create(self, **params):
+        stream = bool(params.get("stream"))
+        path = self._path(self.request_key(params), stream)
+        if self.mode != "record":
+            recorded = self._load(path)
+            if recorded is not None:
+                if stream:
+                    return _ReplayStream(recorded["chunks"])
+                return ChatCompletion.model_validate(recorded["response"])
+            if self.mode == "replay":
+                raise CassetteMiss(f"no cassette for request {os.path.basename(path)}")
+        save = self._writer(path, params)
+        response = await self.inner.create(**params)
+        if stream:
+            return _RecordingStream(response, save)
+        save({"response": response.model_dump()})
+        return response
+
+    async def close(self) -> None:
+        if self.inner is not None:
+            await self.inner.close()
+
+def create_backend(name: str, client_factory: Callable[..., AsyncOpenAI]):
+    # client_factory(base_url=None, api_key=None)는 커넥션 풀 설정이 들어간 AsyncOpenAI를 만든다
+    if name == "openai":
+        return OpenAIBackend(client_factory())
+    if name == "fake":
+        return OpenAIBackend(client_factory(base_url=LLM_FAKE_URL, api_key="fake"), name="fake")
+    if name == "cassette":
+        inner = create_backend(LLM_CASSETTE_INNER, client_factory) if LLM_CASSETTE_MODE != "replay" else None
+        return CassetteBackend(LLM_CASSETTE_DIR, LLM_CASSETTE_MODE, inner)
+    raise ValueError(f"Unknown LLM_BACKEND: {name}")
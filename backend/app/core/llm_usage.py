@@ -0,0 +1,70 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Optional
+from .metrics import LLM_TOKENS
+from .prompts import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+def _usage_value(usage, name: str) -> int:
+    return getattr(usage, name, None) or 0
+
+def cached_tokens(usage) -> int:
+    # prompt_tokens 중 프롬프트 캐시에서 읽은 토큰 수 (캐시 미지원 모델이면 0)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+
+class LLMUsageStats:
+    # 모델별 호출 수, 토큰 수, 프롬프트 캐시 적중 토큰, 응답 시간을 모은다
+    def __init__(self):
+        self.started = time.time()
+        self._models = defaultdict(lambda: {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "seconds": 0.0,
+            "cached_calls": 0,
+            "cached_seconds": 0.0,
+        })
+
+    def record(self, model: str, usage, seconds: float) -> Optional[dict]:
+        if usage is None:
+            return None
+        entry = {
+            "model": model,
+            "prompt_tokens": _usage_value(usage, "prompt_tokens"),
+            "cached_tokens": cached_tokens(usage),
+            "completion_tokens": _usage_value(usage, "completion_tokens"),
+            "seconds": round(seconds, 3),
+        }
+        totals = self._models[model]
+        totals["calls"] += 1
+        totals["prompt_tokens"] += entry["prompt_tokens"]
+        totals["cached_tokens"] += entry["cached_tokens"]
+        totals["completion_tokens"] += entry["completion_tokens"]
+        totals["seconds"] += seconds
+        if entry["cached_tokens"]:
+            totals["cached_calls"] += 1
+            totals["cached_seconds"] += seconds
+        for kind in ("prompt", "cached", "completion"):
+            LLM_TOKENS.labels(model, PROMPT_VERSION, kind).inc(entry[f"{kind}_tokens"])
+        logger.info("LLM usage", extra=entry)
+        return entry
+
+    def as_dict(self) -> dict:
+        models = {}
+        for model, totals in self._models.items():
+            uncached_calls = totals["calls"] - totals["cached_calls"]
+            models[model] = {
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in totals.items()},
+                # 입력 토큰 중 캐시에서 읽은 비율
+                "cached_token_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else 0.0,
+                # 캐시 적중 여부에 따른 평균 응답 시간 (대시보드에서 지연 감소를 비교할 때 쓴다)
+                "avg_seconds_cached": round(totals["cached_seconds"] / totals["cached_calls"], 3) if totals["cached_calls"] else None,
+                "avg_seconds_uncached": round((totals["seconds"] - totals["cached_seconds"]) / uncached_calls, 3) if uncached_calls else None,
+            }
+        return {"since": self.started, "models": models}
+
+usage_stats = LLMUsageStats()
@@ -0,0 +1,199 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from .timing import SERVER_TIMING_ENABLED, RequestStats, query_budget, request_stats_var
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json: 한 줄에 JSON 하나 (운영) / text: 사람이 읽기 쉬운 한 줄 (개발)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# 메시지와 필드 값 하나의 최대 길이. 넘으면 잘라서 남긴다
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))
+# 요청 로그를 남길 비율. "경로 접두사=비율"을 쉼표로 나열하고 가장 긴 접두사를 쓴다.
+# 예: "/essays=0.1,/corrections/llm/stats=0" (WARNING 이상은 항상 남긴다)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+# 큐가 이만큼 쌓이면 새 로그는 버린다 (로그 때문에 메모리가 늘거나 요청이 느려지지 않도록)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 요청마다 한 줄씩 남기는 라이브러리(httpx 등)의 로그 레벨
+LOG_LIBRARY_LEVEL = os.getenv("LOG_LIBRARY_LEVEL", "WARNING").upper()
+_LIBRARY_LOGGERS = ("httpx", "httpcore", "openai", "hpack")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+route_var: ContextVar[str] = ContextVar("route", default="-")
+sampled_var: ContextVar[bool] = ContextVar("sampled", default=True)
+
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "request_id", "route"}
+_listener: Optional[logging.handlers.QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+def _parse_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        prefix, _, rate = item.strip().partition("=")
+        if prefix and rate:
+            rates[prefix] = float(rate)
+    return rates
+
+_SAMPLE_RATES = _parse_rates(LOG_SAMPLE_RATES)
+
+def sample_rate(path: str) -> float:
+    matches = [prefix for prefix in _SAMPLE_RATES if path.startswith(prefix)]
+    return _SAMPLE_RATES[max(matches, key=len)] if matches else LOG_SAMPLE_RATE
+
+def truncate(value, limit: int = LOG_MAX_FIELD_CHARS):
+    # 에세이 본문이나 모델 응답 전체가 로그에 들어가지 않도록 자른다
+    if not isinstance(value, str):
+        if isinstance(value, (int, float, bool)) or value is None:
+            return value
+        value = str(value)
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}...(+{len(value) - limit} chars)"
+
+def _truncate_fields(value):
+    if isinstance(value, dict):
+        return {k: _truncate_fields(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_truncate_fields(v) for v in value[:50]]
+    return truncate(value)
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+class ContextFilter(logging.Filter):
+    # 호출한 쪽(요청 처리 중인 태스크)에서 돌아 request id와 경로를 레코드에 붙이고, 샘플링에서 빠진 요청의 로그를 버린다
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not sampled_var.get():
+            return False
+        record.request_id = request_id_var.get()
+        record.route = route_var.get()
+        return True
+
+class _Handler(logging.handlers.QueueHandler):
+    # 메시지는 여기서 잘라 두고, JSON 직렬화와 출력은 리스너 스레드에 맡긴다
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        message = truncate(record.getMessage(), LOG_MAX_FIELD_CHARS * 4)
+        if record.exc_info:
+            # 트레이스백은 자르지 않는다
+            message = f"{message}\n{_exception_formatter.formatException(record.exc_info)}"
+        record.msg = record.message = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "route": getattr(record, "route", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = _truncate_fields(value)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{k}={truncate(v)}" for k, v in record.__dict__.items() if k not in _RESERVED)
+        created = time.strftime("%H:%M:%S", time.localtime(record.created))
+        line = f"{created} {record.levelname:<7} [{getattr(record, 'request_id', '-')}] {record.name}: {record.getMessage()}"
+        return f"{line} {fields}" if fields else line
+
+def setup_logging() -> None:
+    # 요청을 처리하는 쪽은 큐에 넣기만 하고, 포맷과 stdout 쓰기는 별도 스레드(QueueListener)가 한다
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    handler = _Handler(log_queue)
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    for name in _LIBRARY_LOGGERS:
+        logging.getLogger(name).setLevel(LOG_LIBRARY_LEVEL)
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+def stop_logging() -> None:
+    # 큐에 남은 로그를 모두 쓰고 리스너 스레드를 멈춘다
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class RequestContextMiddleware:
+    # 요청마다 request id를 정하고(X-Request-ID가 오면 그대로 쓴다) 샘플링 여부를 정해 모든 로그 줄에 싣는다.
+    # 응답에는 X-Request-ID와 Server-Timing(응답 시작 시점까지의 DB/모델 호출)을 붙이고,
+    # 끝나면 호출 횟수와 시간을 담은 접근 로그 한 줄을 남긴다.
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("app.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        request_id = (headers.get(b"x-request-id") or b"").decode("latin-1")[:64] or new_request_id()
+        path = scope.get("path", "")
+        stats = RequestStats()
+        context = (request_id_var, route_var, sampled_var, request_stats_var)
+        tokens = (
+            request_id_var.set(request_id),
+            route_var.set(f"{scope.get('method', '')} {path}"),
+            sampled_var.set(random.random() < sample_rate(path)),
+            request_stats_var.set(stats),
+        )
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [(b"x-request-id", request_id.encode("latin-1"))]
+                if SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            elapsed_ms = round((time.perf_counter() - stats.started) * 1000, 1)
+            fields = {"status": status, "duration_ms": elapsed_ms, **stats.as_fields()}
+            level = logging.WARNING if status >= 500 else logging.INFO
+            budget = query_budget(path)
+            if stats.counts["db"] > budget:
+                # 샘플링과 관계없이 남도록 WARNING으로 올린다
+                fields["query_budget_exceeded"] = budget
+                level = logging.WARNING
+            self.logger.log(level, "request", extra=fields)
+            for var, token in zip(context, tokens):
+                var.reset(token)
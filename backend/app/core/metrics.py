@@ -0,0 +1,110 @@
+import os
+import time
+from dotenv import load_dotenv
+
+# prometheus_client는 import할 때 PROMETHEUS_MULTIPROC_DIR을 읽으므로 .env를 먼저 읽는다
+load_dotenv()
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 워커를 여러 개 띄울 때(uvicorn --workers, gunicorn)는 비어 있는 디렉터리를 지정한다.
+# 워커마다 값을 이 디렉터리의 파일에 쓰고, /metrics는 어느 워커가 받든 모든 워커의 값을 합쳐 보여준다.
+# 서버를 다시 띄우기 전에 디렉터리를 비워야 이전 값이 섞이지 않는다.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ["method", "route", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "처리 중인 HTTP 요청 수",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+SUPABASE_SECONDS = Histogram(
+    "supabase_request_duration_seconds",
+    "Supabase(PostgREST) 호출 시간",
+    ["method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+LLM_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "모델 API 호출 시간 (스케줄러 대기 제외, 스트리밍은 첫 응답까지)",
+    ["model", "prompt_version"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+LLM_REQUESTS = Counter(
+    "llm_requests",
+    "모델 API 호출 수 (outcome: ok | rate_limited | error)",
+    ["model", "prompt_version", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "llm_tokens",
+    "모델 API 토큰 수 (type: prompt | cached | completion)",
+    ["model", "prompt_version", "type"],
+)
+CORRECTION_FAILURES = Counter(
+    "correction_failures",
+    "실패한 첨삭 요청 수 (path: session | stream | legacy, reason: rate_limited | error)",
+    ["path", "reason"],
+)
+JOB_FAILURES = Counter("job_failures", "실패한 백그라운드 작업 수", ["kind"])
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "캐시 조회 수 (적중률 = hit / (hit + miss))",
+    ["cache", "result"],
+)
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "대기 중인 백그라운드 작업 수", multiprocess_mode="livesum")
+LLM_QUEUE_DEPTH = Gauge("llm_scheduler_queue_depth", "RPM/TPM 스케줄러에서 차례를 기다리는 모델 호출 수", multiprocess_mode="livesum")
+
+def render() -> bytes:
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+def mark_process_dead() -> None:
+    # 종료하는 워커의 livesum 게이지(처리 중인 요청, 대기열 길이)를 합계에서 뺀다
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+class MetricsMiddleware:
+    # 경로는 실제 URL이 아니라 라우트 템플릿(/essays/{essay_id})으로 남긴다 (ID마다 시계열이 생기지 않도록)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope.get("method", "")
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.labels(method).dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(time.perf_counter() - started)
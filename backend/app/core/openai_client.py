@@ -1,100 +1,283 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
+import asyncio
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 import json
+import logging
+import time
+import httpx
 from ..models.correction import CorrectionCreate, CorrectionCategory
-from bs4 import BeautifulSoup
-import re
+from .json_stream import CorrectionStreamParser
+from .html_text import html_to_plain_text
+from .chunking import build_windows, merge_corrections
+from .rate_limit import estimate_tokens, may_reject_current, scheduler
+from .prompts import PROMPT_VERSION, build_correction_messages
+from .llm_usage import usage_stats
+from .precheck import PRECHECK_ENABLED, PRECHECK_VERSION, handled_summary, precheck
+from .llm_backends import LLM_BACKEND, create_backend
+from .timing import track
+from .metrics import LLM_REQUESTS, LLM_SECONDS
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
-# HTML을 plain text로 변환하는 함수
-def html_to_plain_text(html: str) -> str:
-    # HTML 파싱
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # 텍스트 추출
-    text = soup.get_text()
-    # 연속된 공백을 하나로 통일
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "90"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120"))
+# SDK 자체 재시도 횟수. Batch/Files API 호출에만 쓴다 (채팅 완성은 스케줄러가 429를 직접 다루므로 0)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# 대량/백그라운드 호출이 429를 받고 다시 줄을 서는 최대 횟수
+OPENAI_RATE_LIMIT_RETRIES = int(os.getenv("OPENAI_RATE_LIMIT_RETRIES", "5"))
+# 총평 합치기처럼 가벼운 작업에 쓰는 모델
+OPENAI_SUMMARY_MODEL = os.getenv("OPENAI_SUMMARY_MODEL", OPENAI_MODEL)
+
+# 이 길이(글자 수)를 넘는 글은 창 단위로 나눠 동시에 첨삭한다
+CHUNK_THRESHOLD = int(os.getenv("CORRECTION_CHUNK_THRESHOLD", "2500"))
+CHUNK_MAX_CHARS = int(os.getenv("CORRECTION_CHUNK_MAX_CHARS", "1500"))
+CHUNK_OVERLAP_SENTENCES = int(os.getenv("CORRECTION_CHUNK_OVERLAP_SENTENCES", "1"))
+CHUNK_CONCURRENCY = int(os.getenv("CORRECTION_CHUNK_CONCURRENCY", "4"))
+
+# 같은 글이라도 결과가 달라지는 설정 (첨삭 캐시 키에 넣는다). 동시 처리 수처럼 결과와 무관한 값은 뺀다
+CORRECTION_CONFIG = (
+    f"precheck={PRECHECK_VERSION if PRECHECK_ENABLED else 'off'};"
+    f"chunk={CHUNK_THRESHOLD}/{CHUNK_MAX_CHARS}/{CHUNK_OVERLAP_SENTENCES}"
+)
+
+# 프로세스당 하나만 만들어 keep-alive 커넥션을 재사용한다
+_client: Optional[AsyncOpenAI] = None
+_backend = None
+
+def new_client(base_url: Optional[str] = None, api_key: Optional[str] = None, max_retries: int = OPENAI_MAX_RETRIES) -> AsyncOpenAI:
+    timeout = httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+    return AsyncOpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=base_url,
+        timeout=timeout,
+        max_retries=max_retries,
+        http_client=DefaultAsyncHttpxClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+        ),
+    )
+
+def get_client() -> AsyncOpenAI:
+    # 실제 OpenAI 클라이언트 (Batch/Files API처럼 OpenAI에만 있는 기능에 쓴다)
+    global _client
+    if _client is None:
+        _client = new_client()
+    return _client
+
+def _client_for(base_url: Optional[str] = None, api_key: Optional[str] = None) -> AsyncOpenAI:
+    # 스케줄러를 거치는 채팅 완성용 클라이언트. SDK가 429를 몰래 다시 보내면 RPM/TPM 예산에 잡히지 않으므로 재시도를 끈다.
+    # 기본 설정이면 공유 클라이언트의 커넥션 풀을 같이 쓰고, 가짜 서버처럼 주소가 다르면 새 클라이언트를 쓴다
+    if base_url is None and api_key is None:
+        return get_client().with_options(max_retries=0)
+    return new_client(base_url, api_key, max_retries=0)
+
+def get_backend():
+    # 채팅 완성을 보낼 백엔드 (LLM_BACKEND 설정으로 고른다)
+    global _backend
+    if _backend is None:
+        _backend = create_backend(LLM_BACKEND, _client_for)
+    return _backend
+
+async def close_client():
+    global _client, _backend
+    if _backend is not None:
+        backend, _backend = _backend, None
+        await backend.close()
+    if _client is not None:
+        client, _client = _client, None
+        # OpenAI 백엔드는 get_client()를 같이 쓰므로 이미 닫혔을 수 있다
+        if not client.is_closed():
+            await client.close()
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class _MeteredStream:
+    # 스트리밍 응답은 slot이 끝난 뒤에 읽히므로, 사용량이 실린 마지막 청크를 보고 예약한 토큰을 정산한다
+    def __init__(self, stream, reserved: int):
+        self._stream = stream
+        self._reserved = reserved
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            if chunk.usage and self._reserved is not None:
+                scheduler.settle(self._reserved, chunk.usage.total_tokens)
+                self._reserved = None
+            yield chunk
+
+    async def close(self) -> None:
+        await self._stream.close()
+
+async def create_chat_completion(messages: list, model: str = OPENAI_MODEL, **kwargs):
+    # 모든 모델 호출은 RPM/TPM 스케줄러를 거친다
+    estimated = estimate_tokens(messages, kwargs.get("max_tokens"))
+    attempt = 0
+    while True:
+        async with scheduler.slot(estimated) as usage:
+            started = time.perf_counter()
+            try:
+                # 스케줄러 대기 시간은 빼고 모델 API 호출만 잰다 (스트리밍이면 첫 응답까지)
+                with LLM_SECONDS.labels(model, PROMPT_VERSION).time():
+                    async with track("llm"):
+                        response = await get_backend().create(model=model, messages=messages, **kwargs)
+            except RateLimitError as e:
+                LLM_REQUESTS.labels(model, PROMPT_VERSION, "rate_limited").inc()
+                limited = scheduler.provider_limited(_retry_after(e))
+                attempt += 1
+                if may_reject_current() or attempt > OPENAI_RATE_LIMIT_RETRIES:
+                    raise limited
+            except Exception:
+                LLM_REQUESTS.labels(model, PROMPT_VERSION, "error").inc()
+                raise
+            else:
+                LLM_REQUESTS.labels(model, PROMPT_VERSION, "ok").inc()
+                if kwargs.get("stream"):
+                    return _MeteredStream(response, usage["reserved"])
+                if response.usage:
+                    usage["total_tokens"] = response.usage.total_tokens
+                    usage_stats.record(model, response.usage, time.perf_counter() - started)
+                return response
+        # 대량/백그라운드 작업은 429를 돌려주지 않고 retry-after만큼 쉰 뒤 다시 줄을 선다
+        logger.warning("OpenAI rate limited, retrying in %ss (%d/%d)", limited.retry_after, attempt, OPENAI_RATE_LIMIT_RETRIES)
+        await asyncio.sleep(limited.retry_after)
+
+def build_messages(clean_text: str, handled: Optional[List[CorrectionCreate]] = None) -> list:
+    # 고정된 지시문/예시가 앞, 에세이가 맨 뒤 (프롬프트 캐시를 위해 core/prompts.py에서 만든다)
+    # handled: 규칙 검사로 이미 고친 첨삭. 모델이 같은 오류를 다시 쓰지 않도록 마지막 메시지에 알려 준다
+    return build_correction_messages(clean_text, handled_summary(handled or []))
+
+def run_precheck(clean_text: str) -> List[CorrectionCreate]:
+    # 띄어쓰기/문장부호/반복 같은 기계적인 오류는 모델 대신 규칙으로 찾는다
+    return precheck(clean_text) if PRECHECK_ENABLED else []
+
+def parse_correction_item(data: dict) -> CorrectionCreate:
+    return CorrectionCreate(
+        essay_id="",  # Will be set in the router
+        category=CorrectionCategory(data["category"]),
+        original_text=data["original_text"],
+        suggested_text=data["suggested_text"],
+        explanation=data["explanation"]
+    )
 
 async def get_correction(plain_text: str) -> List[CorrectionCreate]:
     # HTML 태그를 제거하고 순수 텍스트로 변환
     clean_text = html_to_plain_text(plain_text)
     
-    # 디버깅을 위한 로그 추가
-    print("=== 텍스트 변환 디버깅 ===")
-    print("원본 텍스트:", plain_text)
-    print("변환된 텍스트:", clean_text)
-    print("원본 길이:", len(plain_text))
-    print("변환 길이:", len(clean_text))
-    
-    prompt = f"""
-    당신은 엄격한 한국어 에세이 첨삭자입니다.
-    아래 에세이에 대해 다음 두 가지를 작성하세요:
-
-    1. corrections: 글의 흐름, 논리, 구조, 명백한 문법 오류 등에서 개선이 필요한 점을 최대한 많이 제안하세요. 각 문제마다 별도의 correction을 만들어주세요.
-    2. overall_feedback: 이 글의 전체적인 강점, 부족한 점, 조언 등 총평을 한 문단으로 작성하세요.
-
-    각 첨삭은 아래 정보를 포함해야 합니다:
-    - category: 'structure' 또는 'grammar' 중 하나
-    - original_text: 원본 텍스트
-    - suggested_text: 수정 제안
-    - explanation: 수정 이유
-
-    응답은 반드시 다음과 같은 JSON 형식이어야 합니다:
-    {{
-        "corrections": [
-            {{
-                "category": "structure",
-                "original_text": "문제가 있는 텍스트",
-                "suggested_text": "수정된 텍스트",
-                "explanation": "수정 이유"
-            }}
-        ],
-        "overall_feedback": "이 글은 ... (총평)"
-    }}
+    logger.debug("converted essay html to text", extra={"html_chars": len(plain_text), "text_chars": len(clean_text)})
 
-    텍스트:
-    {clean_text}
-    """
-    
-    print(f"Sending prompt to OpenAI: {prompt}")
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a strict Korean essay editor. Always suggest improvements, even for minor issues."},
-            {"role": "user", "content": prompt}
-        ],
+    return await correct_text(clean_text)
+
+async def correct_text(clean_text: str) -> dict:
+    # 이미 plain text로 변환된 글을 첨삭한다
+    found = run_precheck(clean_text)
+    messages = build_messages(clean_text, found)
+    logger.debug("sending prompt", extra={"prompt": messages[-1]["content"]})
+
+    response = await create_chat_completion(
+        messages,
         response_format={ "type": "json_object" }
     )
     
     try:
-        print(f"OpenAI response: {response.choices[0].message.content}")
+        logger.debug("model response", extra={"response": response.choices[0].message.content})
         response_data = json.loads(response.choices[0].message.content)
         corrections_data = response_data.get("corrections", [])
         overall_feedback = response_data.get("overall_feedback", "")
             
-        corrections = []
-        for data in corrections_data:
-            correction = CorrectionCreate(
-                essay_id="",  # Will be set in the router
-                category=CorrectionCategory(data["category"]),
-                original_text=data["original_text"],
-                suggested_text=data["suggested_text"],
-                explanation=data["explanation"]
-            )
-            corrections.append(correction)
+        corrections = merge_corrections([found, [parse_correction_item(data) for data in corrections_data]])
             
         # corrections와 overall_feedback을 함께 반환
         return {"corrections": corrections, "overall_feedback": overall_feedback}
     except Exception as e:
-        print(f"Error parsing AI response: {str(e)}")
-        print(f"Raw response: {response.choices[0].message.content}")
-        raise ValueError(f"Failed to parse AI response: {str(e)}")
\ No newline at end of file
+        logger.error("Error parsing AI response: %s", e, extra={"response": response.choices[0].message.content})
+        raise ValueError(f"Failed to parse AI response: {str(e)}")
+
+async def correct_essay(clean_text: str) -> dict:
+    # 짧은 글은 한 번에, 긴 글은 나눠서 첨삭한다
+    if len(clean_text) <= CHUNK_THRESHOLD:
+        return await correct_text(clean_text)
+    return await correct_text_chunked(clean_text)
+
+async def correct_text_chunked(clean_text: str) -> dict:
+    windows = build_windows(clean_text, CHUNK_MAX_CHARS, CHUNK_OVERLAP_SENTENCES)
+    if len(windows) <= 1:
+        return await correct_text(clean_text)
+    semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+
+    async def run(window: str) -> dict:
+        async with semaphore:
+            return await correct_text(window)
+
+    results = await asyncio.gather(*(run(window) for window in windows))
+    corrections = merge_corrections([r["corrections"] for r in results])
+    overall_feedback = await summarize_feedback([r["overall_feedback"] for r in results])
+    return {"corrections": corrections, "overall_feedback": overall_feedback}
+
+async def summarize_feedback(feedbacks: List[str]) -> str:
+    # 부분별 총평을 하나의 문단으로 합친다 (입력이 짧아 저렴한 호출)
+    feedbacks = [f for f in feedbacks if f]
+    if len(feedbacks) <= 1:
+        return feedbacks[0] if feedbacks else ""
+    joined = "\n".join(f"- {f}" for f in feedbacks)
+    response = await create_chat_completion(
+        [
+            {"role": "system", "content": "You are a strict Korean essay editor."},
+            {"role": "user", "content": f"다음은 한 에세이를 부분별로 읽고 쓴 총평입니다. 중복을 없애고 글 전체에 대한 총평 한 문단으로 합쳐 주세요. 총평만 출력하세요.\n\n{joined}"}
+        ],
+        model=OPENAI_SUMMARY_MODEL,
+        max_tokens=500
+    )
+    return (response.choices[0].message.content or "").strip()
+
+async def stream_correction(clean_text: str) -> AsyncIterator[Tuple[str, object]]:
+    # 모델 출력을 스트리밍으로 받아 완성된 첨삭부터 하나씩 내보낸다
+    # ("correction", CorrectionCreate) ... ("overall_feedback", str) 순서
+    # 규칙 검사 결과는 모델을 기다리지 않고 바로 내보낸다
+    found = run_precheck(clean_text)
+    for correction in found:
+        yield "correction", correction
+    started = time.perf_counter()
+    stream = await create_chat_completion(
+        build_messages(clean_text, found),
+        response_format={ "type": "json_object" },
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    parser = CorrectionStreamParser("corrections")
+    try:
+        async for chunk in stream:
+            if chunk.usage:
+                # 사용량은 choices가 빈 마지막 청크에 실려 온다
+                usage_stats.record(OPENAI_MODEL, chunk.usage, time.perf_counter() - started)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for data in parser.feed(delta):
+                correction = parse_correction_item(data)
+                # 규칙 검사로 이미 내보낸 첨삭과 겹치면 버린다
+                if any(c is correction for c in merge_corrections([found, [correction]])):
+                    yield "correction", correction
+        response_data = parser.result()
+    except Exception as e:
+        logger.error("Error parsing AI stream: %s", e)
+        raise ValueError(f"Failed to parse AI response: {str(e)}")
+    finally:
+        await stream.close()
+    yield "overall_feedback", response_data.get("overall_feedback", "")
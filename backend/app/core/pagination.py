@@ -0,0 +1,50 @@
+import base64
+import json
+import os
+import re
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "50"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "200"))
+
+# 다음 페이지 cursor는 응답 본문(목록)을 바꾸지 않도록 헤더로 내려준다
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# cursor 값은 PostgREST 필터 문자열에 그대로 들어가므로 형식을 엄격하게 확인한다
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:?\d{2}|Z)?")
+_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except Exception:
+        raise InvalidCursor("잘못된 cursor입니다.")
+    if not (isinstance(created_at, str) and _TIMESTAMP.fullmatch(created_at)
+            and isinstance(row_id, str) and _UUID.fullmatch(row_id)):
+        raise InvalidCursor("잘못된 cursor입니다.")
+    return created_at, row_id
+
+def keyset(query, cursor: Optional[str], limit: int):
+    # 최신순(created_at desc, id desc)으로 cursor 다음 행부터 limit개.
+    # OFFSET과 달리 앞 페이지를 건너뛰느라 읽는 행이 없어 테이블이 커져도 페이지마다 드는 시간이 같다.
+    query = query.order("created_at", desc=True).order("id", desc=True).limit(limit)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # 타임스탬프의 '.', ':'는 PostgREST 논리식에서 예약 문자라 따옴표로 감싼다
+        query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+    return query
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    # 한 페이지를 꽉 채웠을 때만 다음 페이지가 있을 수 있다
+    return encode_cursor(rows[-1]) if rows and len(rows) >= limit else None
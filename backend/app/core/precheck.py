@@ -0,0 +1,196 @@
+import os
+import re
+from typing import Callable, List, Optional, Tuple
+from dotenv import load_dotenv
+from ..models.correction import CorrectionCreate, CorrectionCategory
+
+load_dotenv()
+
+# 모델을 부르기 전에 규칙으로 찾을 수 있는 기계적인 오류(띄어쓰기, 문장부호, 반복, 자주 틀리는 맞춤법)를 먼저 고친다.
+# 찾은 항목은 grammar 첨삭으로 바로 돌려주고, 프롬프트에는 "이미 고친 항목"으로 넘겨 모델이 다시 쓰지 않게 한다.
+PRECHECK_ENABLED = os.getenv("PRECHECK_ENABLED", "true").lower() == "true"
+# 규칙을 바꾸면 올려서 이전 규칙으로 만든 첨삭 캐시를 무효화한다
+PRECHECK_VERSION = "2"
+
+_HANGUL_BASE = 0xAC00
+_JONG_N = 4   # ㄴ 받침
+_JONG_L = 8   # ㄹ 받침
+
+def _jong(ch: str) -> int:
+    code = ord(ch) - _HANGUL_BASE
+    return code % 28 if 0 <= code < 11172 else -1
+
+# ㄴ/ㄹ 받침 뒤에 붙여 쓴 의존 명사 (읽는것 -> 읽는 것, 알수 -> 알 수, 할때 -> 할 때)
+_DEPENDENT_NOUN = re.compile(r"([가-힣])(것|수|때|뿐|만큼)")
+# 한 단어로 굳어 붙여 쓰는 말
+_DEPENDENT_NOUN_EXCEPTIONS = ("날것", "탈것", "별것", "들것", "군것질", "물때", "얼만큼", "갈수록", "할수록", "볼수록", "알수록", "물수건")
+# '수'로 끝나는 명사 (실수를 -> 실 수를 처럼 쪼개지 않는다)
+_SU_NOUNS = frozenset({
+    "실수", "필수", "말수", "일수", "날수", "탈수", "술수", "별수", "물수", "철수", "결수",
+    "점수", "횟수", "변수", "교수", "정수", "호수", "순수", "분수", "지수", "함수", "상수",
+    "인수", "접수", "감수", "흡수", "특수", "다수", "소수", "홀수", "짝수", "수수",
+})
+# '수' 앞에서 용언의 관형형(-ㄹ/-을)으로 자주 쓰이는 말. 이 말로 끝날 때만 '수'를 띄운다
+_SU_MODIFIERS = (
+    "을", "를", "할", "갈", "볼", "알", "될", "올", "줄", "살", "쓸", "놀", "울", "열", "걸", "밀", "풀",
+    "팔", "뺄", "찰", "칠", "쉴", "잘", "들", "릴", "킬", "마실", "가질", "버틸", "견딜", "고칠", "바꿀",
+    "느낄", "즐길", "이길", "도울", "만날", "배울", "보낼", "나눌", "그릴",
+)
+# '수' 뒤에 이런 말이 올 때만 의존 명사로 본다 (물수건, 갈수록 같은 말과 구분)
+_SU_FOLLOW = re.compile(r"$|(?:[가도는를밖]|조차|만)(?:$|[.,!?])|있|없")
+_TTAE_FOLLOW = re.compile(r"$|[.,!?]|(?:는|도|에|부터|까지|마다|의|가|면)")
+
+# 문장부호 뒤에 띄어쓰기 없이 바로 이어진 글자 (했다.그래서 -> 했다. 그래서)
+_PUNCT_NO_SPACE = re.compile(r"([가-힣][.!?,])(?=[가-힣])")
+_DOUBLE_COMMA = re.compile(r",{2,}")
+
+# 자주 틀리는 맞춤법: (틀린 표기, 바른 표기, 설명)
+SPELLING_RULES: List[Tuple[str, str, str]] = [
+    ("아니였", "아니었", "'아니다'의 과거형은 '아니었다'입니다."),
+    ("됬", "됐", "'되었'이 줄어든 말은 '됐'입니다."),
+    ("않돼", "안 돼", "부정의 '안'과 '되다'는 띄어 쓰며, '않'은 '아니하'의 준말입니다."),
+    ("않되", "안 되", "부정의 '안'과 '되다'는 띄어 쓰며, '않'은 '아니하'의 준말입니다."),
+    ("되요", "돼요", "'되어요'가 줄어든 말은 '돼요'입니다."),
+    ("몇일", "며칠", "'며칠'이 바른 표기입니다."),
+    ("어떻해", "어떡해", "'어떻게 해'가 줄어든 말은 '어떡해'입니다."),
+    ("왠만", "웬만", "'웬만하다'가 바른 표기입니다."),
+    ("금새", "금세", "'금시에'가 줄어든 말은 '금세'입니다."),
+    ("희안", "희한", "'희한하다'가 바른 표기입니다."),
+    ("역활", "역할", "'역할'이 바른 표기입니다."),
+    ("설겆이", "설거지", "'설거지'가 바른 표기입니다."),
+    ("오랫만", "오랜만", "'오래간만'이 줄어든 말은 '오랜만'입니다."),
+    ("어의없", "어이없", "'어이없다'가 바른 표기입니다."),
+    ("일일히", "일일이", "'-이'로 끝나는 부사입니다."),
+    ("깨끗히", "깨끗이", "'-이'로 끝나는 부사입니다."),
+    ("곰곰히", "곰곰이", "'-이'로 끝나는 부사입니다."),
+    ("틈틈히", "틈틈이", "'-이'로 끝나는 부사입니다."),
+    ("번번히", "번번이", "'-이'로 끝나는 부사입니다."),
+]
+_SPELLING = re.compile("|".join(re.escape(wrong) for wrong, _, _ in SPELLING_RULES))
+_SPELLING_MAP = {wrong: (right, why) for wrong, right, why in SPELLING_RULES}
+# ㄹ 받침 뒤의 '-께(요)'는 '-게(요)'로 쓴다 (할께요 -> 할게요)
+_L_KKE = re.compile(r"([가-힣])께(?=요|$|[.,!?])")
+
+# 강조하려고 일부러 반복하는 말은 반복 오류로 보지 않는다
+_REPEAT_ALLOWED = frozenset({"정말", "너무", "아주", "매우", "빨리", "천천히", "하나", "조금", "점점", "자꾸", "계속", "많이", "더"})
+_WORD = re.compile(r"\S+")
+_TRAILING_PUNCT = re.compile(r"[.,!?]+$")
+
+def _is_su_modifier(head: str) -> bool:
+    # head는 '수'까지 포함한 앞부분. 두 글자 이상의 관형형(마실)은 명사(실수)보다 먼저 본다
+    stem = head[:-1]
+    if any(len(modifier) > 1 and stem.endswith(modifier) for modifier in _SU_MODIFIERS):
+        return True
+    if any(head.endswith(noun) for noun in _SU_NOUNS):
+        return False
+    return stem.endswith(_SU_MODIFIERS)
+
+def _fix_dependent_nouns(token: str) -> Tuple[str, Optional[str]]:
+    if not _DEPENDENT_NOUN.search(token) or any(exception in token for exception in _DEPENDENT_NOUN_EXCEPTIONS):
+        return token, None
+
+    def replace(match: re.Match) -> str:
+        before, noun = match.group(1), match.group(2)
+        jong = _jong(before)
+        rest = token[match.end():]
+        if noun == "것" and jong in (_JONG_N, _JONG_L):
+            return f"{before} {noun}"
+        if noun == "뿐" and jong == _JONG_L:
+            return f"{before} {noun}"
+        if noun == "수" and jong == _JONG_L and _SU_FOLLOW.match(rest) and _is_su_modifier(token[:match.end()]):
+            # '할수있다'처럼 뒤의 '있다/없다'도 붙었으면 함께 띄운다
+            return f"{before} {noun}"
+        if noun == "때" and jong == _JONG_L and _TTAE_FOLLOW.match(rest):
+            return f"{before} {noun}"
+        if noun == "만큼" and jong in (_JONG_N, _JONG_L):
+            return f"{before} {noun}"
+        return match.group(0)
+
+    fixed = _DEPENDENT_NOUN.sub(replace, token)
+    fixed = re.sub(r"(?<= 수)(?=있|없)", " ", fixed)
+    if fixed == token:
+        return token, None
+    return fixed, "의존 명사(것, 수, 때, 뿐, 만큼)는 앞말과 띄어 씁니다."
+
+def _fix_punctuation(token: str) -> Tuple[str, Optional[str]]:
+    if "," not in token and not _PUNCT_NO_SPACE.search(token):
+        return token, None
+    fixed = _DOUBLE_COMMA.sub(",", token)
+    fixed = _PUNCT_NO_SPACE.sub(r"\1 ", fixed)
+    if fixed == token:
+        return token, None
+    return fixed, "문장부호 뒤에는 한 칸 띄우고, 쉼표는 한 번만 씁니다."
+
+def _fix_spelling(token: str) -> Tuple[str, Optional[str]]:
+    if not _SPELLING.search(token) and "께" not in token:
+        return token, None
+    reasons = []
+
+    def replace(match: re.Match) -> str:
+        right, why = _SPELLING_MAP[match.group(0)]
+        reasons.append(why)
+        return right
+
+    fixed = _SPELLING.sub(replace, token)
+
+    def replace_kke(match: re.Match) -> str:
+        if _jong(match.group(1)) != _JONG_L:
+            return match.group(0)
+        reasons.append("'-ㄹ게'는 '께'가 아니라 '게'로 씁니다.")
+        return f"{match.group(1)}게"
+
+    fixed = _L_KKE.sub(replace_kke, fixed)
+    if fixed == token:
+        return token, None
+    return fixed, " ".join(dict.fromkeys(reasons))
+
+TOKEN_RULES: List[Callable[[str], Tuple[str, Optional[str]]]] = [_fix_spelling, _fix_dependent_nouns, _fix_punctuation]
+
+def _correction(original: str, suggested: str, explanation: str) -> CorrectionCreate:
+    return CorrectionCreate(
+        essay_id="",  # Will be set in the router
+        category=CorrectionCategory.GRAMMAR,
+        original_text=original,
+        suggested_text=suggested,
+        explanation=explanation,
+    )
+
+def precheck(plain_text: str) -> List[CorrectionCreate]:
+    # html_to_plain_text 결과(문단은 줄바꿈, 문단 안 공백은 한 칸)를 어절 단위로 훑는다
+    found = []
+    offset = 0
+    for line in plain_text.split("\n"):
+        matches = list(_WORD.finditer(line))
+        tokens = [m.group(0) for m in matches]
+        used = [False] * len(tokens)
+        for i, token in enumerate(tokens):
+            fixed, reasons = token, []
+            for rule in TOKEN_RULES:
+                fixed, reason = rule(fixed)
+                if reason:
+                    reasons.append(reason)
+            if fixed != token:
+                used[i] = True
+                found.append((offset + matches[i].start(), _correction(token, fixed, " ".join(reasons))))
+        for i in range(1, len(tokens)):
+            if used[i] or used[i - 1]:
+                continue
+            previous, token = tokens[i - 1], tokens[i]
+            # 문장부호 앞의 띄어쓰기 (했다 . -> 했다.)
+            if re.fullmatch(r"[.,!?]+", token):
+                used[i] = used[i - 1] = True
+                found.append((offset + matches[i - 1].start(), _correction(f"{previous} {token}", f"{previous}{token}", "문장부호는 앞말에 붙여 씁니다.")))
+                continue
+            # 같은 어절을 연달아 쓴 경우 (나는 나는 -> 나는)
+            bare = _TRAILING_PUNCT.sub("", token)
+            if previous == bare and len(bare) >= 2 and re.search(r"[가-힣]", bare) and bare not in _REPEAT_ALLOWED:
+                used[i] = used[i - 1] = True
+                found.append((offset + matches[i - 1].start(), _correction(f"{previous} {token}", token, "같은 말이 두 번 반복되었습니다.")))
+        offset += len(line) + 1
+    # 모델 첨삭처럼 에세이에 나오는 순서대로 돌려준다
+    found.sort(key=lambda item: item[0])
+    return [correction for _, correction in found]
+
+def handled_summary(corrections: List[CorrectionCreate]) -> List[str]:
+    # 프롬프트에 넘길 "이미 고친 항목" 목록 (같은 실수가 여러 번 나와도 한 번만 적는다)
+    return list(dict.fromkeys(f"'{c.original_text}' → '{c.suggested_text}'" for c in corrections))
@@ -0,0 +1,146 @@
+import json
+from typing import List, Optional
+
+# 프롬프트 내용을 바꾸면 올려서 이전 캐시 결과를 무효화한다
+PROMPT_VERSION = "v3"
+
+# OpenAI는 요청 앞부분(1024토큰 이상)이 이전 요청과 글자 단위로 같으면 그 부분을 캐시에서 읽는다.
+# 그래서 바뀌지 않는 지시문/스키마/예시를 모두 앞에 두고, 에세이는 마지막 메시지에만 넣는다.
+# 아래 문자열에는 요청마다 달라지는 값(날짜, 사용자 이름 등)을 절대 넣지 않는다.
+CORRECTION_SYSTEM_PROMPT = """당신은 엄격한 한국어 에세이 첨삭자입니다. You are a strict Korean essay editor. Always suggest improvements, even for minor issues.
+
+학생이 쓴 에세이를 읽고 다음 두 가지를 작성합니다.
+
+1. corrections: 글의 흐름, 논리, 구조, 명백한 문법 오류 등에서 개선이 필요한 점을 최대한 많이 제안합니다. 각 문제마다 별도의 correction을 만듭니다.
+2. overall_feedback: 이 글의 전체적인 강점, 부족한 점, 조언 등 총평을 한 문단으로 작성합니다.
+
+첨삭 규칙:
+- original_text에는 에세이에 실제로 있는 표현을 한 글자도 바꾸지 말고 그대로 옮겨 적습니다. 띄어쓰기와 문장부호도 원문 그대로 둡니다.
+- original_text는 고칠 부분을 알아볼 수 있는 가장 짧은 구간(어절이나 구, 길어도 한 문장)으로 잡습니다. 여러 문장을 한 번에 묶지 않습니다.
+- 같은 표현이 여러 번 나와서 모두 고쳐야 하면 각각 따로 correction을 만듭니다.
+- suggested_text는 original_text를 그대로 바꿔 넣을 수 있는 형태로 씁니다.
+- explanation은 학생이 이해할 수 있도록 존댓말로 한두 문장으로 씁니다. 문법 용어를 쓸 때는 짧은 예를 덧붙입니다.
+- 맞춤법, 띄어쓰기, 조사, 어미, 높임 표현, 문장 호응(주어-서술어, 부사-서술어), 시제 일치는 grammar로 분류합니다.
+- 문단 구성, 논지 전개, 근거의 부족, 불필요한 반복, 문장 사이 연결, 결론의 설득력은 structure로 분류합니다.
+- 글쓴이의 주장이나 생각 자체를 바꾸라고 하지 않습니다. 더 잘 드러나도록 표현과 구성을 다듬는 제안만 합니다.
+- 에세이에 없는 내용을 original_text로 만들어 내지 않습니다.
+- 이미 올바른 표현은 고치지 않습니다.
+- 사용자가 "자동 검사로 이미 고친 항목"을 함께 보내면, 그 항목과 그와 같은 종류의 띄어쓰기·문장부호·반복·맞춤법 오류는 다시 지적하지 않습니다. 대신 문장 호응, 논지 전개, 문장 사이 연결 같은 structure 첨삭에 집중합니다.
+
+각 첨삭은 아래 정보를 포함해야 합니다:
+- category: 'structure' 또는 'grammar' 중 하나
+- original_text: 원본 텍스트
+- suggested_text: 수정 제안
+- explanation: 수정 이유
+
+응답은 반드시 다음 JSON 스키마를 따르는 JSON 객체 하나여야 하며, JSON 밖에 다른 글을 쓰지 않습니다:
+{
+    "type": "object",
+    "properties": {
+        "corrections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "category": {"type": "string", "enum": ["structure", "grammar"]},
+                    "original_text": {"type": "string"},
+                    "suggested_text": {"type": "string"},
+                    "explanation": {"type": "string"}
+                },
+                "required": ["category", "original_text", "suggested_text", "explanation"]
+            }
+        },
+        "overall_feedback": {"type": "string"}
+    },
+    "required": ["corrections", "overall_feedback"]
+}
+
+corrections를 먼저 쓰고 overall_feedback을 마지막에 씁니다. 첨삭은 에세이에 나오는 순서대로 나열합니다.
+사용자는 "텍스트:" 다음 줄부터 에세이 본문을 보냅니다. 문단은 줄바꿈으로 구분됩니다.
+자동 검사 결과가 있으면 "텍스트:" 앞에 "자동 검사로 이미 고친 항목:" 목록으로 먼저 보냅니다."""
+
+FEW_SHOT_EXAMPLES = [
+    (
+        "나는 어제 도서관에 갔다. 책을 읽는것은 재미있다 왜냐하면 새로운 것을 알수 있다.\n"
+        "그래서 나는 앞으로 매주 도서관에 갈것이다. 도서관은 조용하고 책이 많이 있다.",
+        {
+            "corrections": [
+                {
+                    "category": "grammar",
+                    "original_text": "읽는것은",
+                    "suggested_text": "읽는 것은",
+                    "explanation": "'것'은 의존 명사이므로 앞말과 띄어 씁니다. 예: 먹는 것, 가는 것",
+                },
+                {
+                    "category": "grammar",
+                    "original_text": "재미있다 왜냐하면 새로운 것을 알수 있다.",
+                    "suggested_text": "재미있다. 왜냐하면 새로운 것을 알 수 있기 때문이다.",
+                    "explanation": "'왜냐하면'은 '~때문이다'와 호응해야 자연스럽습니다. 또 '알 수'처럼 '수'는 띄어 씁니다.",
+                },
+                {
+                    "category": "grammar",
+                    "original_text": "갈것이다",
+                    "suggested_text": "갈 것이다",
+                    "explanation": "의존 명사 '것'은 띄어 씁니다.",
+                },
+                {
+                    "category": "structure",
+                    "original_text": "도서관은 조용하고 책이 많이 있다.",
+                    "suggested_text": "조용하고 책이 많은 도서관은 나에게 가장 좋은 공부 장소이다.",
+                    "explanation": "결론 뒤에 근거가 덧붙어 흐름이 어색합니다. 도서관의 장점은 앞에서 이유로 제시하거나, 마지막 문장이 글의 결론을 정리하도록 바꾸면 좋습니다.",
+                },
+            ],
+            "overall_feedback": "도서관에 다녀온 경험에서 독서의 즐거움으로 자연스럽게 이어지는 점이 좋습니다. 다만 띄어쓰기 실수가 반복되고, 이유를 말하는 문장의 호응이 맞지 않습니다. 도서관이 좋은 이유를 구체적인 경험과 함께 한 문단으로 더 풀어 쓰고, 마지막 문장은 앞으로의 다짐으로 마무리해 보세요.",
+        },
+    ),
+    (
+        "환경을 보호해야 한다. 플라스틱을 많이 쓰면 바다가 오염 된다.\n"
+        "우리 반은 텀블러를 쓰기로 했다. 선생님께서 좋은 생각이라고 말했다.\n"
+        "환경을 보호해야 한다.",
+        {
+            "corrections": [
+                {
+                    "category": "grammar",
+                    "original_text": "오염 된다",
+                    "suggested_text": "오염된다",
+                    "explanation": "'-되다'가 붙어 한 단어가 된 동사는 붙여 씁니다. 예: 사용되다, 발견되다",
+                },
+                {
+                    "category": "grammar",
+                    "original_text": "선생님께서 좋은 생각이라고 말했다.",
+                    "suggested_text": "선생님께서 좋은 생각이라고 말씀하셨다.",
+                    "explanation": "주어를 '께서'로 높였으므로 서술어도 '말씀하셨다'로 높여야 호응이 맞습니다.",
+                },
+                {
+                    "category": "structure",
+                    "original_text": "환경을 보호해야 한다. 플라스틱을 많이 쓰면 바다가 오염 된다.",
+                    "suggested_text": "플라스틱을 많이 쓰면 바다가 오염되기 때문에 우리는 환경을 보호해야 한다.",
+                    "explanation": "주장과 근거가 따로 떨어져 있어 연결이 약합니다. 근거를 주장과 한 문장으로 이어 주면 첫 문단의 논지가 분명해집니다.",
+                },
+                {
+                    "category": "structure",
+                    "original_text": "환경을 보호해야 한다.",
+                    "suggested_text": "작은 실천이 모이면 우리 바다를 지킬 수 있다고 생각한다.",
+                    "explanation": "첫 문장을 그대로 반복해 결론이 새로운 내용을 주지 못합니다. 우리 반의 실천이 어떤 의미가 있는지 정리하는 문장으로 끝맺어 보세요.",
+                },
+            ],
+            "overall_feedback": "주제가 분명하고 우리 반의 실천 사례를 든 점이 좋습니다. 그러나 주장과 근거가 짧은 문장으로 끊어져 있어 논리의 흐름이 약하고, 결론이 첫 문장을 반복합니다. 근거를 구체적인 자료나 경험으로 보강하고, 마지막 문단에서 실천의 의미를 정리해 보세요.",
+        },
+    ),
+]
+
+def essay_message(clean_text: str, handled: Optional[List[str]] = None) -> str:
+    # 자동 검사 결과도 요청마다 달라지므로 에세이와 같은 마지막 메시지에 넣는다
+    if not handled:
+        return f"텍스트:\n{clean_text}"
+    items = "\n".join(f"- {item}" for item in handled)
+    return f"자동 검사로 이미 고친 항목:\n{items}\n\n텍스트:\n{clean_text}"
+
+def build_correction_messages(clean_text: str, handled: Optional[List[str]] = None) -> List[dict]:
+    # [고정된 system + 예시 대화] + [에세이] 순서: 마지막 메시지만 요청마다 달라진다
+    messages = [{"role": "system", "content": CORRECTION_SYSTEM_PROMPT}]
+    for essay, answer in FEW_SHOT_EXAMPLES:
+        messages.append({"role": "user", "content": essay_message(essay)})
+        messages.append({"role": "assistant", "content": json.dumps(answer, ensure_ascii=False)})
+    messages.append({"role": "user", "content": essay_message(clean_text, handled)})
+    return messages
@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+from dotenv import load_dotenv
+from .metrics import LLM_QUEUE_DEPTH
+
+load_dotenv()
+
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+# 대기열이 이보다 길거나 예상 대기 시간이 LLM_MAX_WAIT(초)를 넘으면 학생 요청은 429로 돌려보낸다
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "200"))
+LLM_MAX_WAIT = float(os.getenv("LLM_MAX_WAIT", "30"))
+# 토큰 추정치: 한국어는 대략 1~2글자당 1토큰
+LLM_CHARS_PER_TOKEN = float(os.getenv("LLM_CHARS_PER_TOKEN", "1.5"))
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1200"))
+
+# 숫자가 작을수록 먼저 처리된다
+INTERACTIVE = 0
+BULK = 1
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+_may_reject: ContextVar[bool] = ContextVar("llm_may_reject", default=True)
+
+@contextmanager
+def request_class(priority: int, may_reject: bool = True):
+    # 이 블록 안에서(그리고 여기서 만든 task 안에서) 일어나는 모델 호출의 우선순위를 정한다
+    priority_token = _priority.set(priority)
+    reject_token = _may_reject.set(may_reject)
+    try:
+        yield
+    finally:
+        _priority.reset(priority_token)
+        _may_reject.reset(reject_token)
+
+def may_reject_current() -> bool:
+    # 지금 요청이 429로 되돌려받아도 되는지 (대량/백그라운드 작업은 False로 들어온다)
+    return _may_reject.get()
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float, queue_position: int = 0, message: str = "요청이 많아 잠시 후 다시 시도해 주세요."):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.queue_position = queue_position
+        self.message = message
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.rate = refill_per_second
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        if amount <= self.tokens:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        # 실제 사용량이 추정보다 적거나 많으면 보정한다 (음수 잔고 = 빚)
+        self._refill()
+        self.tokens = max(-self.capacity, min(self.capacity, self.tokens + amount))
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+def estimate_tokens(messages: List[dict], max_output_tokens: Optional[int] = None) -> int:
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return math.ceil(chars / LLM_CHARS_PER_TOKEN) + (max_output_tokens or LLM_EXPECTED_OUTPUT_TOKENS)
+
+class LLMScheduler:
+    # 분당 요청 수(RPM)와 분당 토큰 수(TPM) 두 버킷이 모두 허락할 때
+    # 우선순위가 높은 요청부터 하나씩 내보낸다
+    def __init__(self, rpm: int, tpm: int, max_queue: int = LLM_QUEUE_MAX, max_wait: float = LLM_MAX_WAIT):
+        self.requests = TokenBucket(rpm, rpm / 60)
+        self.tokens = TokenBucket(tpm, tpm / 60)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def queue_depth(self) -> int:
+        return sum(1 for entry in self._heap if not entry[3].done())
+
+    def estimate_wait(self, tokens: int, priority: int) -> tuple:
+        ahead = [entry for entry in self._heap if entry[0] <= priority and not entry[3].done()]
+        wait = max(
+            self.requests.time_until(len(ahead) + 1),
+            self.tokens.time_until(sum(entry[2] for entry in ahead) + tokens),
+        )
+        return wait, len(ahead) + 1
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens),
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+        }
+
+    async def acquire(self, tokens: int, priority: Optional[int] = None, may_reject: Optional[bool] = None) -> int:
+        priority = _priority.get() if priority is None else priority
+        may_reject = _may_reject.get() if may_reject is None else may_reject
+        # 버킷 용량보다 큰 요청은 영원히 통과하지 못하므로 용량으로 자른다
+        tokens = min(tokens, int(self.tokens.capacity))
+        wait, position = self.estimate_wait(tokens, priority)
+        if may_reject and (self.queue_depth() >= self.max_queue or wait > self.max_wait):
+            raise RateLimitExceeded(retry_after=wait, queue_position=position)
+        if wait <= 0 and self.queue_depth() == 0:
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            return tokens
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), tokens, future))
+        LLM_QUEUE_DEPTH.set(self.queue_depth())
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+        return tokens
+
+    async def _dispatch(self) -> None:
+        while self._heap:
+            priority, _, tokens, future = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                LLM_QUEUE_DEPTH.set(self.queue_depth())
+                continue
+            wait = max(self.requests.time_until(1), self.tokens.time_until(tokens))
+            if wait <= 0:
+                heapq.heappop(self._heap)
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+                future.set_result(None)
+                LLM_QUEUE_DEPTH.set(self.queue_depth())
+                continue
+            # 더 급한 요청이 들어오면 깨어나서 맨 앞을 다시 본다
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    @asynccontextmanager
+    async def slot(self, tokens: int):
+        # 스트리밍처럼 블록이 끝날 때 사용량을 모르면 total_tokens를 비워 두고 나중에 settle을 부른다
+        reserved = await self.acquire(tokens)
+        usage = {"reserved": reserved, "total_tokens": None}
+        yield usage
+        if usage["total_tokens"] is not None:
+            self.settle(reserved, usage["total_tokens"])
+
+    def settle(self, reserved: int, used: int) -> None:
+        # 예약한 토큰과 실제 사용량의 차이를 버킷에 돌려준다 (더 썼으면 빚으로 남는다)
+        self.tokens.refund(reserved - used)
+
+    def provider_limited(self, retry_after: Optional[float]) -> RateLimitExceeded:
+        # OpenAI가 429를 돌려주면 버킷을 비워 다른 요청도 잠시 멈추게 한다
+        self.tokens.drain()
+        self.requests.drain()
+        return RateLimitExceeded(retry_after=retry_after or 20, queue_position=self.queue_depth())
+
+scheduler = LLMScheduler(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT)
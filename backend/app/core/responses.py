@@ -0,0 +1,7 @@
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+def trusted_json(data, response: Response) -> ORJSONResponse:
+    # response_model과 같은 컬럼만 골라 읽은 DB 행은 pydantic 검증과 재직렬화를 건너뛰고 바로 내보낸다.
+    # 엔드포인트가 받은 response에 붙인 헤더(X-Next-Cursor, ETag 등)는 그대로 옮긴다
+    return ORJSONResponse(data, headers=dict(response.headers))
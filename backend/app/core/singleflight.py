@@ -0,0 +1,82 @@
+import asyncio
+import fcntl
+import hashlib
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from .cache import SQLiteCache
+
+load_dotenv()
+
+# local: 프로세스 안에서만 합친다
+# file: 파일 락으로 여러 워커 프로세스 사이에서도 한 번만 실행하고 결과를 공유한다
+SINGLEFLIGHT_MODE = os.getenv("SINGLEFLIGHT_MODE", "local")
+SINGLEFLIGHT_LOCK_DIR = os.getenv("SINGLEFLIGHT_LOCK_DIR", "/tmp/berryessay-locks")
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv("SINGLEFLIGHT_RESULT_TTL", "120"))
+# 다른 워커가 락을 쥐고 있으면 이 간격(초)으로 다시 시도하고, 이 시간(초)이 지나도 못 얻으면 포기한다
+SINGLEFLIGHT_LOCK_POLL = float(os.getenv("SINGLEFLIGHT_LOCK_POLL", "0.05"))
+SINGLEFLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLEFLIGHT_LOCK_TIMEOUT", "180"))
+
+@asynccontextmanager
+async def file_lock(path: str, timeout: float = SINGLEFLIGHT_LOCK_TIMEOUT, poll: float = SINGLEFLIGHT_LOCK_POLL):
+    # 기다리는 동안 스레드를 붙잡지 않도록 논블로킹 flock을 이벤트 루프에서 반복해서 시도한다
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {path}")
+                await asyncio.sleep(poll)
+        yield
+    finally:
+        os.close(fd)
+
+class SingleFlight:
+    # 같은 key로 동시에 들어온 호출은 처음 호출(leader)의 결과를 함께 기다린다.
+    # leader 요청이 끊겨도 작업은 shield로 보호되어 나머지 호출자에게 결과가 전달된다.
+    def __init__(self, lock_dir: Optional[str] = None, result_ttl: float = SINGLEFLIGHT_RESULT_TTL):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.lock_dir = lock_dir
+        self.result_ttl = result_ttl
+        self._results = None
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+            # 락을 기다리던 다른 워커가 앞선 워커의 결과를 읽을 수 있도록 공유 파일에 잠시 보관한다
+            self._results = SQLiteCache(os.path.join(lock_dir, "results.sqlite3"), ttl=result_ttl)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lead(key, fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _lead(self, key: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        if self.lock_dir is None:
+            return await fn()
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        # 락을 기다리기 시작한 뒤에 끝난 결과만 나눠 갖는다. 앞 호출이 끝난 뒤에 따로 들어온 요청은
+        # local 모드처럼 처음부터 다시 실행한다 (같은 글을 다시 첨삭하면 "변경된 내용이 없습니다"가 되도록)
+        waiting_since = time.time()
+        async with file_lock(os.path.join(self.lock_dir, f"{digest}.lock")):
+            cached = await self._results.get(digest)
+            if cached is not None and cached["finished_at"] >= waiting_since:
+                return cached["result"]
+            result = await fn()
+            await self._results.set(digest, {"finished_at": time.time(), "result": result})
+            return result
+
+def create_singleflight() -> SingleFlight:
+    if SINGLEFLIGHT_MODE == "file":
+        return SingleFlight(lock_dir=SINGLEFLIGHT_LOCK_DIR)
+    return SingleFlight()
@@ -1,6 +1,10 @@
-from supabase import create_client
+from postgrest import AsyncPostgrestClient
+from typing import Optional
+import httpx
 import os
 from dotenv import load_dotenv
+from .timing import track
+from .metrics import SUPABASE_SECONDS
 
 load_dotenv()
 
@@ -10,8 +14,55 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in .env file")
 
-try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-except Exception as e:
-    print(f"Failed to create Supabase client: {e}")
-    raise 
\ No newline at end of file
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "20"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    # 워커당 하나의 HTTP/2 커넥션 풀을 공유한다
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            proxy=proxy,
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            ),
+        )
+
+_client: Optional[PooledPostgrestClient] = None
+
+def get_db() -> PooledPostgrestClient:
+    global _client
+    if _client is None:
+        _client = PooledPostgrestClient(
+            f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+            headers={
+                "apiKey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+            },
+            timeout=SUPABASE_TIMEOUT,
+        )
+    return _client
+
+async def close_db():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def returning(query, columns: str):
+    # insert/update가 돌려주는 행의 컬럼을 고른다 (이 버전의 빌더에는 insert/update 뒤에 붙는 .select()가 없다)
+    query.params = query.params.set("select", "".join(columns.split()))
+    return query
+
+async def execute(query):
+    # 모든 PostgREST 호출이 지나가는 지점 (요청별 호출 횟수와 시간을 여기서 잰다)
+    with SUPABASE_SECONDS.labels(query.http_method).time():
+        async with track("db"):
+            return await query.execute()
@@ -0,0 +1,42 @@
+import re
+from .html_text import html_to_plain_text
+
+# 문장 끝: 마침표/물음표/느낌표(연속 가능) 뒤에 닫는 따옴표·괄호가 올 수 있다
+_SENTENCE_END = re.compile(r"[.!?。…]+[\"'”’)\]]*(?=\s|$)")
+# 어절로 셀 토큰은 글자나 숫자를 하나 이상 포함해야 한다 ("-", "…" 같은 기호만 있는 토큰 제외)
+_WORDLIKE = re.compile(r"\w")
+
+def count_words(plain_text: str) -> int:
+    # 한국어는 띄어쓰기 단위(어절)로 센다
+    return sum(1 for token in plain_text.split() if _WORDLIKE.search(token))
+
+def count_sentences(plain_text: str) -> int:
+    count = 0
+    for line in plain_text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        ends = list(_SENTENCE_END.finditer(line))
+        count += len(ends)
+        # 마침표 없이 끝난 마지막 문장도 하나로 센다
+        tail = line[ends[-1].end():] if ends else line
+        if _WORDLIKE.search(tail):
+            count += 1
+    return count
+
+def compute_text_stats(html: str) -> dict:
+    plain_text = html_to_plain_text(html)
+    return {
+        "plain_text": plain_text,
+        # 공백 포함 글자 수 (문단 구분 줄바꿈은 제외)
+        "char_count": len(plain_text) - plain_text.count("\n"),
+        "word_count": count_words(plain_text),
+        "sentence_count": count_sentences(plain_text),
+    }
+
+def essay_plain_text(essay: dict) -> str:
+    # 저장된 plain_text가 있으면 그대로 쓰고, 백필 전의 오래된 행만 다시 변환한다
+    plain_text = essay.get("plain_text")
+    if plain_text is not None:
+        return plain_text
+    return html_to_plain_text(essay.get("content") or "")
@@ -0,0 +1,74 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 응답에 Server-Timing 헤더를 붙일지 (DB/모델 호출 횟수와 시간이 브라우저 개발자 도구에 보인다)
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+# 요청 하나가 Supabase를 이보다 많이 부르면 WARNING을 남긴다. "경로 접두사=횟수"를 쉼표로 나열하면 경로별로 다르게 둔다.
+# 예: "/api/admin/corrections=200"
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "5"))
+QUERY_BUDGETS = os.getenv("QUERY_BUDGETS", "")
+
+# 호출 종류. db: Supabase(PostgREST), llm: 모델 API
+KINDS = ("db", "llm")
+_UNITS = {"db": "queries", "llm": "calls"}
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counts: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self.seconds: Dict[str, float] = {kind: 0.0 for kind in KINDS}
+
+    def record(self, kind: str, seconds: float) -> None:
+        self.counts[kind] += 1
+        self.seconds[kind] += seconds
+
+    def as_fields(self) -> dict:
+        fields = {}
+        for kind in KINDS:
+            fields[f"{kind}_count"] = self.counts[kind]
+            fields[f"{kind}_ms"] = round(self.seconds[kind] * 1000, 1)
+        return fields
+
+    def server_timing(self) -> str:
+        parts = [
+            f'{kind};dur={self.seconds[kind] * 1000:.1f};desc="{_UNITS[kind]}={self.counts[kind]}"'
+            for kind in KINDS if self.counts[kind]
+        ]
+        parts.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+# 요청을 처리하는 동안만 값이 있다. 요청에서 띄운 태스크도 같은 객체에 더한다
+request_stats_var: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def _parse_budgets(value: str) -> Dict[str, int]:
+    budgets = {}
+    for item in value.split(","):
+        prefix, _, budget = item.strip().partition("=")
+        if prefix and budget:
+            budgets[prefix] = int(budget)
+    return budgets
+
+_QUERY_BUDGETS = _parse_budgets(QUERY_BUDGETS)
+
+def query_budget(path: str) -> int:
+    matches = [prefix for prefix in _QUERY_BUDGETS if path.startswith(prefix)]
+    return _QUERY_BUDGETS[max(matches, key=len)] if matches else QUERY_BUDGET
+
+@asynccontextmanager
+async def track(kind: str):
+    # 요청 밖(백그라운드 작업, 스크립트)에서는 아무것도 하지 않는다
+    stats = request_stats_var.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.record(kind, time.perf_counter() - started)
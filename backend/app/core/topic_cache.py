@@ -0,0 +1,78 @@
+import os
+from typing import Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from .cache import CacheStats, create_cache
+from .http_cache import PRIVATE_REVALIDATE, compute_etag
+from .singleflight import SingleFlight
+from ..repositories import essay_topics as topics_repo
+
+load_dotenv()
+
+# memory | redis | none. 워커가 여럿이면 redis로 두어야 어드민 수정이 모든 워커에 바로 반영된다
+TOPIC_CACHE_BACKEND = os.getenv("TOPIC_CACHE_BACKEND", "memory")
+TOPIC_CACHE_TTL = float(os.getenv("TOPIC_CACHE_TTL", "300"))
+TOPIC_CACHE_URL = os.getenv("TOPIC_CACHE_URL", "redis://localhost:6379/0")
+# 브라우저/CDN이 백엔드에 묻지 않고 재사용하는 시간(초). 어드민이 바꾼 주제는 학생 화면에 최대 이만큼 늦게 보인다
+TOPIC_HTTP_MAX_AGE = int(os.getenv("TOPIC_HTTP_MAX_AGE", "60"))
+
+PUBLIC_CACHE_CONTROL = f"public, max-age={TOPIC_HTTP_MAX_AGE}, stale-while-revalidate={TOPIC_HTTP_MAX_AGE * 5}"
+# 어드민 화면은 저장 직후 바뀐 내용을 봐야 하므로 매번 ETag로 확인한다
+ADMIN_CACHE_CONTROL = PRIVATE_REVALIDATE
+
+_cache = None
+_cache_ready = False
+stats = CacheStats("topic")
+# 캐시가 비었을 때 동시에 들어온 요청은 DB를 한 번만 읽는다
+_flight = SingleFlight()
+# 무효화할 때마다 올린다. 읽는 도중에 주제가 바뀌었으면 읽은 값을 캐시에 넣지 않는다
+_generation = 0
+
+def get_cache():
+    global _cache, _cache_ready
+    if not _cache_ready:
+        _cache = create_cache(
+            TOPIC_CACHE_BACKEND,
+            ttl=TOPIC_CACHE_TTL,
+            maxsize=256,
+            url=TOPIC_CACHE_URL,
+            prefix="berryessay:topics:",
+        )
+        _cache_ready = True
+    return _cache
+
+async def _cached(key: str, load: Callable[[], Awaitable]) -> dict:
+    # {"data": DB에서 읽은 값, "etag": data의 ETag}
+    cache = get_cache()
+    if cache is not None:
+        value = await cache.get(key)
+        stats.record(value is not None)
+        if value is not None:
+            return value
+    generation = _generation
+    return await _flight.do(f"{generation}:{key}", lambda: _load_and_store(key, load, generation))
+
+async def _load_and_store(key: str, load: Callable[[], Awaitable], generation: int) -> dict:
+    data = await load()
+    value = {"data": data, "etag": compute_etag(data)}
+    cache = get_cache()
+    if cache is not None and generation == _generation:
+        await cache.set(key, value)
+    return value
+
+async def current_topic() -> dict:
+    return await _cached("current", topics_repo.get_current_topic)
+
+async def topic_list(cursor: Optional[str], limit: int) -> dict:
+    return await _cached(f"list:{cursor or ''}:{limit}", lambda: topics_repo.list_topics(cursor, limit))
+
+async def invalidate() -> None:
+    # 주제를 만들거나 고치거나 지운 뒤에 부른다
+    global _generation
+    _generation += 1
+    cache = get_cache()
+    if cache is not None:
+        await cache.clear()
+
+def cache_stats() -> dict:
+    cache = get_cache()
+    return {"backend": cache.name if cache else "none", **stats.as_dict()}
@@ -1,8 +1,38 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from .routers import essays, corrections, essay_topics, auth
+from .core.openai_client import close_client
+from .core.supabase import close_db
+from .core.jobs import job_queue
+from .core.batch import batch_runner
+from .core.log import RequestContextMiddleware, setup_logging, stop_logging
+from .core.compression import CompressionMiddleware
+from .core import metrics
 
-app = FastAPI()
+# print 대신 큐 기반 비동기 로거를 쓴다 (요청 처리 중에는 stdout에 직접 쓰지 않는다)
+setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    # 서버가 내려가 있던 동안 멈춘 일괄 첨삭을 이어서 본다
+    await batch_runner.start()
+    yield
+    await batch_runner.stop()
+    await job_queue.stop()
+    # 종료 시 공유 HTTP 커넥션 정리
+    await close_client()
+    await close_db()
+    metrics.mark_process_dead()
+    stop_logging()
+
+# 응답 JSON은 orjson으로 직렬화한다
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# 에세이 본문(HTML)과 읽을거리가 커서 응답을 압축한다 (br/gzip, 작은 응답과 SSE는 제외)
+app.add_middleware(CompressionMiddleware)
 
 # CORS 설정
 app.add_middleware(
@@ -17,8 +47,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Next-Cursor"],
 )
 
+# 요청마다 request id를 정해 모든 로그 줄에 싣는다
+app.add_middleware(RequestContextMiddleware)
+
+# 라우트별 응답 시간과 처리 중인 요청 수 (/metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # 라우터 등록
 app.include_router(auth.router)
 app.include_router(essays.router)
@@ -26,7 +63,16 @@ app.include_router(corrections.router)
 app.include_router(essay_topics.router)
 # 어드민용 essay-topic 라우터 등록
 app.include_router(essay_topics.admin_router)
+# 어드민용 일괄 첨삭 라우터 등록
+app.include_router(corrections.admin_router)
+# 어드민용 회원별 에세이 현황 라우터 등록
+app.include_router(essays.admin_router)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to BerryEssay API"} 
\ No newline at end of file
+    return {"message": "Welcome to BerryEssay API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    # Prometheus가 긁어 가는 엔드포인트. 워커가 여럿이면 PROMETHEUS_MULTIPROC_DIR로 합친다 (core/metrics.py)
+    return Response(metrics.render(), media_type=metrics.METRICS_CONTENT_TYPE) 
\ No newline at end of file
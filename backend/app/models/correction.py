@@ -1,4 +1,5 @@
 from pydantic import BaseModel, ConfigDict
+from typing import Optional
 from datetime import datetime
 from enum import Enum
 
@@ -14,6 +15,13 @@ class CorrectionCreate(BaseModel):
     original_text: str
     suggested_text: str
     explanation: str
+    # 서버가 찾아 둔 원문 위치: plain text 기준 [start, end), 에세이 HTML 기준 [html_start, html_end)
+    # match는 "exact" / "fuzzy", 찾지 못하면 모두 None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    html_start: Optional[int] = None
+    html_end: Optional[int] = None
+    match: Optional[str] = None
 
 class Correction(CorrectionCreate):
     id: str
@@ -25,10 +25,42 @@ class Essay(EssayBase):
     id: str
     user_id: str
     word_count: int
+    char_count: int = 0
+    sentence_count: int = 0
     created_at: datetime
     updated_at: datetime
     is_submitted: bool
     plain_text: Optional[str] = None
     topic_id: str
 
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class EssaySummary(BaseModel):
+    # 목록 화면용: 본문(content, plain_text) 대신 앞부분 미리보기만 담는다
+    id: str
+    user_id: str
+    title: str
+    daily_essay_date: date
+    topic_id: str
+    is_submitted: bool
+    word_count: int
+    char_count: int = 0
+    sentence_count: int = 0
+    preview: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class UserEssayStats(BaseModel):
+    # 어드민 회원별 에세이 현황 (supabase/migrations/20240810_admin_user_essay_stats.sql)
+    id: str
+    username: str
+    name: Optional[str] = None
+    role: str
+    created_at: datetime
+    essay_count: int
+    submitted_count: int
+    last_submitted_at: Optional[datetime] = None
+    session_count: int
+    word_total: int
@@ -17,6 +17,15 @@ class EssayTopic(EssayTopicBase):
 
     model_config = ConfigDict(from_attributes=True) 
 
+class EssayTopicSummary(BaseModel):
+    # 목록 화면용: 읽을거리(reading_material) 전체 대신 태그를 뺀 앞부분만 담는다
+    id: str
+    topic: str
+    is_active: bool = True
+    preview: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
 class EssayTopicUpdate(BaseModel):
     id: str
     topic: str
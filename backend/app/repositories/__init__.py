@@ -0,0 +1 @@
+# repositories package
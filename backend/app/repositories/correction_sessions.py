@@ -0,0 +1,51 @@
+from ..core.supabase import get_db, execute
+
+# 목록 응답에는 content_snapshot(본문 전체)을 싣지 않는다
+SESSION_COLUMNS = "id, essay_id, session_number, corrections, overall_feedback, metadata, created_at"
+
+async def list_session_numbers(essay_id: str) -> list:
+    result = await execute(
+        get_db().table("correction_sessions").select("session_number").eq("essay_id", essay_id).order("session_number")
+    )
+    return [s["session_number"] for s in result.data]
+
+async def list_sessions(essay_id: str) -> list:
+    result = await execute(
+        get_db().table("correction_sessions").select(SESSION_COLUMNS).eq("essay_id", essay_id).order("session_number")
+    )
+    return result.data
+
+async def get_latest_session(essay_id: str) -> dict:
+    result = await execute(
+        get_db().table("correction_sessions")
+        .select("session_number, corrections, overall_feedback, content_snapshot")
+        .eq("essay_id", essay_id)
+        .order("session_number", desc=True)
+        .limit(1)
+    )
+    return result.data[0] if result.data else None
+
+async def list_sessions_for(essay_ids: list) -> list:
+    # 여러 에세이의 회차 번호와 메타데이터를 한 번에 읽는다 (일괄 첨삭 결과를 넣기 전에 확인용)
+    result = await execute(
+        get_db().table("correction_sessions").select("essay_id, session_number, metadata").in_("essay_id", essay_ids)
+    )
+    return result.data
+
+async def create_session(
+    essay_id: str,
+    corrections: list,
+    overall_feedback: str,
+    content_snapshot: str,
+    metadata: dict,
+) -> int:
+    # 회차 번호 선택과 저장을 DB 함수 한 번으로 한다 (supabase/migrations/20240805_create_correction_session_rpc.sql).
+    # 회차가 다 찼으면 code P0001, 에세이가 없으면 P0002인 APIError가 난다
+    result = await execute(get_db().rpc("create_correction_session", {
+        "p_essay_id": essay_id,
+        "p_corrections": corrections,
+        "p_overall_feedback": overall_feedback,
+        "p_content_snapshot": content_snapshot,
+        "p_metadata": metadata,
+    }))
+    return result.data
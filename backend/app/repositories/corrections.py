@@ -0,0 +1,12 @@
+from ..core.supabase import get_db, execute
+
+async def insert_corrections(rows: list) -> list:
+    # 첨삭 여러 개를 한 번의 요청으로 넣는다
+    if not rows:
+        return []
+    result = await execute(get_db().table("corrections").insert(rows))
+    return result.data
+
+async def list_corrections(essay_id: str) -> list:
+    result = await execute(get_db().table("corrections").select("*").eq("essay_id", essay_id))
+    return result.data
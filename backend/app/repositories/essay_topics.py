@@ -0,0 +1,33 @@
+from typing import Optional
+from ..core.supabase import get_db, execute
+from ..core.pagination import keyset
+
+# 목록 조회용 컬럼 (reading_material은 상세 조회에서만 읽는다)
+SUMMARY_COLUMNS = "id, topic, is_active, preview, created_at, updated_at"
+
+async def list_topics(cursor: Optional[str], limit: int) -> list:
+    query = get_db().table("essay_topics").select(SUMMARY_COLUMNS)
+    result = await execute(keyset(query, cursor, limit))
+    return result.data
+
+async def get_topic(topic_id: str) -> Optional[dict]:
+    result = await execute(get_db().table("essay_topics").select("*").eq("id", topic_id))
+    return result.data[0] if result.data else None
+
+async def get_current_topic() -> Optional[dict]:
+    result = await execute(
+        get_db().table("essay_topics").select("*").eq("is_active", True).order("created_at", desc=True).limit(1)
+    )
+    return result.data[0] if result.data else None
+
+async def insert_topic(data: dict) -> dict:
+    result = await execute(get_db().table("essay_topics").insert(data))
+    return result.data[0]
+
+async def update_topic(topic_id: str, data: dict) -> Optional[dict]:
+    result = await execute(get_db().table("essay_topics").update(data).eq("id", topic_id))
+    return result.data[0] if result.data else None
+
+async def delete_topic(topic_id: str) -> list:
+    result = await execute(get_db().table("essay_topics").delete().eq("id", topic_id))
+    return result.data
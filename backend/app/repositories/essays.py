@@ -0,0 +1,73 @@
+from typing import Optional
+from ..core.supabase import get_db, execute
+from ..core.pagination import decode_cursor, keyset
+
+# 목록 조회용 컬럼 (content, plain_text는 상세 조회에서만 읽는다)
+SUMMARY_COLUMNS = "id, user_id, title, daily_essay_date, topic_id, is_submitted, word_count, char_count, sentence_count, preview, created_at, updated_at"
+
+async def insert_essay(data: dict) -> dict:
+    result = await execute(get_db().table("essays").insert(data))
+    return result.data[0]
+
+async def list_essays(user_id: str, cursor: Optional[str], limit: int) -> list:
+    query = get_db().table("essays").select(SUMMARY_COLUMNS).eq("user_id", user_id)
+    result = await execute(keyset(query, cursor, limit))
+    return result.data
+
+async def user_essay_stats(topic_id: Optional[str], cursor: Optional[str], limit: int) -> list:
+    # 회원 한 페이지와 회원별 에세이 수/제출 수/세션 수/단어 수를 한 번에 읽는다 (cursor는 user_accounts 기준)
+    after_created_at, after_id = decode_cursor(cursor) if cursor else (None, None)
+    result = await execute(get_db().rpc("admin_user_essay_stats", {
+        "p_topic_id": topic_id,
+        "p_after_created_at": after_created_at,
+        "p_after_id": after_id,
+        "p_limit": limit,
+    }))
+    return result.data
+
+async def get_essay(essay_id: str) -> Optional[dict]:
+    result = await execute(get_db().table("essays").select("*").eq("id", essay_id))
+    return result.data[0] if result.data else None
+
+async def update_essay(essay_id: str, user_id: str, data: dict) -> Optional[dict]:
+    result = await execute(get_db().table("essays").update(data).eq("id", essay_id).eq("user_id", user_id))
+    return result.data[0] if result.data else None
+
+async def delete_essay(essay_id: str, user_id: str) -> list:
+    result = await execute(get_db().table("essays").delete().eq("id", essay_id).eq("user_id", user_id))
+    return result.data
+
+async def list_essays_after(after_id: Optional[str], limit: int, only_missing_text: bool = False) -> list:
+    # id 순서로 끊어 읽는다 (백필용)
+    query = get_db().table("essays").select("id, content").order("id").limit(limit)
+    if after_id:
+        query = query.gt("id", after_id)
+    if only_missing_text:
+        query = query.is_("plain_text", "null")
+    result = await execute(query)
+    return result.data
+
+async def backfill_text_stats(rows: list) -> int:
+    # 글 통계만 채운다. 일반 PATCH와 달리 updated_at(ETag, 마지막 제출 시각)을 바꾸지 않는다
+    # (supabase/migrations/20240815_backfill_essay_text_stats_rpc.sql)
+    result = await execute(get_db().rpc("backfill_essay_text_stats", {"p_rows": rows}))
+    return result.data
+
+async def list_submitted_essays(topic_id: str, after_id: Optional[str], limit: int) -> list:
+    # 주제별 제출된 에세이를 id 순서로 끊어 읽는다 (일괄 첨삭용)
+    query = (
+        get_db().table("essays")
+        .select("id, content, plain_text")
+        .eq("topic_id", topic_id)
+        .eq("is_submitted", True)
+        .order("id")
+        .limit(limit)
+    )
+    if after_id:
+        query = query.gt("id", after_id)
+    result = await execute(query)
+    return result.data
+
+async def get_essays_by_ids(essay_ids: list) -> list:
+    result = await execute(get_db().table("essays").select("id, content, plain_text").in_("id", essay_ids))
+    return result.data
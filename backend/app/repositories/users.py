@@ -0,0 +1,31 @@
+from typing import Optional
+from ..core.supabase import get_db, execute, returning
+from ..core.pagination import keyset
+
+# 응답으로 내보내는 컬럼 (password는 로그인 확인 말고는 서버로도 읽어 오지 않는다)
+PUBLIC_COLUMNS = "id, username, name, role, created_at"
+
+async def get_user_by_username(username: str) -> Optional[dict]:
+    result = await execute(get_db().table("user_accounts").select("*").eq("username", username))
+    return result.data[0] if result.data else None
+
+async def get_user(user_id: str) -> Optional[dict]:
+    result = await execute(get_db().table("user_accounts").select(PUBLIC_COLUMNS).eq("id", user_id))
+    return result.data[0] if result.data else None
+
+async def list_users(cursor: Optional[str], limit: int) -> list:
+    query = get_db().table("user_accounts").select(PUBLIC_COLUMNS)
+    result = await execute(keyset(query, cursor, limit))
+    return result.data
+
+async def insert_user(data: dict) -> dict:
+    result = await execute(returning(get_db().table("user_accounts").insert(data), PUBLIC_COLUMNS))
+    return result.data[0]
+
+async def update_user(user_id: str, data: dict) -> Optional[dict]:
+    result = await execute(returning(get_db().table("user_accounts").update(data).eq("id", user_id), PUBLIC_COLUMNS))
+    return result.data[0] if result.data else None
+
+async def delete_user(user_id: str) -> list:
+    result = await execute(get_db().table("user_accounts").delete().eq("id", user_id))
+    return result.data
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pydantic import BaseModel
 from typing import Optional, List
-from ..core.supabase import supabase
+from ..repositories import users as users_repo
+from ..core.pagination import LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/api/auth",
@@ -38,15 +42,14 @@ class UserCreateRequest(BaseModel):
 async def login(request: LoginRequest):
     try:
         # Supabase에서 사용자 정보 조회
-        response = supabase.table('user_accounts').select('*').eq('username', request.username).execute()
+        user = await users_repo.get_user_by_username(request.username)
         
-        if not response.data:
+        if not user:
             raise HTTPException(
                 status_code=401,
                 detail="아이디 또는 비밀번호가 올바르지 않습니다."
             )
         
-        user = response.data[0]
         
         # 비밀번호 확인
         if user['password'] != request.password:  # 실제로는 비밀번호 해싱을 사용해야 합니다
@@ -67,23 +70,25 @@ async def login(request: LoginRequest):
         )
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_users():
+async def get_users(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+):
     try:
-        print("=== 회원 목록 조회 시작 ===")
-        # Supabase에서 사용자 정보 조회
-        response = supabase.table('user_accounts').select('*').execute()
-        print("Supabase 응답:", response)
-        print("응답 데이터:", response.data)
+        # Supabase에서 사용자 정보 조회 (가입순 역순으로 한 페이지씩)
+        rows = await users_repo.list_users(cursor, limit)
+        logger.debug("users fetched", extra={"count": len(rows or [])})
+        if next_page := next_cursor(rows, limit):
+            response.headers[NEXT_CURSOR_HEADER] = next_page
         
-        if not response.data:
-            print("데이터가 없습니다.")
+        if not rows:
             return []  # 데이터가 없으면 빈 배열 반환
             
         # 응답 데이터 형식 확인 및 변환
         users = []
-        for user in response.data:
+        for user in rows:
             try:
-                print("처리 중인 사용자 데이터:", user)
                 users.append(UserResponse(
                     id=str(user['id']),
                     username=user['username'],
@@ -91,24 +96,47 @@ async def get_users():
                     role=user['role']
                 ))
             except Exception as e:
-                print(f"사용자 데이터 처리 중 에러: {str(e)}")
+                logger.warning("사용자 데이터 처리 중 에러: %s", e, extra={"user_id": user.get('id')})
                 continue
                 
-        print("최종 변환된 사용자 목록:", users)
         return users
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"회원 목록 조회 중 에러 발생: {str(e)}")
+        logger.exception("회원 목록 조회 중 에러 발생")
         raise HTTPException(
             status_code=500,
             detail=f"회원 목록을 불러오는데 실패했습니다: {str(e)}"
         )
 
+@router.get("/users/{user_id}", response_model=UserResponse)
+async def get_user(user_id: str):
+    try:
+        user = await users_repo.get_user(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=404,
+                detail="사용자를 찾을 수 없습니다."
+            )
+        return UserResponse(
+            id=str(user['id']),
+            username=user['username'],
+            name=user.get('name'),
+            role=user['role']
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+
 @router.patch("/users/{user_id}", response_model=UserResponse)
 async def update_user(user_id: str, request: UserUpdateRequest):
     try:
         # 사용자 존재 여부 확인
-        check_response = supabase.table('user_accounts').select('*').eq('id', user_id).execute()
-        if not check_response.data:
+        if not await users_repo.get_user(user_id):
             raise HTTPException(
                 status_code=404,
                 detail="사용자를 찾을 수 없습니다."
@@ -123,8 +151,7 @@ async def update_user(user_id: str, request: UserUpdateRequest):
             )
 
         # 사용자 정보 업데이트
-        response = supabase.table('user_accounts').update(update_data).eq('id', user_id).execute()
-        user = response.data[0]
+        user = await users_repo.update_user(user_id, update_data)
         return UserResponse(
             id=str(user['id']),
             username=user['username'],
@@ -143,15 +170,14 @@ async def update_user(user_id: str, request: UserUpdateRequest):
 async def delete_user(user_id: str):
     try:
         # 사용자 존재 여부 확인
-        check_response = supabase.table('user_accounts').select('*').eq('id', user_id).execute()
-        if not check_response.data:
+        if not await users_repo.get_user(user_id):
             raise HTTPException(
                 status_code=404,
                 detail="사용자를 찾을 수 없습니다."
             )
 
         # 사용자 삭제
-        response = supabase.table('user_accounts').delete().eq('id', user_id).execute()
+        await users_repo.delete_user(user_id)
         return {"message": "사용자가 삭제되었습니다."}
     except HTTPException:
         raise
@@ -165,20 +191,18 @@ async def delete_user(user_id: str):
 async def create_user(request: UserCreateRequest):
     try:
         # 동일한 username이 이미 존재하는지 확인
-        check_response = supabase.table('user_accounts').select('*').eq('username', request.username).execute()
-        if check_response.data:
+        if await users_repo.get_user_by_username(request.username):
             raise HTTPException(
                 status_code=400,
                 detail="이미 존재하는 아이디입니다."
             )
         # 회원 생성
-        response = supabase.table('user_accounts').insert({
+        user = await users_repo.insert_user({
             'username': request.username,
             'name': request.name,
             'password': request.password,
             'role': request.role
-        }).execute()
-        user = response.data[0]
+        })
         return UserResponse(
             id=str(user['id']),
             username=user['username'],
@@ -1,58 +1,281 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Dict, Any
 from ..models.correction import Correction, CorrectionCreate
-from ..core.supabase import supabase
-from ..core.openai_client import get_correction
+from ..repositories import essays as essays_repo
+from ..repositories import corrections as corrections_repo
+from ..repositories import correction_sessions as sessions_repo
+from ..core.openai_client import stream_correction
+from ..core.text_stats import essay_plain_text
+from ..core.alignment import SpanAligner, align_corrections, with_span
+from ..core.incremental import IncrementalPlan
+from ..core.http_cache import PRIVATE_REVALIDATE, cached_not_modified, compute_etag, forget_etag, not_modified, remember_etag
+from ..core.responses import trusted_json
+from ..core import correction_cache
+from ..core.jobs import QueueFullError, job_queue
+from ..core.singleflight import create_singleflight
+from ..core.rate_limit import INTERACTIVE, RateLimitExceeded, request_class, scheduler
+from ..core.llm_usage import usage_stats
+from ..core.metrics import CORRECTION_FAILURES
+from ..core.batch import BatchRun, batch_runner, list_states, summarize
+from postgrest.exceptions import APIError
 from uuid import UUID
+import asyncio
+import hashlib
+import json
+import logging
 
 router = APIRouter(prefix="/corrections", tags=["corrections"])
 
+# 어드민용 라우터 (주제별 일괄 첨삭)
+admin_router = APIRouter(prefix="/api/admin/corrections", tags=["admin-corrections"])
+
+logger = logging.getLogger(__name__)
+
+session_flight = create_singleflight()
+
+async def _ensure_session_available(essay_id: str) -> None:
+    # 모델을 부르기 전에 회차가 다 찼는지만 미리 본다. 실제 번호는 저장할 때 DB가 정한다
+    session_numbers = await sessions_repo.list_session_numbers(essay_id)
+    if len(session_numbers) >= 3:
+        raise HTTPException(status_code=400, detail="최대 3회까지만 첨삭 가능합니다.")
+
+async def _get_essay_or_404(essay_id: str) -> dict:
+    essay = await essays_repo.get_essay(essay_id)
+    if not essay:
+        raise HTTPException(status_code=404, detail="Essay not found")
+    return essay
+
+async def _save_session(
+    essay_id: str,
+    corrections: List[CorrectionCreate],
+    overall_feedback: str,
+    content_snapshot: str,
+    metadata: dict,
+) -> dict:
+    session_data = {
+        "essay_id": essay_id,
+        "corrections": [c.model_dump(mode="json") for c in corrections],
+        "overall_feedback": overall_feedback,
+        "content_snapshot": content_snapshot,
+        "metadata": metadata,
+    }
+    # 동시에 들어온 다른 요청이 먼저 회차를 채웠으면 여기서 거절된다
+    try:
+        session_data["session_number"] = await sessions_repo.create_session(**session_data)
+    except APIError as e:
+        if e.code == "P0001":
+            raise HTTPException(status_code=400, detail=e.message)
+        if e.code == "P0002":
+            raise HTTPException(status_code=404, detail="Essay not found")
+        raise
+    await forget_etag(f"sessions:{essay_id}")
+    return session_data
+
+async def _plan_changes(essay_id: str, essay: dict) -> tuple:
+    # 이전 회차와 비교해 바뀐 문단만 모델에 보낸다. 바뀐 곳이 없으면 회차를 쓰지 않고 거절한다
+    clean_text = essay_plain_text(essay)
+    plan = IncrementalPlan(clean_text, await sessions_repo.get_latest_session(essay_id))
+    if plan.mode == "unchanged":
+        raise HTTPException(status_code=409, detail="변경된 내용이 없습니다.")
+    return clean_text, plan
+
+def _too_many_requests(e: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=e.message,
+        headers={"Retry-After": str(e.retry_after), "X-Queue-Position": str(e.queue_position)},
+    )
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _run_correction_session(essay_id: str, essay: dict) -> dict:
+    # 1. 현재 세션 개수 확인
+    await _ensure_session_available(essay_id)
+
+    # 2. 이전 회차와 비교해 바뀐 문단만 모델에 보낸다
+    clean_text, plan = await _plan_changes(essay_id, essay)
+
+    # 3. GPT API를 사용하여 첨삭 및 총평 생성
+    ai_result = await correction_cache.get_correction_cached(plan.request_text)
+    result = await plan.finish(ai_result["corrections"], ai_result["overall_feedback"])
+    overall_feedback = result["overall_feedback"]
+
+    # 4. 첨삭 원문의 위치를 찾아 둔다 (본문이 길면 이벤트 루프를 막지 않도록 스레드에서)
+    corrections = await asyncio.to_thread(align_corrections, essay["content"], result["corrections"])
+
+    # 5. 세션 저장
+    session_data = await _save_session(essay_id, corrections, overall_feedback, clean_text, plan.metadata)
+
+    return {
+        "session_number": session_data["session_number"],
+        "corrections": session_data["corrections"],
+        "overall_feedback": overall_feedback,
+        "metadata": plan.metadata,
+    }
+
+async def _coalesced_correction_session(essay_id: str) -> dict:
+    # 같은 에세이 + 같은 내용으로 동시에 들어온 요청(더블 클릭, 재시도)은
+    # 모델 호출과 세션 저장을 한 번만 하고 결과를 나눠 갖는다
+    essay = await _get_essay_or_404(essay_id)
+    content_hash = hashlib.sha256(essay["content"].encode("utf-8")).hexdigest()
+    return await session_flight.do(
+        f"correction_session:{essay_id}:{content_hash}",
+        lambda: _run_correction_session(essay_id, essay),
+    )
+
+async def _run_correction_session_job(payload: dict) -> dict:
+    # 백그라운드 작업은 거절하지 않고 스케줄러 대기열에서 차례를 기다린다
+    with request_class(INTERACTIVE, may_reject=False):
+        return await _coalesced_correction_session(payload["essay_id"])
+
+job_queue.register("correction_session", _run_correction_session_job)
+
 @router.post("/sessions", response_model=Dict[str, Any])
 async def create_correction_session(
     essay_id: UUID = Query(..., description="Essay ID"),
+    background: bool = Query(False, description="true면 작업을 큐에 넣고 202로 job id를 돌려준다"),
 ):
     try:
-        # 1. 현재 세션 개수 확인
-        sessions_result = supabase.table("correction_sessions").select("session_number").eq("essay_id", str(essay_id)).order("session_number").execute()
-        session_numbers = [s["session_number"] for s in sessions_result.data]
-        next_session = 1
-        for i in range(1, 4):
-            if i not in session_numbers:
-                next_session = i
-                break
-        if len(session_numbers) >= 3:
-            raise HTTPException(status_code=400, detail="최대 3회까지만 첨삭 가능합니다.")
-
-        # 2. 에세이 조회
-        essay_result = supabase.table("essays").select("*").eq("id", str(essay_id)).execute()
-        if not essay_result.data:
-            raise HTTPException(status_code=404, detail="Essay not found")
-        essay = essay_result.data[0]
-
-        # 3. GPT API를 사용하여 첨삭 및 총평 생성
-        ai_result = await get_correction(essay["content"])
-        corrections = ai_result["corrections"]
-        overall_feedback = ai_result["overall_feedback"]
+        if background:
+            # 빠르게 실패할 수 있는 검증은 큐에 넣기 전에 한다
+            await _ensure_session_available(str(essay_id))
+            await _plan_changes(str(essay_id), await _get_essay_or_404(str(essay_id)))
+            job = await job_queue.enqueue("correction_session", {"essay_id": str(essay_id)})
+            return JSONResponse(
+                status_code=202,
+                content={"job_id": job["id"], "status": job["status"]},
+                headers={"Location": f"/corrections/jobs/{job['id']}"},
+            )
+        return await _coalesced_correction_session(str(essay_id))
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except RateLimitExceeded as e:
+        CORRECTION_FAILURES.labels("session", "rate_limited").inc()
+        raise _too_many_requests(e)
+    except Exception as e:
+        CORRECTION_FAILURES.labels("session", "error").inc()
+        logger.exception("Error creating correction session")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 4. 세션 저장
-        session_data = {
-            "essay_id": str(essay_id),
-            "session_number": next_session,
-            "corrections": [c.model_dump() for c in corrections],
-            "overall_feedback": overall_feedback
-        }
-        supabase.table("correction_sessions").insert(session_data).execute()
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_correction_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="끝날 때까지 최대 몇 초 기다릴지 (long-poll)"),
+):
+    job = await job_queue.wait(job_id, wait) if wait else await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+    }
 
-        return {"session_number": next_session, "corrections": session_data["corrections"], "overall_feedback": overall_feedback}
+@router.post("/sessions/stream")
+async def stream_correction_session(
+    essay_id: UUID = Query(..., description="Essay ID"),
+):
+    # 스트리밍을 시작하기 전에 검증을 끝내야 일반 HTTP 에러로 응답할 수 있다
+    try:
+        await _ensure_session_available(str(essay_id))
+        essay = await _get_essay_or_404(str(essay_id))
+        clean_text, plan = await _plan_changes(str(essay_id), essay)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error creating correction session: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def model_events(request_text: str):
+        # 캐시에 있으면 모델을 부르지 않고 한 번에 내보낸다
+        cached = await correction_cache.lookup(request_text)
+        if cached is not None:
+            for correction in cached["corrections"]:
+                yield "correction", correction
+            yield "overall_feedback", cached["overall_feedback"]
+            return
+        corrections = []
+        async for kind, value in stream_correction(request_text):
+            if kind == "correction":
+                corrections.append(value)
+            else:
+                await correction_cache.store(request_text, {"corrections": corrections, "overall_feedback": value})
+            yield kind, value
+
+    async def ai_events():
+        # 바뀌지 않은 문단의 이전 첨삭을 먼저 내보내고, 바뀐 문단만 모델에 보낸다
+        emitted = list(plan.carried)
+        for correction in emitted:
+            yield "correction", correction
+        async for kind, value in model_events(plan.request_text):
+            if kind == "correction":
+                # 이어 쓴 첨삭과 겹치는 새 첨삭은 /sessions와 같은 규칙으로 버린다
+                if plan.accept(value, emitted):
+                    emitted.append(value)
+                    yield kind, value
+            else:
+                yield kind, await plan.merge_feedback(value)
+
+    async def events():
+        corrections = []
+        overall_feedback = ""
+        try:
+            aligner = SpanAligner(essay["content"])
+            async for kind, value in ai_events():
+                if kind == "correction":
+                    value = with_span(value, aligner.align(value.original_text))
+                    value.essay_id = str(essay_id)
+                    corrections.append(value)
+                    yield _sse("correction", value.model_dump(mode="json"))
+                else:
+                    overall_feedback = value
+                    yield _sse("overall_feedback", {"overall_feedback": overall_feedback})
+            session_data = await _save_session(str(essay_id), corrections, overall_feedback, clean_text, plan.metadata)
+            yield _sse("done", {"session_number": session_data["session_number"], "metadata": plan.metadata})
+        except RateLimitExceeded as e:
+            CORRECTION_FAILURES.labels("stream", "rate_limited").inc()
+            yield _sse("error", {"detail": e.message, "retry_after": e.retry_after, "queue_position": e.queue_position})
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail})
+        except Exception as e:
+            CORRECTION_FAILURES.labels("stream", "error").inc()
+            logger.exception("Error streaming correction session")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_correction_cache_stats():
+    return correction_cache.cache_stats()
+
+@router.get("/scheduler/stats", response_model=Dict[str, Any])
+async def get_scheduler_stats():
+    return scheduler.stats()
+
+@router.get("/llm/stats", response_model=Dict[str, Any])
+async def get_llm_usage_stats():
+    # 모델별 토큰 사용량과 프롬프트 캐시 적중(cached_tokens) 현황
+    return usage_stats.as_dict()
+
 @router.get("/sessions/{essay_id}", response_model=List[Dict[str, Any]])
-async def get_correction_sessions(essay_id: UUID):
+async def get_correction_sessions(request: Request, response: Response, essay_id: UUID):
     try:
-        result = supabase.table("correction_sessions").select("*").eq("essay_id", str(essay_id)).order("session_number").execute()
-        return result.data
+        key = f"sessions:{essay_id}"
+        if cached := await cached_not_modified(request, key, PRIVATE_REVALIDATE):
+            return cached
+        sessions = await sessions_repo.list_sessions(str(essay_id))
+        # 세션은 한 번 저장되면 바뀌지 않으므로 id와 회차만으로 목록의 버전을 정한다
+        etag = compute_etag([[s["id"], s["session_number"]] for s in sessions])
+        await remember_etag(key, etag)
+        return not_modified(request, response, etag, PRIVATE_REVALIDATE) or trusted_json(sessions, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -62,41 +285,82 @@ async def create_correction(
 ):
     try:
         # 1. 에세이 조회
-        essay_result = supabase.table("essays").select("*").eq("id", str(essay_id)).execute()
-        if not essay_result.data:
-            raise HTTPException(status_code=404, detail="Essay not found")
-        
-        essay = essay_result.data[0]
+        essay = await _get_essay_or_404(str(essay_id))
         
         # 2. GPT API를 사용하여 첨삭 및 총평 생성
-        ai_result = await get_correction(essay["content"])
+        ai_result = await correction_cache.get_correction_cached(essay_plain_text(essay))
         corrections = ai_result["corrections"]
         overall_feedback = ai_result["overall_feedback"]
         
-        # 3. 첨삭 결과를 데이터베이스에 저장
-        correction_data = []
-        for correction in corrections:
-            data = {
+        # 3. 첨삭 결과를 데이터베이스에 한 번에 저장
+        correction_data = await corrections_repo.insert_corrections([
+            {
                 "essay_id": str(essay_id),
                 "category": correction.category,
                 "original_text": correction.original_text,
                 "suggested_text": correction.suggested_text,
                 "explanation": correction.explanation
             }
-            result = supabase.table("corrections").insert(data).execute()
-            correction_data.extend(result.data)
+            for correction in corrections
+        ])
             
         return {"corrections": correction_data, "overall_feedback": overall_feedback}
+    except HTTPException:
+        raise
+    except RateLimitExceeded as e:
+        CORRECTION_FAILURES.labels("legacy", "rate_limited").inc()
+        raise _too_many_requests(e)
     except Exception as e:
-        print(f"Error creating correction: {str(e)}")
+        CORRECTION_FAILURES.labels("legacy", "error").inc()
+        logger.exception("Error creating correction")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{essay_id}", response_model=List[Correction])
 async def get_corrections(essay_id: UUID):
     try:
-        print(f"=== 첨삭 조회 essay_id: {essay_id}")
-        result = supabase.table("corrections").select("*").eq("essay_id", str(essay_id)).execute()
-        print("Supabase 첨삭 응답:", result)
-        return result.data
+        rows = await corrections_repo.list_corrections(str(essay_id))
+        logger.debug("corrections fetched", extra={"essay_id": str(essay_id), "count": len(rows)})
+        return rows
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.post("/batch", response_model=Dict[str, Any])
+async def create_correction_batch(
+    topic_id: str = Query(..., description="이 주제로 제출된 에세이 전체를 첨삭한다"),
+):
+    # 요청 파일을 만들어 배치 백엔드에 제출하고, 결과는 백그라운드에서 기다렸다가 세션으로 넣는다
+    try:
+        run = BatchRun.create(topic_id)
+        await run.prepare()
+        batch_runner.watch(run.state["id"])
+        return JSONResponse(
+            status_code=202,
+            content=summarize(run.state),
+            headers={"Location": f"/api/admin/corrections/batch/{run.state['id']}"},
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        logger.exception("Error creating correction batch")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.get("/batch", response_model=List[Dict[str, Any]])
+async def list_correction_batches(topic_id: str = None):
+    return [summarize(s) for s in list_states() if topic_id is None or s["topic_id"] == topic_id]
+
+@admin_router.get("/batch/{run_id}", response_model=Dict[str, Any])
+async def get_correction_batch(run_id: str):
+    run = BatchRun.load(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Batch run not found")
+    return summarize(run.state)
+
+@admin_router.post("/batch/{run_id}/resume", response_model=Dict[str, Any])
+async def resume_correction_batch(run_id: str):
+    # 멈춘 실행의 오류를 지우고 다시 백그라운드에서 지켜본다.
+    # 진행은 실행별 파일 락을 잡는 BatchRunner만 하므로 여기서 advance를 직접 부르지 않는다
+    run = BatchRun.load(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Batch run not found")
+    if not run.finished:
+        run.clear_error()
+        batch_runner.watch(run_id)
+    return summarize(run.state)
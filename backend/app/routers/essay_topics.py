@@ -1,27 +1,56 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from ..models.essay_topic import EssayTopic, EssayTopicCreate, EssayTopicUpdate
-from ..core.supabase import supabase
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Any, Dict, List, Optional
+from ..models.essay_topic import EssayTopic, EssayTopicCreate, EssayTopicUpdate, EssayTopicSummary
+from ..repositories import essay_topics as topics_repo
+from ..core import topic_cache
+from ..core.http_cache import PRIVATE_REVALIDATE, cached_not_modified, forget_etag, not_modified, remember_etag, row_etag
+from ..core.responses import trusted_json
+from ..core.pagination import LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+import logging
 
 router = APIRouter(prefix="/essay-topic", tags=["essay-topics"])
 
 # 어드민용 라우터
 admin_router = APIRouter(prefix="/api/admin/essay-topic", tags=["admin-essay-topic"])
 
-@router.get("/", response_model=List[EssayTopic])
-async def get_essay_topics():
+logger = logging.getLogger(__name__)
+
+async def _list_topic_summaries(
+    request: Request,
+    response: Response,
+    cursor: Optional[str],
+    limit: int,
+    cache_control: str,
+):
+    # 최신순 요약 목록. 읽을거리 전체는 상세 조회에서만 내려준다
     try:
-        result = supabase.table("essay_topics").select("*").execute()
-        return result.data
+        cached = await topic_cache.topic_list(cursor, limit)
+        rows = cached["data"]
+        if next_page := next_cursor(rows, limit):
+            response.headers[NEXT_CURSOR_HEADER] = next_page
+        # SUMMARY_COLUMNS가 EssayTopicSummary와 같으므로 검증 없이 내보낸다
+        return not_modified(request, response, cached["etag"], cache_control) or trusted_json(rows, response)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/", response_model=List[EssayTopicSummary])
+async def get_essay_topics(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+):
+    return await _list_topic_summaries(request, response, cursor, limit, topic_cache.PUBLIC_CACHE_CONTROL)
+
 @router.post("/", response_model=EssayTopic)
 async def create_essay_topic(topic: EssayTopicCreate):
     try:
         data = topic.model_dump()
-        result = supabase.table("essay_topics").insert(data).execute()
-        return result.data[0]
+        created = await topics_repo.insert_topic(data)
+        await topic_cache.invalidate()
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -29,12 +58,13 @@ async def create_essay_topic(topic: EssayTopicCreate):
 async def delete_essay_topic(topic_id: str):
     try:
         # 주제가 존재하는지 확인
-        check_result = supabase.table("essay_topics").select("*").eq("id", topic_id).execute()
-        if not check_result.data:
+        if not await topics_repo.get_topic(topic_id):
             raise HTTPException(status_code=404, detail=f"Essay topic with ID {topic_id} not found")
         
         # 주제 삭제
-        result = supabase.table("essay_topics").delete().eq("id", topic_id).execute()
+        await topics_repo.delete_topic(topic_id)
+        await topic_cache.invalidate()
+        await forget_etag(f"topic:{topic_id}")
         
         return {"message": "Essay topic deleted successfully"}
     except HTTPException:
@@ -45,47 +75,70 @@ async def delete_essay_topic(topic_id: str):
 @admin_router.put("", response_model=EssayTopic)
 async def update_admin_essay_topic(topic: EssayTopicUpdate):
     try:
-        print(f"[PUT /api/admin/essay-topic] 요청 데이터: {topic}")
-        check_result = supabase.table("essay_topics").select("*").eq("id", topic.id).execute()
-        print(f"[PUT /api/admin/essay-topic] 기존 데이터: {check_result.data}")
-        if not check_result.data:
+        existing = await topics_repo.get_topic(topic.id)
+        if not existing:
             raise HTTPException(status_code=404, detail="Essay topic not found")
         update_data = topic.model_dump(exclude_unset=True)
-        print(f"[PUT /api/admin/essay-topic] update_data: {update_data}")
-        result = supabase.table("essay_topics").update(update_data).eq("id", topic.id).execute()
-        print(f"[PUT /api/admin/essay-topic] update 결과: {result.data}")
-        return result.data[0]
+        logger.info("updating essay topic", extra={"topic_id": topic.id, "fields": sorted(update_data)})
+        updated = await topics_repo.update_topic(topic.id, update_data)
+        await topic_cache.invalidate()
+        await forget_etag(f"topic:{topic.id}")
+        return updated
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"[PUT /api/admin/essay-topic] 에러: {str(e)}")
+        logger.exception("Error updating essay topic %s", topic.id)
         raise HTTPException(status_code=500, detail=str(e))
 
 @admin_router.post("", response_model=EssayTopic)
 async def create_admin_essay_topic(topic: EssayTopicCreate):
     try:
         data = topic.model_dump()
-        result = supabase.table("essay_topics").insert(data).execute()
-        return result.data[0]
+        created = await topics_repo.insert_topic(data)
+        await topic_cache.invalidate()
+        return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/current", response_model=EssayTopic)
-async def get_current_essay_topic():
+async def get_current_essay_topic(request: Request, response: Response):
+    # 학생 화면마다 부르므로 캐시에서 읽고, 브라우저/CDN이 ETag로 다시 확인할 수 있게 한다
     try:
-        result = supabase.table("essay_topics").select("*").eq("is_active", True).order("created_at", desc=True).limit(1).execute()
-        if not result.data:
+        cached = await topic_cache.current_topic()
+        if not cached["data"]:
             raise HTTPException(status_code=404, detail="No active essay topic found")
-        return result.data[0]
+        return not_modified(request, response, cached["etag"], topic_cache.PUBLIC_CACHE_CONTROL) or cached["data"]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@admin_router.get("", response_model=List[EssayTopic])
-async def get_admin_essay_topics(id: str = None):
+@admin_router.get("", response_model=List[EssayTopicSummary])
+async def get_admin_essay_topics(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+):
+    return await _list_topic_summaries(request, response, cursor, limit, topic_cache.ADMIN_CACHE_CONTROL)
+
+@admin_router.get("/cache/stats", response_model=Dict[str, Any])
+async def get_topic_cache_stats():
+    return topic_cache.cache_stats()
+
+@admin_router.get("/{topic_id}", response_model=EssayTopic)
+async def get_admin_essay_topic(request: Request, response: Response, topic_id: str):
     try:
-        query = supabase.table("essay_topics").select("*")
-        if id:
-            query = query.eq("id", id)
-        result = query.execute()
-        return result.data
+        if cached := await cached_not_modified(request, f"topic:{topic_id}", PRIVATE_REVALIDATE):
+            return cached
+        topic = await topics_repo.get_topic(topic_id)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Essay topic not found")
+        etag = row_etag(topic)
+        await remember_etag(f"topic:{topic_id}", etag)
+        return not_modified(request, response, etag, PRIVATE_REVALIDATE) or topic
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,21 +1,31 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
-from ..models.essay import Essay, EssayCreate, EssayUpdate
-from ..core.supabase import supabase
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import List, Optional
+from ..models.essay import Essay, EssayCreate, EssayUpdate, EssaySummary, UserEssayStats
+from ..repositories import essays as essays_repo
+from ..core.text_stats import compute_text_stats
+from ..core.http_cache import PRIVATE_REVALIDATE, cached_not_modified, forget_etag, not_modified, remember_etag, row_etag
+from ..core.responses import trusted_json
+from ..core.pagination import LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from datetime import date, datetime
 from uuid import UUID
 import json
+import logging
 
 router = APIRouter(prefix="/essays", tags=["essays"])
 
+# 어드민용 라우터 (회원별 에세이 현황)
+admin_router = APIRouter(prefix="/api/admin/essays", tags=["admin-essays"])
+
+logger = logging.getLogger(__name__)
+
 @router.post("/", response_model=Essay)
 async def create_essay(
     essay: EssayCreate,
     user_id: UUID = Query(..., description="User ID")
 ):
     try:
-        # 단어 수 계산 (공백으로 구분)
-        word_count = len(essay.content.split())
+        # plain text와 글 통계는 저장할 때 한 번만 계산한다
+        stats = compute_text_stats(essay.content)
         
         # daily_essay_date가 date 타입이면 ISO 포맷 문자열로 변환
         daily_essay_date = essay.daily_essay_date
@@ -27,43 +37,61 @@ async def create_essay(
             "content": essay.content,
             "daily_essay_date": daily_essay_date,
             "user_id": str(user_id),
-            "word_count": word_count,
             "is_submitted": False,
-            "topic_id": essay.topic_id
+            "topic_id": essay.topic_id,
+            **stats
         }
-        print("Inserting data:", data)  # 디버깅을 위한 로그 추가
+        logger.debug("inserting essay", extra={"user_id": data["user_id"], "topic_id": data["topic_id"]})
         
-        result = supabase.table("essays").insert(data).execute()
-        return result.data[0]
+        return await essays_repo.insert_essay(data)
     except Exception as e:
-        print("Error creating essay:", str(e))  # 에러 로깅 추가
+        logger.exception("Error creating essay")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/", response_model=List[Essay])
-async def get_essays(user_id: UUID = Query(..., description="User ID")):
+@router.get("/", response_model=List[EssaySummary])
+async def get_essays(
+    response: Response,
+    user_id: UUID = Query(..., description="User ID"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+):
+    # 최신순 요약 목록. 본문은 GET /essays/{essay_id}에서만 내려준다
     try:
-        result = supabase.table("essays").select("*").eq("user_id", str(user_id)).execute()
-        return result.data
+        rows = await essays_repo.list_essays(str(user_id), cursor, limit)
+        if next_page := next_cursor(rows, limit):
+            response.headers[NEXT_CURSOR_HEADER] = next_page
+        # SUMMARY_COLUMNS가 EssaySummary와 같으므로 검증 없이 내보낸다
+        return trusted_json(rows, response)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{essay_id}", response_model=Essay)
 async def get_essay(
+    request: Request,
+    response: Response,
     essay_id: str,
     user_id: UUID = Query(..., description="User ID")
 ):
     try:
+        # 브라우저가 가진 버전이 최신이면 DB를 읽지 않고 304
+        if cached := await cached_not_modified(request, f"essay:{essay_id}", PRIVATE_REVALIDATE):
+            return cached
+
         # 먼저 에세이가 존재하는지 확인
-        result = supabase.table("essays").select("*").eq("id", essay_id).execute()
+        essay = await essays_repo.get_essay(essay_id)
         
-        if not result.data:
+        if not essay:
             raise HTTPException(status_code=404, detail=f"Essay with id {essay_id} not found")
-            
-        return result.data[0]
+
+        etag = row_etag(essay)
+        await remember_etag(f"essay:{essay_id}", etag)
+        return not_modified(request, response, etag, PRIVATE_REVALIDATE) or essay
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching essay {essay_id}:", str(e))  # 에러 로깅 추가
+        logger.exception("Error fetching essay %s", essay_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.patch("/{essay_id}", response_model=Essay)
@@ -75,15 +103,18 @@ async def update_essay(
     try:
         data = essay.model_dump(exclude_unset=True)
         if "content" in data:
-            data["word_count"] = len(data["content"].split())
-        print("[PATCH] essay_id:", essay_id)
-        print("[PATCH] user_id:", user_id)
-        print("[PATCH] data:", data)
-        result = supabase.table("essays").update(data).eq("id", essay_id).eq("user_id", str(user_id)).execute()
-        print("[PATCH] update result:", result.data)
-        if not result.data:
+            data.update(compute_text_stats(data["content"]))
+        else:
+            # plain_text는 content에서만 만들어진다
+            data.pop("plain_text", None)
+        logger.debug("updating essay", extra={"essay_id": str(essay_id), "fields": sorted(data)})
+        updated = await essays_repo.update_essay(essay_id, str(user_id), data)
+        if not updated:
             raise HTTPException(status_code=404, detail="Essay not found")
-        return result.data[0]
+        await forget_etag(f"essay:{essay_id}")
+        return updated
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -93,9 +124,33 @@ async def delete_essay(
     user_id: UUID = Query(..., description="User ID")
 ):
     try:
-        result = supabase.table("essays").delete().eq("id", essay_id).eq("user_id", str(user_id)).execute()
-        if not result.data:
+        deleted = await essays_repo.delete_essay(essay_id, str(user_id))
+        if not deleted:
             raise HTTPException(status_code=404, detail="Essay not found")
+        # 첨삭 세션은 에세이와 함께 지워진다 (ON DELETE CASCADE)
+        await forget_etag(f"essay:{essay_id}", f"sessions:{essay_id}")
         return {"message": "Essay deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@admin_router.get("/user-stats", response_model=List[UserEssayStats])
+async def get_user_essay_stats(
+    response: Response,
+    topic_id: Optional[str] = Query(None, description="이 주제의 에세이만 센다"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+):
+    # 회원 목록 화면이 회원마다 에세이/세션 목록을 따로 부르지 않도록 집계를 한 번에 내려준다
+    try:
+        rows = await essays_repo.user_essay_stats(topic_id, cursor, limit)
+        if next_page := next_cursor(rows, limit):
+            response.headers[NEXT_CURSOR_HEADER] = next_page
+        # DB 함수의 반환 컬럼이 UserEssayStats와 같으므로 검증 없이 내보낸다
+        return trusted_json(rows, response)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error fetching user essay stats")
+        raise HTTPException(status_code=500, detail=str(e))
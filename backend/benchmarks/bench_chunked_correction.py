@@ -0,0 +1,69 @@
+"""
+한 번에 보내는 첨삭과 창 단위 병렬 첨삭의 실제 소요 시간(wall-clock)을 비교한다.
+
+    cd backend
+    OPENAI_API_KEY=... python benchmarks/bench_chunked_correction.py --sizes 500 2000 5000
+
+OPENAI_BASE_URL을 지정하면 OpenAI 호환 서버를 대상으로 돌릴 수 있다. 캐시는 거치지 않는다.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import openai_client  # noqa: E402
+from app.core.chunking import build_windows  # noqa: E402
+
+SENTENCES = [
+    "나는 오늘 학교에서 친구들과 함께 환경 보호에 대해 토론을 했다.",
+    "플라스틱 사용을 줄이는것은 생각보다 어렵지만 꼭 필요한 일이다.",
+    "우리 반은 일회용 컵 대신 텀블러를 쓰기로 약속 했다.",
+    "하지만 몇몇 친구들은 귀찮다는 이유로 약속을 잘 지키지 않았다.",
+    "그래서 나는 작은 습관이 모이면 큰 변화를 만들 수 있다고 말했다.",
+    "선생님께서도 우리의 의견에 공감하시며 칭찬해 주셨다.",
+    "앞으로는 가족들과도 분리수거를 더 꼼꼼하게 하기로 했다.",
+]
+
+def make_essay(size: int) -> str:
+    paragraphs, current, length = [], [], 0
+    i = 0
+    while length < size:
+        sentence = SENTENCES[i % len(SENTENCES)]
+        current.append(sentence)
+        length += len(sentence) + 1
+        i += 1
+        if len(current) == 4:
+            paragraphs.append(" ".join(current))
+            current = []
+    if current:
+        paragraphs.append(" ".join(current))
+    return "\n".join(paragraphs)[:size]
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+async def main(args) -> None:
+    print(f"model={openai_client.OPENAI_MODEL} concurrency={openai_client.CHUNK_CONCURRENCY} window={openai_client.CHUNK_MAX_CHARS}")
+    print(f"{'chars':>6} {'windows':>7} {'single(s)':>10} {'chunked(s)':>11} {'speedup':>8}")
+    for size in args.sizes:
+        text = make_essay(size)
+        windows = build_windows(text, openai_client.CHUNK_MAX_CHARS, openai_client.CHUNK_OVERLAP_SENTENCES)
+        single, chunked = [], []
+        for _ in range(args.repeat):
+            single.append(await timed(openai_client.correct_text(text)))
+            chunked.append(await timed(openai_client.correct_text_chunked(text)))
+        s, c = statistics.median(single), statistics.median(chunked)
+        print(f"{size:>6} {len(windows):>7} {s:>10.2f} {c:>11.2f} {s / c:>7.2f}x")
+    await openai_client.close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""
+html_to_plain_text 마이크로 벤치마크: 이전 BeautifulSoup 구현과 처리량/메모리 할당을 비교한다.
+
+    cd backend
+    python benchmarks/bench_html_to_text.py --sizes 1000 5000 20000 100000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.html_text import html_to_plain_text  # noqa: E402
+
+PARAGRAPHS = [
+    "<p>나는 오늘 학교에서 친구들과 함께 <strong>환경 보호</strong>에 대해 토론을 했다.</p>",
+    "<p>플라스틱 사용을 줄이는것은 생각보다 어렵지만 꼭&nbsp;필요한 일이다. <em>정말로</em> 그렇다.</p>",
+    "<ul><li>텀블러 사용하기</li><li>분리수거 철저히 하기</li></ul>",
+    "<p>그래서 나는 작은 습관이 모이면<br>큰 변화를 만들 수 있다고 말했다.</p>",
+    "<blockquote><p>“작은 실천이 세상을 바꾼다.”</p></blockquote>",
+    "<h2>결론</h2><p>앞으로는 가족들과도 분리수거를 더 꼼꼼하게 하기로 했다 &amp; 약속했다.</p>",
+]
+
+def legacy_html_to_plain_text(html: str) -> str:
+    # 이전 구현 (비교 기준)
+    soup = BeautifulSoup(html, 'html.parser')
+    text = soup.get_text()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def make_html(size: int) -> str:
+    parts, length, i = [], 0, 0
+    while length < size:
+        paragraph = PARAGRAPHS[i % len(PARAGRAPHS)]
+        parts.append(paragraph)
+        length += len(paragraph)
+        i += 1
+    return "".join(parts)
+
+def measure(fn, html: str, number: int) -> tuple:
+    seconds = min(timeit.repeat(lambda: fn(html), number=number, repeat=3)) / number
+    tracemalloc.start()
+    fn(html)
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return seconds, peak, blocks
+
+def main(args) -> None:
+    print(f"{'size':>7} {'impl':>7} {'µs/call':>10} {'MB/s':>8} {'peak KB':>9} {'live blocks':>12}")
+    for size in args.sizes:
+        html = make_html(size)
+        number = max(1, args.budget // max(1, size))
+        # 두 구현이 같은 글자를 뽑는지 확인 (새 구현은 문단 사이에 줄바꿈을 남기므로 공백은 비교하지 않는다)
+        assert "".join(html_to_plain_text(html).split()) == "".join(legacy_html_to_plain_text(html).split())
+        for name, fn in (("bs4", legacy_html_to_plain_text), ("stream", html_to_plain_text)):
+            seconds, peak, blocks = measure(fn, html, number)
+            mb_per_s = len(html.encode("utf-8")) / seconds / 1e6
+            print(f"{len(html):>7} {name:>7} {seconds * 1e6:>10.1f} {mb_per_s:>8.2f} {peak / 1024:>9.1f} {blocks:>12}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 100000])
+    parser.add_argument("--budget", type=int, default=2_000_000, help="크기별 반복 횟수 = budget / size")
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+규칙 검사(core/precheck.py)를 켰을 때와 껐을 때 모델의 출력 토큰과 응답 시간을 비교한다.
+
+    cd backend
+    OPENAI_API_KEY=... python benchmarks/bench_precheck.py --essays 20 --paragraphs 3
+
+같은 에세이를 규칙 검사 없이 한 번, 규칙 검사 결과를 프롬프트에 넘겨 한 번 첨삭한다.
+규칙 검사 자체의 소요 시간(에세이당)도 함께 잰다. 캐시는 거치지 않는다.
+LLM_BACKEND=cassette로 돌리면 녹화된 응답으로 같은 비교를 비용 없이 반복할 수 있다.
+LLM_BACKEND=fake(가짜 서버)는 프롬프트 내용과 관계없이 답하므로 규칙 검사 시간만 의미가 있다.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import openai_client  # noqa: E402
+from app.core.llm_usage import usage_stats  # noqa: E402
+from app.core.precheck import precheck  # noqa: E402
+
+# 띄어쓰기/맞춤법 실수가 섞인 문장과 깨끗한 문장을 섞어 쓴다
+SENTENCES = [
+    "나는 오늘 학교에서 친구들과 함께 환경 보호에 대해 토론을 했다.",
+    "플라스틱 사용을 줄이는것은 생각보다 어렵지만 꼭 필요한 일이다.",
+    "우리 반은 텀블러를 쓰기로 했고 선생님께서 좋은 생각이라고 말했다.",
+    "작은 습관이 모이면 큰 변화를 만들 수 있다고 생각한다.",
+    "하지만 모든 사람이 같은 생각을 하는 것은 아니였다.",
+    "그래서 나는 가족들에게도 분리수거를 꼼꼼하게 하자고 말할것이다.",
+    "책을 읽는것은 재미있다 왜냐하면 새로운 것을 알수 있다.",
+    "학교에 갈때 친구를 만났다.오랫만에 본 친구였다.",
+    "나는 나는 그 말을 듣고 깜짝 놀랐다 .",
+    "앞으로는 더 많은 사람들이 환경에 관심을 가졌으면 좋겠다.",
+]
+
+def make_essay(rng: random.Random, paragraphs: int) -> str:
+    return "\n".join(" ".join(rng.sample(SENTENCES, 4)) for _ in range(paragraphs))
+
+def completion_tokens() -> int:
+    return sum(m["completion_tokens"] for m in usage_stats.as_dict()["models"].values())
+
+async def run(text: str, enabled: bool) -> dict:
+    openai_client.PRECHECK_ENABLED = enabled
+    before = completion_tokens()
+    started = time.perf_counter()
+    result = await openai_client.correct_text(text)
+    elapsed = time.perf_counter() - started
+    categories = [c.category.value for c in result["corrections"]]
+    return {
+        "seconds": elapsed,
+        "completion_tokens": completion_tokens() - before,
+        "grammar": categories.count("grammar"),
+        "structure": categories.count("structure"),
+    }
+
+def report(label: str, samples: list) -> None:
+    def mean(key: str) -> float:
+        return statistics.mean(s[key] for s in samples)
+
+    print(
+        f"{label:>9}: output_tokens={mean('completion_tokens'):.0f} "
+        f"latency p50={statistics.median(s['seconds'] for s in samples):.2f}s mean={mean('seconds'):.2f}s "
+        f"grammar={mean('grammar'):.1f} structure={mean('structure'):.1f}"
+    )
+
+async def main(args) -> None:
+    rng = random.Random(args.seed)
+    essays = [make_essay(rng, args.paragraphs) + f"\n번호 {args.seed}-{i}." for i in range(args.essays)]
+
+    started = time.perf_counter()
+    found = [precheck(text) for text in essays]
+    precheck_seconds = (time.perf_counter() - started) / len(essays)
+    print(
+        f"model={openai_client.OPENAI_MODEL} backend={openai_client.LLM_BACKEND} essays={len(essays)} "
+        f"avg_chars={statistics.mean(len(t) for t in essays):.0f}"
+    )
+    print(f"precheck: {precheck_seconds * 1e6:.0f}us/essay, {statistics.mean(len(f) for f in found):.1f} findings/essay")
+
+    without, with_precheck = [], []
+    for text in essays:
+        without.append(await run(text, False))
+        with_precheck.append(await run(text, True))
+    report("off", without)
+    report("on", with_precheck)
+
+    off_tokens = sum(s["completion_tokens"] for s in without)
+    on_tokens = sum(s["completion_tokens"] for s in with_precheck)
+    off_seconds = sum(s["seconds"] for s in without)
+    on_seconds = sum(s["seconds"] for s in with_precheck)
+    if off_tokens and off_seconds:
+        print(
+            f"output tokens: {1 - on_tokens / off_tokens:+.1%} saved, "
+            f"latency: {1 - on_seconds / off_seconds:+.1%} saved"
+        )
+    await openai_client.close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--essays", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+GET /essays/ 응답 100개를 만드는 비용과 전송 바이트를 이전 방식과 비교한다.
+
+    cd backend
+    python benchmarks/bench_serialization.py --essays 100 --rounds 200
+
+DB 없이 만든 에세이 행으로 응답 본문을 만드는 단계만 잰다.
+  before: response_model 검증 + jsonable 변환 + JSONResponse(json.dumps)
+  orjson: response_model 검증 + ORJSONResponse
+  trusted: 검증 없이 ORJSONResponse (core/responses.py trusted_json)
+본문 전체를 싣던 예전 목록(full)과 요약 목록(summary) 두 모양을 모두 잰다.
+바이트는 압축 없음 / gzip / br(brotli 패키지가 있을 때) 순으로 보여준다.
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from app.models.essay import Essay, EssaySummary  # noqa: E402
+from app.core.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli  # noqa: E402
+from app.core.text_stats import compute_text_stats  # noqa: E402
+
+SENTENCES = [
+    "나는 오늘 학교에서 친구들과 함께 환경 보호에 대해 토론을 했다.",
+    "플라스틱 사용을 줄이는 것은 생각보다 어렵지만 꼭 필요한 일이다.",
+    "우리 반은 텀블러를 쓰기로 했고 선생님께서 좋은 생각이라고 말씀하셨다.",
+    "작은 습관이 모이면 큰 변화를 만들 수 있다고 생각한다.",
+    "하지만 모든 사람이 같은 생각을 하는 것은 아니었다.",
+    "그래서 나는 가족들에게도 분리수거를 꼼꼼하게 하자고 말할 것이다.",
+    "앞으로는 더 많은 사람들이 환경에 관심을 가졌으면 좋겠다.",
+]
+
+def make_row(rng: random.Random, paragraphs: int) -> dict:
+    content = "".join(f"<p>{' '.join(rng.sample(SENTENCES, 4))}</p>" for _ in range(paragraphs))
+    stats = compute_text_stats(content)
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": str(uuid.uuid4()),
+        "title": "환경을 지키는 작은 습관",
+        "content": content,
+        "daily_essay_date": "2024-08-01",
+        "topic_id": str(uuid.uuid4()),
+        "is_submitted": True,
+        "preview": stats["plain_text"][:120],
+        "created_at": "2024-08-01T09:12:33.123456+00:00",
+        "updated_at": "2024-08-01T09:20:01.654321+00:00",
+        **stats,
+    }
+
+def summary_row(row: dict) -> dict:
+    return {name: row[name] for name in EssaySummary.model_fields}
+
+async def before(field, rows: List[dict]) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+async def validated_orjson(field, rows: List[dict]) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return ORJSONResponse(content).body
+
+async def trusted(field, rows: List[dict]) -> bytes:
+    return ORJSONResponse(rows).body
+
+def wire_sizes(body: bytes) -> str:
+    sizes = [f"raw={len(body):,}B", f"gzip={len(gzip.compress(body, GZIP_LEVEL)):,}B"]
+    if brotli is not None:
+        sizes.append(f"br={len(brotli.compress(body, quality=BROTLI_QUALITY)):,}B")
+    return " ".join(sizes)
+
+async def measure(label: str, render, field, rows: List[dict], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        body = await render(field, rows)
+        samples.append(time.perf_counter() - started)
+    median = statistics.median(samples)
+    print(f"  {label:>8}: {median * 1000:7.2f}ms/response  {wire_sizes(body)}")
+    return median
+
+async def main(args) -> None:
+    rng = random.Random(args.seed)
+    full_rows = [make_row(rng, args.paragraphs) for _ in range(args.essays)]
+    shapes = {
+        "full": (List[Essay], full_rows),
+        "summary": (List[EssaySummary], [summary_row(r) for r in full_rows]),
+    }
+    print(f"essays={args.essays} avg_content_chars={statistics.mean(len(r['content']) for r in full_rows):.0f} "
+          f"gzip_level={GZIP_LEVEL} brotli={'quality=%d' % BROTLI_QUALITY if brotli else 'not installed'}")
+    for shape, (annotation, rows) in shapes.items():
+        field = create_model_field(name="Response", type_=annotation, mode="serialization")
+        print(f"{shape}:")
+        base = await measure("before", before, field, rows, args.rounds)
+        for label, render in (("orjson", validated_orjson), ("trusted", trusted)):
+            took = await measure(label, render, field, rows, args.rounds)
+            print(f"  {'':>8}  {base / took:.1f}x faster than before")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--essays", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
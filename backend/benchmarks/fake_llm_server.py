@@ -0,0 +1,198 @@
+"""
+OpenAI 호환 /v1/chat/completions 가짜 서버. 돈과 네트워크 없이 첨삭 라우트를 부하 테스트할 때 쓴다.
+
+    cd backend
+    python benchmarks/fake_llm_server.py --port 8100 --latency lognormal --latency-median 3 --latency-sigma 0.4
+    LLM_BACKEND=fake LLM_FAKE_URL=http://127.0.0.1:8100/v1 uvicorn app.main:app --port 8000
+
+응답은 에세이 본문에서 실제 문장을 골라 만든 한국어 첨삭 JSON이므로 서버의 정렬/저장 단계도 그대로 지난다.
+같은 에세이에는 항상 같은 첨삭을 돌려준다 (본문 해시로 난수를 고정). 지연 시간만 분포에서 뽑는다.
+스트리밍 요청은 --ttft 뒤에 첫 청크를 보내고 나머지 시간을 청크 사이에 나눠 보낸다.
+--error-rate 비율만큼 429(Retry-After 포함)를 돌려줘 스케줄러의 백오프도 확인할 수 있다.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EXPLANATIONS = {
+    "grammar": [
+        "의존 명사는 앞말과 띄어 씁니다.",
+        "주어와 서술어의 호응이 맞지 않습니다.",
+        "조사를 바르게 고치면 뜻이 분명해집니다.",
+        "높임 표현을 문장 전체에서 일관되게 써야 합니다.",
+        "시제가 앞 문장과 맞지 않습니다.",
+    ],
+    "structure": [
+        "앞 문장과의 연결이 약하므로 접속 표현을 넣어 흐름을 살립니다.",
+        "주장을 뒷받침하는 근거를 구체적으로 덧붙이면 설득력이 높아집니다.",
+        "같은 내용이 반복되므로 한 문장으로 합칩니다.",
+        "문단의 중심 문장을 앞에 두면 글의 논지가 분명해집니다.",
+    ],
+}
+FEEDBACKS = [
+    "주제가 분명하고 자신의 경험을 근거로 든 점이 좋습니다. 다만 문장 사이의 연결이 약해 흐름이 끊기는 곳이 있습니다. 근거를 조금 더 구체적으로 쓰고 결론에서 주장을 다시 정리해 보세요.",
+    "글의 구성이 서론, 본론, 결론으로 잘 나뉘어 있습니다. 띄어쓰기와 조사 사용에서 실수가 반복되니 퇴고할 때 소리 내어 읽어 보세요. 본론의 예시를 하나 더 들면 더욱 설득력 있는 글이 됩니다.",
+    "솔직한 생각이 잘 드러나는 글입니다. 그러나 같은 표현이 여러 번 반복되고 문단마다 중심 내용이 분명하지 않습니다. 문단마다 하나의 생각을 담도록 다시 나눠 보세요.",
+]
+_SENTENCE = re.compile(r"[^.!?\n]+[.!?]?")
+
+def essay_text(messages: list) -> str:
+    content = (messages[-1].get("content") or "") if messages else ""
+    return content.split("텍스트:", 1)[-1].strip()
+
+def fake_correction(text: str, max_corrections: int) -> dict:
+    # 본문 해시로 난수를 고정해 같은 글에는 같은 결과를 준다
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).hexdigest())
+    sentences = [s.strip() for s in _SENTENCE.findall(text) if len(s.strip()) >= 4]
+    picked = rng.sample(sentences, min(len(sentences), rng.randint(1, max_corrections))) if sentences else []
+    corrections = []
+    for sentence in picked:
+        words = sentence.split()
+        category = rng.choice(["grammar", "structure"])
+        if category == "grammar" and len(words) >= 2:
+            i = rng.randrange(len(words) - 1)
+            original = f"{words[i]} {words[i + 1]}"
+            suggested = f"{words[i]}{words[i + 1]}" if len(words[i]) <= 2 else f"{words[i]}, {words[i + 1]}"
+        else:
+            original = sentence
+            suggested = f"그래서 {sentence}"
+        corrections.append({
+            "category": category,
+            "original_text": original,
+            "suggested_text": suggested,
+            "explanation": rng.choice(EXPLANATIONS[category]),
+        })
+    return {"corrections": corrections, "overall_feedback": rng.choice(FEEDBACKS)}
+
+def usage(messages: list, completion: str) -> dict:
+    # 한국어 1.5글자 ≈ 1토큰으로 어림한다. 마지막 메시지 앞부분은 프롬프트 캐시에 걸린 것으로 친다
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages) * 2 // 3
+    prefix_tokens = sum(len(m.get("content") or "") for m in messages[:-1]) * 2 // 3
+    cached = prefix_tokens // 128 * 128 if prefix_tokens >= 1024 else 0
+    completion_tokens = len(completion) * 2 // 3
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached},
+    }
+
+class Latency:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+
+    def sample(self) -> float:
+        a = self.args
+        if a.latency == "fixed":
+            value = a.latency_median
+        elif a.latency == "uniform":
+            value = self.rng.uniform(a.latency_min, a.latency_max)
+        elif a.latency == "normal":
+            value = self.rng.gauss(a.latency_median, a.latency_stddev)
+        else:
+            value = self.rng.lognormvariate(0, a.latency_sigma) * a.latency_median
+        return max(a.latency_min, min(a.latency_max, value))
+
+def create_app(args) -> FastAPI:
+    app = FastAPI()
+    latency = Latency(args)
+    error_rng = random.Random(args.seed + 1)
+    stats = {"requests": 0, "streams": 0, "rate_limited": 0}
+
+    @app.get("/v1/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if args.error_rate and error_rng.random() < args.error_rate:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": str(args.retry_after)},
+            )
+        messages = body.get("messages", [])
+        model = body.get("model", "fake")
+        if body.get("response_format", {}).get("type") == "json_object":
+            content = json.dumps(fake_correction(essay_text(messages), args.max_corrections), ensure_ascii=False)
+        else:
+            # 총평 합치기 같은 일반 요청
+            content = random.Random(essay_text(messages)).choice(FEEDBACKS)
+        completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        total = latency.sample()
+
+        if not body.get("stream"):
+            await asyncio.sleep(total)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage(messages, content),
+            }
+
+        stats["streams"] += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        async def events():
+            def chunk(delta: dict, finish_reason=None, usage_value=None) -> str:
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [] if usage_value else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    "usage": usage_value,
+                }
+                return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+            pieces = [content[i:i + args.chunk_chars] for i in range(0, len(content), args.chunk_chars)]
+            ttft = min(args.ttft, total)
+            gap = (total - ttft) / max(1, len(pieces))
+            await asyncio.sleep(ttft)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                yield chunk({"content": piece})
+                await asyncio.sleep(gap)
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk({}, usage_value=usage(messages, content))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-median", type=float, default=3.0, help="fixed/normal/lognormal의 중앙값(초)")
+    parser.add_argument("--latency-stddev", type=float, default=1.0, help="normal 분포의 표준편차(초)")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="lognormal 분포의 sigma")
+    parser.add_argument("--latency-min", type=float, default=0.05)
+    parser.add_argument("--latency-max", type=float, default=60.0)
+    parser.add_argument("--ttft", type=float, default=0.5, help="스트리밍 첫 청크까지의 시간(초)")
+    parser.add_argument("--chunk-chars", type=int, default=8, help="스트리밍 청크 하나의 글자 수")
+    parser.add_argument("--max-corrections", type=int, default=6)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429로 응답할 비율 (0~1)")
+    parser.add_argument("--retry-after", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    cli_args = parser.parse_args()
+    uvicorn.run(create_app(cli_args), host=cli_args.host, port=cli_args.port, log_level="warning")
@@ -0,0 +1,149 @@
+"""
+/corrections/* 라우트를 실제 동시성으로 두드리는 부하 벤치마크.
+
+가짜 LLM 서버와 함께 쓰면 비용 없이 재현 가능한 결과를 얻는다:
+
+    python benchmarks/fake_llm_server.py --port 8100 --latency lognormal --latency-median 3
+    LLM_BACKEND=fake uvicorn app.main:app --port 8000 --workers 2
+    python benchmarks/load_corrections.py --user-id <USER_ID> --topic-id <TOPIC_ID> \\
+        --essays 200 --concurrency 50 --mode sync
+
+에세이를 --essays개 새로 만든 뒤(에세이당 첨삭은 최대 3회) 각 에세이에 첨삭을 한 번씩 요청한다.
+--mode sync: POST /corrections/sessions 응답까지
+--mode background: background=true로 받은 job을 long-poll로 끝날 때까지
+--mode stream: SSE로 첫 첨삭 도착 시간(TTFC)과 done까지
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+SENTENCES = [
+    "나는 오늘 학교에서 친구들과 함께 환경 보호에 대해 토론을 했다.",
+    "플라스틱 사용을 줄이는것은 생각보다 어렵지만 꼭 필요한 일이다.",
+    "우리 반은 텀블러를 쓰기로 했고 선생님께서 좋은 생각이라고 말했다.",
+    "작은 습관이 모이면 큰 변화를 만들 수 있다고 생각한다.",
+    "하지만 모든 사람이 같은 생각을 하는 것은 아니였다.",
+    "그래서 나는 가족들에게도 분리수거를 꼼꼼하게 하자고 말할것이다.",
+    "책을 읽는것은 재미있다 왜냐하면 새로운 것을 알수 있다.",
+    "앞으로는 더 많은 사람들이 환경에 관심을 가졌으면 좋겠다.",
+]
+
+def summarize(label: str, samples: list) -> None:
+    if not samples:
+        print(f"{label}: 샘플 없음")
+        return
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    print(
+        f"{label}: n={len(ordered)} p50={statistics.median(ordered) * 1000:.0f}ms "
+        f"p95={pct(0.95):.0f}ms p99={pct(0.99):.0f}ms max={ordered[-1] * 1000:.0f}ms"
+    )
+
+def make_content(rng: random.Random, paragraphs: int) -> str:
+    return "".join(
+        "<p>" + " ".join(rng.sample(SENTENCES, 3)) + "</p>" for _ in range(paragraphs)
+    )
+
+async def create_essays(client: httpx.AsyncClient, args) -> list:
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(20)
+
+    async def create(i: int) -> str:
+        async with semaphore:
+            response = await client.post("/essays/", params={"user_id": args.user_id}, json={
+                "title": f"부하 테스트 {i}",
+                "content": make_content(rng, args.paragraphs) + f"<p>번호 {args.seed}-{i}.</p>",
+                "daily_essay_date": "2024-01-01",
+                "topic_id": args.topic_id,
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+    return await asyncio.gather(*(create(i) for i in range(args.essays)))
+
+async def run_sync(client: httpx.AsyncClient, essay_id: str) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/corrections/sessions", params={"essay_id": essay_id})
+    return {"status": response.status_code, "elapsed": time.perf_counter() - started}
+
+async def run_background(client: httpx.AsyncClient, essay_id: str) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/corrections/sessions", params={"essay_id": essay_id, "background": "true"})
+    if response.status_code != 202:
+        return {"status": response.status_code, "elapsed": time.perf_counter() - started}
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/corrections/jobs/{job_id}", params={"wait": 25})).json()
+        if job["status"] in ("succeeded", "failed"):
+            return {"status": job["status"], "elapsed": time.perf_counter() - started}
+
+async def run_stream(client: httpx.AsyncClient, essay_id: str) -> dict:
+    started = time.perf_counter()
+    first = None
+    status = "no-done"
+    async with client.stream("POST", "/corrections/sessions/stream", params={"essay_id": essay_id}) as response:
+        if response.status_code != 200:
+            return {"status": response.status_code, "elapsed": time.perf_counter() - started}
+        async for line in response.aiter_lines():
+            if line.startswith("event: correction") and first is None:
+                first = time.perf_counter() - started
+            elif line.startswith("event: done"):
+                status = 200
+            elif line.startswith("event: error"):
+                status = "error"
+    return {"status": status, "elapsed": time.perf_counter() - started, "first": first}
+
+async def main(args) -> None:
+    timeout = httpx.Timeout(args.timeout, connect=5)
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    runner = {"sync": run_sync, "background": run_background, "stream": run_stream}[args.mode]
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        essay_ids = await create_essays(client, args)
+        print(f"에세이 {len(essay_ids)}개 생성")
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def run(essay_id: str) -> dict:
+            async with semaphore:
+                try:
+                    return await runner(client, essay_id)
+                except httpx.HTTPError as e:
+                    return {"status": type(e).__name__, "elapsed": 0.0}
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run(essay_id) for essay_id in essay_ids))
+        wall = time.perf_counter() - started
+
+        statuses = {}
+        for r in results:
+            statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+        ok = [r for r in results if r["status"] in (200, "succeeded")]
+        summarize(f"{args.mode} (성공)", [r["elapsed"] for r in ok])
+        if args.mode == "stream":
+            summarize("stream 첫 첨삭까지", [r["first"] for r in ok if r.get("first") is not None])
+        print(f"상태: {statuses}")
+        print(f"처리량: {len(ok) / wall:.2f} 첨삭/초 (총 {wall:.1f}초, 동시성 {args.concurrency})")
+        for path in ("/corrections/scheduler/stats", "/corrections/llm/stats", "/corrections/cache/stats"):
+            response = await client.get(path)
+            if response.status_code == 200:
+                print(f"{path}: {json.dumps(response.json(), ensure_ascii=False)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--topic-id", required=True)
+    parser.add_argument("--essays", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mode", choices=["sync", "background", "stream"], default="sync")
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
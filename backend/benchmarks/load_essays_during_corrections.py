@@ -0,0 +1,86 @@
+"""
+첨삭 요청이 진행 중일 때 /essays/ 응답 시간이 유지되는지 확인하는 부하 벤치마크.
+
+실행 중인 서버를 대상으로 한다:
+
+    uvicorn app.main:app --port 8000
+    python benchmarks/load_essays_during_corrections.py \\
+        --user-id <USER_ID> --essay-id <ESSAY_ID> --concurrency 8
+
+1단계에서 첨삭 없이 /essays/ 지연 시간을 재고, 2단계에서 N개의 /corrections/sessions
+요청을 동시에 보내 놓고 같은 측정을 반복한다. 이벤트 루프가 막히지 않는다면 두 단계의
+p50/p95가 비슷해야 한다. 에세이당 첨삭은 최대 3회이므로 세션이 없는 에세이를 사용할 것.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def summarize(label: str, samples: list) -> None:
+    if not samples:
+        print(f"{label}: 샘플 없음")
+        return
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label}: n={len(ordered)} "
+        f"p50={statistics.median(ordered) * 1000:.1f}ms "
+        f"p95={p95 * 1000:.1f}ms "
+        f"max={ordered[-1] * 1000:.1f}ms"
+    )
+
+
+async def sample_essays(client: httpx.AsyncClient, user_id: str, count: int, interval: float) -> list:
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/essays/", params={"user_id": user_id})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def fire_correction(client: httpx.AsyncClient, endpoint: str, essay_id: str) -> tuple:
+    started = time.perf_counter()
+    response = await client.post(endpoint, params={"essay_id": essay_id})
+    return response.status_code, time.perf_counter() - started
+
+
+async def main(args) -> None:
+    timeout = httpx.Timeout(args.timeout, connect=5)
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+        baseline = await sample_essays(client, args.user_id, args.samples, args.interval)
+        summarize("baseline /essays/", baseline)
+
+        corrections = [
+            asyncio.create_task(fire_correction(client, args.endpoint, args.essay_id))
+            for _ in range(args.concurrency)
+        ]
+        # 첨삭 요청이 서버에 도달할 시간을 잠깐 준다
+        await asyncio.sleep(0.2)
+        loaded = await sample_essays(client, args.user_id, args.samples, args.interval)
+        summarize(f"/essays/ with {args.concurrency} corrections in flight", loaded)
+
+        results = await asyncio.gather(*corrections)
+        statuses = {}
+        for status, _ in results:
+            statuses[status] = statuses.get(status, 0) + 1
+        summarize(f"{args.endpoint} ({statuses})", [elapsed for _, elapsed in results])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--essay-id", required=True)
+    parser.add_argument("--endpoint", default="/corrections/sessions")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=30)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,49 @@
+"""
+기존 essays 행의 plain_text / char_count / word_count / sentence_count를 채운다.
+
+    cd backend
+    python scripts/backfill_essay_text.py --batch-size 200
+    python scripts/backfill_essay_text.py --all      # 이미 채워진 행도 다시 계산
+
+id 순서로 배치를 읽으므로 중간에 멈췄다가 --after <마지막 id>로 이어서 실행할 수 있다.
+배치마다 DB 함수 한 번으로 반영하며 updated_at은 바꾸지 않는다.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.supabase import close_db  # noqa: E402
+from app.core.text_stats import compute_text_stats  # noqa: E402
+from app.repositories import essays as essays_repo  # noqa: E402
+
+async def main(args) -> None:
+    after_id = args.after
+    total = 0
+    try:
+        while True:
+            rows = await essays_repo.list_essays_after(after_id, args.batch_size, only_missing_text=not args.all)
+            if not rows:
+                break
+            if not args.dry_run:
+                # 본문 변환은 CPU 작업이라 스레드에서 한다
+                stats = await asyncio.to_thread(
+                    lambda: [{"id": row["id"], **compute_text_stats(row["content"] or "")} for row in rows]
+                )
+                await essays_repo.backfill_text_stats(stats)
+            total += len(rows)
+            after_id = rows[-1]["id"]
+            print(f"{total} rows processed (last id: {after_id})")
+    finally:
+        await close_db()
+    print(f"done: {total} rows")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--after", default=None, help="이 id 다음부터 처리")
+    parser.add_argument("--all", action="store_true", help="plain_text가 이미 있는 행도 다시 계산")
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,55 @@
+"""
+주제 하나로 제출된 에세이 전체를 일괄 첨삭하고 결과가 나올 때까지 기다렸다가 correction_sessions에 넣는다.
+서버 없이 cron 등에서 밤새 돌릴 때 쓴다.
+
+    cd backend
+    python scripts/run_correction_batch.py --topic-id <topic id>
+    python scripts/run_correction_batch.py --resume <run id>     # 멈춘 실행 이어서 하기
+    python scripts/run_correction_batch.py --list
+
+BATCH_BACKEND=local 이면 OpenAI Batch API 대신 이 프로세스에서 요청을 직접 처리한다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.batch import BatchRun, list_states, summarize  # noqa: E402
+from app.core.log import setup_logging, stop_logging  # noqa: E402
+from app.core.openai_client import close_client  # noqa: E402
+from app.core.supabase import close_db  # noqa: E402
+
+async def main(args) -> None:
+    if args.list:
+        for state in list_states():
+            print(json.dumps(summarize(state), ensure_ascii=False))
+        return
+    run = BatchRun.load(args.resume) if args.resume else BatchRun.create(args.topic_id)
+    if run is None:
+        sys.exit(f"run {args.resume} not found")
+    try:
+        while True:
+            await run.advance()
+            print(json.dumps(summarize(run.state), ensure_ascii=False))
+            if run.finished:
+                break
+            await asyncio.sleep(args.poll_interval)
+    finally:
+        await close_client()
+        await close_db()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--topic-id")
+    group.add_argument("--resume", metavar="RUN_ID")
+    group.add_argument("--list", action="store_true")
+    parser.add_argument("--poll-interval", type=float, default=60)
+    setup_logging()
+    try:
+        asyncio.run(main(parser.parse_args()))
+    finally:
+        stop_logging()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# backend/ 에서 `python -m pytest tests` 로도, 저장소 루트에서 `pytest backend/tests` 로도 app 패키지를 찾게 한다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.core.supabase는 import할 때 접속 정보를 요구한다. 테스트는 실제로 접속하지 않는다
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
@@ -0,0 +1,49 @@
+from app.core.alignment import AhoCorasick, SpanAligner, align_corrections
+from app.models.correction import CorrectionCategory, CorrectionCreate
+
+HTML = "<p>나는 <b>학교에</b> 갔다.</p><p>나는 집에 갔다.</p>"
+
+def correction(original_text):
+    return CorrectionCreate(
+        essay_id="e",
+        category=CorrectionCategory.GRAMMAR,
+        original_text=original_text,
+        suggested_text=original_text,
+        explanation="",
+    )
+
+def test_aho_corasick_finds_overlapping_patterns():
+    assert AhoCorasick(["he", "she", "hers"]).find_all("ushers") == {0: [2], 1: [1], 2: [2]}
+
+def test_exact_match_maps_plain_and_html_offsets():
+    aligner = SpanAligner(HTML)
+    span = aligner.align("학교에 갔다")
+    assert aligner.plain_text[span["start"]:span["end"]] == "학교에 갔다"
+    assert HTML[span["html_start"]:span["html_end"]] == "학교에</b> 갔다"
+    assert span["match"] == "exact"
+
+def test_repeated_text_takes_next_free_occurrence():
+    aligner = SpanAligner(HTML)
+    first, second = aligner.align("나는"), aligner.align("나는")
+    assert (first["start"], second["start"]) == (0, 11)
+    # 모두 차지되면 첫 번째 위치로 돌아간다
+    assert aligner.align("나는")["start"] == 0
+
+def test_whitespace_differences_are_ignored():
+    span = SpanAligner(HTML).align("학교에갔다")
+    assert (span["start"], span["end"]) == (3, 9)
+
+def test_fuzzy_match_when_model_rewrites_original():
+    html = "<p>오늘은 친구들과 함께 공원에 가서 자전거를 탔다.</p>"
+    aligner = SpanAligner(html)
+    span = aligner.align("친구들과 함께 공원에 가서 자전기를 탔다")
+    assert span["match"] == "fuzzy"
+    assert aligner.plain_text[span["start"]:span["end"]] == "친구들과 함께 공원에 가서 자전거를 탔다"
+
+def test_unknown_text_has_no_span():
+    assert SpanAligner(HTML).align("없는 문장입니다") is None
+
+def test_align_corrections_prefers_exact_matches():
+    aligned = align_corrections(HTML, [correction("나는"), correction("나는"), correction("없는 문장입니다")])
+    assert [c.start for c in aligned] == [0, 11, None]
+    assert aligned[2].match is None
@@ -0,0 +1,11 @@
+from app.core.correction_cache import cache_key
+
+def test_whitespace_and_normalization_do_not_change_key():
+    assert cache_key("안녕 하세요.\n반가워요") == cache_key("안녕  하세요. 반가워요 ")
+
+def test_key_changes_with_prompt_model_and_config():
+    base = cache_key("글", model="m", prompt_version="v1", config="precheck=2;chunk=2500/1500/1")
+    assert base != cache_key("글", model="m2", prompt_version="v1", config="precheck=2;chunk=2500/1500/1")
+    assert base != cache_key("글", model="m", prompt_version="v2", config="precheck=2;chunk=2500/1500/1")
+    assert base != cache_key("글", model="m", prompt_version="v1", config="precheck=off;chunk=2500/1500/1")
+    assert base != cache_key("글", model="m", prompt_version="v1", config="precheck=2;chunk=3000/1500/1")
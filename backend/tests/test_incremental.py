@@ -0,0 +1,45 @@
+import asyncio
+
+from app.core import incremental
+from app.core.incremental import IncrementalPlan
+from app.models.correction import CorrectionCategory, CorrectionCreate
+
+PREVIOUS_TEXT = "첫째 문단에서 안녕 하세요 라고 했다.\n둘째 문단입니다.\n셋째 문단입니다.\n넷째 문단입니다."
+CURRENT_TEXT = "첫째 문단에서 안녕 하세요 라고 했다.\n둘째 문단을 고쳐 안녕 하세요 라고 썼다.\n셋째 문단입니다.\n넷째 문단입니다."
+
+def correction(original_text, category=CorrectionCategory.GRAMMAR):
+    return CorrectionCreate(
+        essay_id="",
+        category=category,
+        original_text=original_text,
+        suggested_text=original_text.replace(" ", ""),
+        explanation="",
+    )
+
+def plan():
+    previous = {
+        "content_snapshot": PREVIOUS_TEXT,
+        "corrections": [correction("안녕 하세요").model_dump(mode="json")],
+        "overall_feedback": "이전 총평",
+    }
+    return IncrementalPlan(CURRENT_TEXT, previous)
+
+def streamed(plan, corrections):
+    emitted = list(plan.carried)
+    for c in corrections:
+        if plan.accept(c, emitted):
+            emitted.append(c)
+    return emitted
+
+def test_stream_and_finish_drop_corrections_overlapping_carried(monkeypatch):
+    async def fake_summary(parts):
+        return " ".join(parts)
+
+    monkeypatch.setattr(incremental, "summarize_feedback", fake_summary)
+    p = plan()
+    assert p.mode == "incremental"
+    assert [c.original_text for c in p.carried] == ["안녕 하세요"]
+    new = [correction("안녕 하세요"), correction("고쳐 안녕 하세요 라고"), correction("둘째 문단을", CorrectionCategory.VOCABULARY)]
+    finished = asyncio.run(p.finish(new, "새 총평"))["corrections"]
+    assert [c.original_text for c in finished] == [c.original_text for c in streamed(p, new)]
+    assert [c.original_text for c in finished] == ["안녕 하세요", "둘째 문단을"]
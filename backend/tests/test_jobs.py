@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.jobs import FAILED, JobQueue, MemoryJobStore, SQLiteJobStore, SUCCEEDED
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    return MemoryJobStore()
+
+def test_prune_removes_only_expired_finished_jobs(store):
+    async def run():
+        done = await store.create("correction", {})
+        failed = await store.create("correction", {})
+        queued = await store.create("correction", {})
+        await store.claim(done["id"])
+        await store.finish(done["id"], SUCCEEDED, result={"ok": True})
+        await store.claim(failed["id"])
+        await store.finish(failed["id"], FAILED, error="boom")
+
+        assert await store.prune(older_than=60) == 0
+        await asyncio.sleep(0.02)
+        assert await store.prune(older_than=0.01) == 2
+        return [await store.get(job["id"]) for job in (done, failed, queued)]
+
+    done, failed, queued = asyncio.run(run())
+    assert done is None and failed is None
+    assert queued["status"] == "queued"
+
+def test_queue_runs_jobs_and_prunes_old_results(store):
+    async def run():
+        queue = JobQueue(store, workers=1, result_ttl=0)
+
+        async def handler(payload):
+            return {"echo": payload["n"]}
+
+        queue.register("echo", handler)
+        await queue.start()
+        try:
+            first = await queue.enqueue("echo", {"n": 1})
+            finished = await queue.wait(first["id"], timeout=1)
+            queue._pruned_at = time.monotonic() - 3600
+            await queue.enqueue("echo", {"n": 2})
+            return finished, await queue.get(first["id"])
+        finally:
+            await queue.stop()
+
+    finished, after_prune = asyncio.run(run())
+    assert finished["status"] == SUCCEEDED and finished["result"] == {"echo": 1}
+    assert after_prune is None
@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from app.core.json_stream import CorrectionStreamParser
+
+DOCUMENT = json.dumps({
+    "corrections": [
+        {"category": "grammar", "original_text": "안녕 하세요", "suggested_text": "안녕하세요", "explanation": "붙여 씁니다."},
+        {"category": "expression", "original_text": "\"따옴표\" {괄호} [대괄호]", "suggested_text": "x\\y", "explanation": "}]"},
+    ],
+    "overall_feedback": "잘 썼습니다. {\"corrections\": []}",
+}, ensure_ascii=False)
+
+def feed_in_chunks(size):
+    parser = CorrectionStreamParser("corrections")
+    items = []
+    for i in range(0, len(DOCUMENT), size):
+        items.extend(parser.feed(DOCUMENT[i:i + size]))
+    return parser, items
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, len(DOCUMENT)])
+def test_items_are_emitted_regardless_of_chunk_boundaries(size):
+    parser, items = feed_in_chunks(size)
+    expected = json.loads(DOCUMENT)
+    assert items == expected["corrections"]
+    assert parser.result() == expected
+
+def test_item_is_emitted_as_soon_as_it_closes():
+    parser = CorrectionStreamParser("corrections")
+    first_end = DOCUMENT.index("},") + 1
+    assert parser.feed(DOCUMENT[:first_end - 1]) == []
+    assert [item["original_text"] for item in parser.feed(DOCUMENT[first_end - 1:first_end])] == ["안녕 하세요"]
+
+def test_other_arrays_are_ignored():
+    parser = CorrectionStreamParser("corrections")
+    assert parser.feed('{"notes": [{"a": 1}], "corrections": [{"b": 2}]}') == [{"b": 2}]
@@ -0,0 +1,45 @@
+import base64
+
+import pytest
+from postgrest import AsyncPostgrestClient
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset, next_cursor
+
+ROW = {"created_at": "2024-08-01T09:12:33.123456+00:00", "id": "0b9d8a5e-3f3c-4c1e-9a57-2f1c6d4e8b10"}
+
+@pytest.mark.parametrize("created_at", [
+    "2024-08-01T09:12:33.123456+00:00",
+    "2024-08-01T09:12:33+09:00",
+    "2024-08-01 09:12:33Z",
+    "2024-08-01T09:12:33",
+])
+def test_cursor_round_trip(created_at):
+    row = {**ROW, "created_at": created_at}
+    cursor = encode_cursor(row)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row["id"])
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not-base64!",
+    base64.urlsafe_b64encode(b'{"a":1}').decode(),
+    base64.urlsafe_b64encode(b'["2024-08-01","0b9d8a5e-3f3c-4c1e-9a57-2f1c6d4e8b10"]').decode(),
+    base64.urlsafe_b64encode(b'["2024-08-01T09:12:33","1),id.gt.(0"]').decode(),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+def test_keyset_filters_after_cursor():
+    query = AsyncPostgrestClient("http://localhost").table("essays").select("id")
+    params = dict(keyset(query, encode_cursor(ROW), 20).params)
+    assert params["order"] == "created_at.desc,id.desc"
+    assert params["limit"] == "20"
+    assert params["or"] == (
+        f'(created_at.lt."{ROW["created_at"]}",and(created_at.eq."{ROW["created_at"]}",id.lt.{ROW["id"]}))'
+    )
+
+def test_next_cursor_only_on_full_page():
+    assert next_cursor([ROW, ROW], 2) == encode_cursor(ROW)
+    assert next_cursor([ROW], 2) is None
+    assert next_cursor([], 2) is None
@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.precheck import precheck
+
+def fixes(text):
+    return [(c.original_text, c.suggested_text) for c in precheck(text)]
+
+@pytest.mark.parametrize("text", [
+    "실수를 했다.",
+    "필수가 아니다.",
+    "말수가 적다.",
+    "일수는 많다.",
+    "점수가 올랐다.",
+    "횟수를 세었다.",
+    "변수가 많다.",
+    "교수가 되었다.",
+    "정수를 더한다.",
+    "말실수를 했다.",
+    "갈수록 좋아진다.",
+    "물수건을 챙겼다.",
+    "군것질을 했다.",
+])
+def test_nouns_are_not_split(text):
+    assert fixes(text) == []
+
+@pytest.mark.parametrize("text, expected", [
+    ("할수 있다.", ("할수", "할 수")),
+    ("먹을수 없다.", ("먹을수", "먹을 수")),
+    ("알수없다.", ("알수없다.", "알 수 없다.")),
+    ("마실수 있을까?", ("마실수", "마실 수")),
+    ("읽는것이 좋다.", ("읽는것이", "읽는 것이")),
+    ("갈때 보자.", ("갈때", "갈 때")),
+    ("할뿐이다.", ("할뿐이다.", "할 뿐이다.")),
+])
+def test_dependent_nouns_are_split(text, expected):
+    assert expected in fixes(text)
+
+def test_spelling_and_punctuation():
+    assert fixes("그건 아니였다.그래서 돌아갔다.") == [("아니였다.그래서", "아니었다. 그래서")]
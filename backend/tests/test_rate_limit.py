@@ -0,0 +1,143 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.core import openai_client
+from app.core.rate_limit import BULK, INTERACTIVE, LLMScheduler, RateLimitExceeded, TokenBucket, request_class
+
+def test_bucket_consume_refund_and_drain():
+    bucket = TokenBucket(100, 0.001)
+    bucket.consume(80)
+    assert bucket.time_until(50) > 0
+    bucket.refund(60)
+    assert bucket.time_until(50) == 0
+    # 환불해도 용량을 넘지 않고, 더 쓴 만큼은 빚(음수)으로 남는다
+    bucket.refund(1000)
+    assert bucket.tokens == pytest.approx(100, abs=0.01)
+    bucket.refund(-1000)
+    assert bucket.tokens == pytest.approx(-100, abs=0.01)
+    bucket.refund(150)
+    bucket.drain()
+    assert bucket.tokens <= 0
+
+def test_interactive_requests_go_first():
+    async def run():
+        scheduler = LLMScheduler(rpm=600, tpm=100000)
+        scheduler.requests.tokens = 0
+        order = []
+
+        async def call(name, priority):
+            await scheduler.acquire(10, priority=priority, may_reject=False)
+            order.append(name)
+
+        bulk = asyncio.create_task(call("bulk", BULK))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await asyncio.gather(bulk, interactive)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "bulk"]
+
+def test_rejects_when_wait_is_too_long():
+    async def run():
+        scheduler = LLMScheduler(rpm=60, tpm=100000, max_wait=0.5)
+        scheduler.requests.tokens = 0
+        await scheduler.acquire(10, may_reject=True)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(run())
+
+def test_slot_settles_reserved_tokens():
+    async def run():
+        scheduler = LLMScheduler(rpm=600, tpm=6000)
+        async with scheduler.slot(1000) as usage:
+            usage["total_tokens"] = 400
+        return scheduler.tokens.tokens
+
+    assert asyncio.run(run()) == pytest.approx(5600, abs=5)
+
+class FakeBackend:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+            response = httpx.Response(429, headers={"retry-after": "1"}, request=request)
+            raise RateLimitError("rate limited", response=response, body=None)
+        if kwargs.get("stream"):
+            return FakeStream()
+        return SimpleNamespace(usage=None)
+
+class FakeStream:
+    async def __aiter__(self):
+        yield SimpleNamespace(usage=None, choices=[])
+        yield SimpleNamespace(usage=SimpleNamespace(total_tokens=100), choices=[])
+
+    async def close(self):
+        pass
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    scheduler = LLMScheduler(rpm=6000, tpm=1000000)
+    monkeypatch.setattr(openai_client, "scheduler", scheduler)
+
+    def use(failures=0):
+        backend = FakeBackend(failures)
+        monkeypatch.setattr(openai_client, "get_backend", lambda: backend)
+        return backend, scheduler
+
+    return use
+
+def test_provider_429_is_raised_for_interactive_requests(fake_llm):
+    backend, _ = fake_llm(failures=1)
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(openai_client.create_chat_completion([{"role": "user", "content": "안녕"}]))
+    assert backend.calls == 1
+
+def test_provider_429_is_retried_for_bulk_requests(fake_llm):
+    backend, _ = fake_llm(failures=1)
+
+    async def run():
+        with request_class(BULK, may_reject=False):
+            return await openai_client.create_chat_completion([{"role": "user", "content": "안녕"}])
+
+    assert asyncio.run(run()) is not None
+    assert backend.calls == 2
+
+def test_bulk_429_retries_are_capped(fake_llm, monkeypatch):
+    monkeypatch.setattr(openai_client, "OPENAI_RATE_LIMIT_RETRIES", 1)
+    backend, _ = fake_llm(failures=10)
+
+    async def run():
+        with request_class(BULK, may_reject=False):
+            await openai_client.create_chat_completion([{"role": "user", "content": "안녕"}])
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(run())
+    assert backend.calls == 2
+
+def test_scheduled_client_does_not_retry_inside_the_sdk(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    assert openai_client._client_for().max_retries == 0
+    assert openai_client._client_for(base_url="http://localhost:1", api_key="fake").max_retries == 0
+
+def test_stream_settles_reserved_tokens(fake_llm):
+    _, scheduler = fake_llm()
+
+    async def run():
+        stream = await openai_client.create_chat_completion([{"role": "user", "content": "안녕"}], max_tokens=900, stream=True)
+        before = scheduler.tokens.tokens
+        async for _ in stream:
+            pass
+        await stream.close()
+        return before, scheduler.tokens.tokens
+
+    before, after = asyncio.run(run())
+    # 예약한 902토큰 중 실제로 쓴 100토큰을 뺀 나머지가 돌아온다
+    assert after - before == pytest.approx(802, abs=50)
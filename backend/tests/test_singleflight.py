@@ -0,0 +1,89 @@
+import asyncio
+import fcntl
+import os
+
+import pytest
+
+from app.core.singleflight import SingleFlight, file_lock
+
+def test_file_lock_waits_without_blocking_the_loop(tmp_path):
+    path = str(tmp_path / "key.lock")
+
+    async def run():
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        async def second():
+            async with file_lock(path, poll=0.01):
+                pass
+
+        ticker = asyncio.create_task(tick())
+        async with file_lock(path):
+            # 같은 파일에 대한 두 번째 락은 앞의 락이 풀릴 때까지 기다린다
+            waiter = asyncio.create_task(second())
+            await asyncio.sleep(0.1)
+            assert not waiter.done()
+        await waiter
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 5
+
+def test_file_lock_times_out(tmp_path):
+    path = str(tmp_path / "key.lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        async def run():
+            async with file_lock(path, timeout=0.05, poll=0.01):
+                pass
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(run())
+    finally:
+        os.close(fd)
+
+def test_concurrent_calls_share_one_result(tmp_path):
+    async def run():
+        flight = SingleFlight(lock_dir=str(tmp_path))
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"n": calls}
+
+        results = await asyncio.gather(*(flight.do("essay-1", work) for _ in range(5)))
+        return calls, results
+
+    calls, results = asyncio.run(run())
+    assert calls == 1
+    assert results == [{"n": 1}] * 5
+
+def test_file_mode_does_not_reuse_results_for_later_calls(tmp_path):
+    async def run():
+        leader = SingleFlight(lock_dir=str(tmp_path))
+        other_worker = SingleFlight(lock_dir=str(tmp_path))
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"n": calls}
+
+        # 다른 워커가 락을 기다리는 동안 끝난 결과는 나눠 갖는다
+        first, waited = await asyncio.gather(leader.do("essay-1", work), other_worker.do("essay-1", work))
+        # 끝난 뒤에 따로 들어온 요청은 다시 실행한다
+        later = await other_worker.do("essay-1", work)
+        return first, waited, later, calls
+
+    first, waited, later, calls = asyncio.run(run())
+    assert first == waited == {"n": 1}
+    assert later == {"n": 2}
+    assert calls == 2
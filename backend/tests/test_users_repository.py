@@ -0,0 +1,23 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.repositories import users
+
+@pytest.fixture
+def captured(monkeypatch):
+    queries = []
+
+    async def fake_execute(query):
+        queries.append(query)
+        return SimpleNamespace(data=[{"id": "1"}])
+
+    monkeypatch.setattr(users, "execute", fake_execute)
+    return queries
+
+def test_insert_and_update_return_public_columns_only(captured):
+    asyncio.run(users.insert_user({"username": "a", "password": "secret"}))
+    asyncio.run(users.update_user("1", {"password": "secret"}))
+    for query in captured:
+        assert query.params["select"] == "id,username,name,role,created_at"
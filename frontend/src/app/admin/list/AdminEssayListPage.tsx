@@ -1,12 +1,12 @@
 'use client';
 
 import { useEffect, useState } from 'react';
-import { getAdminEssayTopics, EssayTopic, deleteAdminEssayTopic } from '@/lib/api';
+import { getAdminEssayTopic, getAdminEssayTopics, EssayTopicSummary, deleteAdminEssayTopic } from '@/lib/api';
 import { useRouter } from 'next/navigation';
 import { supabase } from '@/lib/supabase';
 
 export default function AdminEssayListPage() {
-  const [topics, setTopics] = useState<EssayTopic[]>([]);
+  const [topics, setTopics] = useState<EssayTopicSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [deleteLoading, setDeleteLoading] = useState<string | null>(null);
@@ -38,10 +38,11 @@ export default function AdminEssayListPage() {
   };
 
   const handleDelete = async (topicId: string) => {
-    const topic = topics.find(t => t.id === topicId);
     if (!window.confirm('정말로 이 주제를 삭제하시겠습니까?')) return;
     setDeleteLoading(topicId);
     try {
+      // 목록에는 읽을거리 전체가 없으므로 상세를 받아 온다
+      const topic = await getAdminEssayTopic(topicId);
       // 1. reading_material에서 이미지 URL 추출
       if (topic && topic.reading_material) {
         const urls = Array.from(topic.reading_material.matchAll(/src=["']([^"']+\/image\/[^"']+)["']/g)).map(m => m[1]);
@@ -136,7 +137,7 @@ export default function AdminEssayListPage() {
             >
               <div style={{ fontWeight: 600, fontSize: 20, color: '#7c3aed', marginBottom: 4 }}>{topic.topic}</div>
               <div style={{ fontSize: 15, color: '#6d28d9', marginBottom: 4 }}>{new Date(topic.created_at).toLocaleDateString('ko-KR')}</div>
-              <div style={{ fontSize: 15, color: '#444', overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap', maxWidth: 260 }}>{getPreviewText(topic.reading_material, 30)}</div>
+              <div style={{ fontSize: 15, color: '#444', overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap', maxWidth: 260 }}>{getPreviewText(topic.preview || '', 30)}</div>
               <div style={{ display: 'flex', gap: 10, width: '100%', marginTop: 12 }}>
                 <button
                   onClick={e => { e.stopPropagation(); handleEdit(topic.id); }}
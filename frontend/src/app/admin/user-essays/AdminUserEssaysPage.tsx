@@ -1,25 +1,33 @@
 "use client";
 import { useEffect, useState } from "react";
-import { getUsers, User } from "@/lib/api";
+import { EssayTopicSummary, getAdminEssayTopics, getUserEssayStats, User, UserEssayStats } from "@/lib/api";
 
 interface Props {
   onSelectUser?: (user: User) => void;
 }
 
 export default function AdminUserEssaysPage({ onSelectUser }: Props) {
-  const [users, setUsers] = useState<User[]>([]);
+  const [users, setUsers] = useState<UserEssayStats[]>([]);
+  const [topics, setTopics] = useState<EssayTopicSummary[]>([]);
+  const [topicId, setTopicId] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    fetchUsers();
+    getAdminEssayTopics().then(setTopics);
   }, []);
 
+  useEffect(() => {
+    fetchUsers();
+    // eslint-disable-next-line
+  }, [topicId]);
+
   const fetchUsers = async () => {
     setLoading(true);
     setError(null);
     try {
-      const data = await getUsers();
+      // 회원 목록과 회원별 에세이/세션 집계를 한 번에 받는다
+      const data = await getUserEssayStats(topicId || undefined);
       setUsers(data);
     } catch {
       setError("An error occurred while fetching users.");
@@ -31,6 +39,16 @@ export default function AdminUserEssaysPage({ onSelectUser }: Props) {
   return (
     <div style={{ maxWidth: 900, margin: "0 auto", padding: 32 }}>
       <h2 style={{ fontSize: 24, fontWeight: 700, color: "#222", marginBottom: 32 }}>회원별 에세이 관리</h2>
+      <select
+        value={topicId}
+        onChange={(e) => setTopicId(e.target.value)}
+        style={{ marginBottom: 24, padding: "8px 12px", border: "1.5px solid #ede9fe", borderRadius: 8, color: "#6d28d9", fontSize: 15 }}
+      >
+        <option value="">전체 주제</option>
+        {topics.map((topic) => (
+          <option key={topic.id} value={topic.id}>{topic.topic}</option>
+        ))}
+      </select>
       {error && <div style={{ color: "red", marginBottom: 16 }}>{error}</div>}
       {loading ? (
         <div>로딩 중...</div>
@@ -68,6 +86,13 @@ export default function AdminUserEssaysPage({ onSelectUser }: Props) {
             >
               <div style={{ fontWeight: 600, fontSize: 20, color: "#7c3aed", marginBottom: 4 }}>{user.username}</div>
               <div style={{ fontSize: 15, color: "#6d28d9" }}>{user.role === "admin" ? "관리자" : "일반 회원"}</div>
+              <div style={{ fontSize: 14, color: "#555" }}>
+                에세이 {user.essay_count}편 · 제출 {user.submitted_count}편 · 첨삭 {user.session_count}회
+              </div>
+              <div style={{ fontSize: 13, color: "#888" }}>
+                총 {user.word_total.toLocaleString()}단어
+                {user.last_submitted_at && ` · 최근 제출 ${new Date(user.last_submitted_at).toLocaleDateString()}`}
+              </div>
             </div>
           ))}
         </div>
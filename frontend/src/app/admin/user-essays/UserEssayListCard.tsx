@@ -1,6 +1,6 @@
 "use client";
 import { useEffect, useState } from "react";
-import { Essay, getEssays, User } from "@/lib/api";
+import { Essay, EssaySummary, getEssay, getEssays, User } from "@/lib/api";
 
 interface Props {
   user: User;
@@ -9,7 +9,7 @@ interface Props {
 }
 
 export default function UserEssayListCard({ user, onBack, onSelectEssay }: Props) {
-  const [essays, setEssays] = useState<Essay[]>([]);
+  const [essays, setEssays] = useState<EssaySummary[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -50,7 +50,7 @@ export default function UserEssayListCard({ user, onBack, onSelectEssay }: Props
           {essays.map((essay) => (
             <div
               key={essay.id}
-              onClick={() => onSelectEssay(essay)}
+              onClick={async () => onSelectEssay(await getEssay(essay.id, user.id))}
               style={{
                 flex: "1 1 260px",
                 minWidth: 260,
@@ -79,7 +79,7 @@ export default function UserEssayListCard({ user, onBack, onSelectEssay }: Props
             >
               <div style={{ fontWeight: 600, fontSize: 18, color: "#7c3aed", marginBottom: 4 }}>{essay.title}</div>
               <div style={{ fontSize: 14, color: "#6d28d9", marginBottom: 4 }}>{essay.daily_essay_date}</div>
-              <div style={{ fontSize: 15, color: "#444", overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap', maxWidth: 260 }}>{essay.content.replace(/<[^>]+>/g, '').slice(0, 40)}...</div>
+              <div style={{ fontSize: 15, color: "#444", overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap', maxWidth: 260 }}>{(essay.preview || '').slice(0, 40)}...</div>
             </div>
           ))}
         </div>
@@ -2,13 +2,13 @@
 
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
-import { getEssays, Essay, User, getUsers } from '@/lib/api';
+import { getEssays, EssaySummary, User, getUser } from '@/lib/api';
 import { Cog6ToothIcon, ArrowRightOnRectangleIcon, PlusIcon } from '@heroicons/react/24/outline';
 import UserSettingsModal from './components/UserSettingsModal';
 import Image from 'next/image';
 
 export default function UserHomePage() {
-  const [essays, setEssays] = useState<Essay[]>([]);
+  const [essays, setEssays] = useState<EssaySummary[]>([]);
   const [showSettings, setShowSettings] = useState(false);
   const [user, setUser] = useState<User | null>(null);
   const router = useRouter();
@@ -24,9 +24,7 @@ export default function UserHomePage() {
         const data = await getEssays(userId);
         setEssays(data);
         // 서버에서 내 user 정보 받아오기
-        const users = await getUsers();
-        const me = users.find(u => u.id === userId);
-        setUser(me || null);
+        setUser(await getUser(userId).catch(() => null));
       } catch (err) {
         console.error('에세이 목록을 불러오는데 실패했습니다:', err);
       }
@@ -49,8 +47,7 @@ export default function UserHomePage() {
     // 이름 변경 후 서버에서 최신 user 정보 받아와 상태에 반영
     const userId = localStorage.getItem('user_id');
     if (userId) {
-      const users = await getUsers();
-      const me = users.find(u => u.id === userId);
+      const me = await getUser(userId).catch(() => null);
       if (me) {
         setUser(me);
         localStorage.setItem('name', me.name || '베리베리');
@@ -111,10 +108,10 @@ export default function UserHomePage() {
                   <span className="text-xs text-gray-400">{new Date(essay.created_at).toLocaleDateString()}</span>
                 </div>
                 <div className="text-gray-700 text-sm line-clamp-2 mb-2">
-                  {essay.content}
+                  {essay.preview}
                 </div>
                 <div className="flex justify-between items-center mt-2">
-                  <span className="text-xs text-gray-400">글자수: {essay.content.length}자</span>
+                  <span className="text-xs text-gray-400">글자수: {essay.char_count}자</span>
                 </div>
               </div>
             ))}
@@ -2,11 +2,11 @@
 
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
-import { getActiveEssayTopics, EssayTopic } from '@/lib/api';
+import { getActiveEssayTopics, EssayTopicSummary } from '@/lib/api';
 import { ArrowLeftIcon } from '@heroicons/react/24/outline';
 
 export default function SelectTopicPage() {
-  const [topics, setTopics] = useState<EssayTopic[]>([]);
+  const [topics, setTopics] = useState<EssayTopicSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const router = useRouter();
@@ -70,7 +70,7 @@ export default function SelectTopicPage() {
               >
                 <h2 className="font-bold text-lg text-gray-900 mb-2">{topic.topic}</h2>
                 <div className="text-gray-700 text-sm whitespace-pre-wrap mb-2">
-                  {getPreviewText(topic.reading_material, 30)}
+                  {getPreviewText(topic.preview || '', 30)}
                 </div>
                 <button
                   className="mt-2 px-4 py-2 rounded-full bg-[#a78bfa] text-white text-sm font-semibold hover:bg-[#7c3aed] transition self-end"
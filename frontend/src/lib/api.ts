@@ -7,6 +7,25 @@ export interface Essay {
   daily_essay_date: string;
   user_id: string;
   word_count: number;
+  char_count?: number;
+  sentence_count?: number;
+  plain_text?: string | null;
+  created_at: string;
+  updated_at: string;
+  is_submitted: boolean;
+  topic_id: string;
+}
+
+// 목록 API가 내려주는 요약 (본문 대신 앞부분 미리보기만 있다. 본문은 getEssay로 받는다)
+export interface EssaySummary {
+  id: string;
+  title: string;
+  daily_essay_date: string;
+  user_id: string;
+  word_count: number;
+  char_count: number;
+  sentence_count: number;
+  preview?: string | null;
   created_at: string;
   updated_at: string;
   is_submitted: boolean;
@@ -20,6 +39,12 @@ export interface Correction {
   original_text: string;
   suggested_text: string;
   explanation: string;
+  // 서버가 찾아 둔 원문 위치 (plain text / 에세이 HTML 기준, 못 찾으면 null)
+  start?: number | null;
+  end?: number | null;
+  html_start?: number | null;
+  html_end?: number | null;
+  match?: 'exact' | 'fuzzy' | null;
   created_at: string;
   updated_at: string;
 }
@@ -39,6 +64,33 @@ export interface EssayTopic {
   updated_at: string;
 }
 
+// 주제 목록 요약 (읽을거리 전체 대신 태그를 뺀 미리보기만 있다)
+export interface EssayTopicSummary {
+  id: string;
+  topic: string;
+  is_active: boolean;
+  preview?: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+// 목록 API는 한 페이지씩 내려주고 다음 페이지 cursor를 X-Next-Cursor 헤더로 준다
+async function fetchAllPages<T>(url: string, errorMessage: string, init?: RequestInit): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = url.includes('?') ? '&' : '?';
+    const response = await fetch(cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url, init);
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.detail || errorMessage);
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}
+
 interface CreateEssayData {
   title: string;
   content: string;
@@ -64,15 +116,8 @@ export async function createEssay(userId: string, data: CreateEssayData): Promis
   return response.json();
 }
 
-export async function getEssays(userId: string): Promise<Essay[]> {
-  const response = await fetch(`${API_BASE_URL}/essays/?user_id=${userId}`);
-
-  if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.detail || 'Failed to fetch essays');
-  }
-
-  return response.json();
+export async function getEssays(userId: string): Promise<EssaySummary[]> {
+  return fetchAllPages<EssaySummary>(`${API_BASE_URL}/essays/?user_id=${userId}`, 'Failed to fetch essays');
 }
 
 export async function getEssay(essayId: string, userId: string): Promise<Essay> {
@@ -158,6 +203,88 @@ export async function createCorrectionSession(essayId: string): Promise<Correcti
   return response.json();
 }
 
+export interface CorrectionJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  result: CorrectionSession | null;
+  error: string | null;
+}
+
+// 첨삭을 백그라운드 작업으로 맡기고 job id를 받는다
+export async function createCorrectionJob(essayId: string): Promise<CorrectionJob> {
+  const response = await fetch(`${API_BASE_URL}/corrections/sessions?essay_id=${essayId}&background=true`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+  });
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to create correction job');
+  }
+  return response.json();
+}
+
+// waitSeconds 동안 서버에서 완료를 기다린다 (long-poll)
+export async function getCorrectionJob(jobId: string, waitSeconds: number = 25): Promise<CorrectionJob> {
+  const response = await fetch(`${API_BASE_URL}/corrections/jobs/${jobId}?wait=${waitSeconds}`);
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch correction job');
+  }
+  return response.json();
+}
+
+// 첨삭을 SSE로 받아 완성되는 대로 콜백에 넘긴다
+export async function streamCorrectionSession(
+  essayId: string,
+  handlers: {
+    onCorrection?: (correction: Correction) => void;
+    onOverallFeedback?: (feedback: string) => void;
+  } = {}
+): Promise<number> {
+  const response = await fetch(`${API_BASE_URL}/corrections/sessions/stream?essay_id=${essayId}`, {
+    method: 'POST',
+    headers: {
+      Accept: 'text/event-stream',
+    },
+  });
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || 'Failed to create correction session');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let sessionNumber = 0;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === 'correction') handlers.onCorrection?.(payload);
+      else if (event === 'overall_feedback') handlers.onOverallFeedback?.(payload.overall_feedback);
+      else if (event === 'done') sessionNumber = payload.session_number;
+      else if (event === 'error') throw new Error(payload.detail || 'Failed to create correction session');
+    }
+  }
+  return sessionNumber;
+}
+
 export async function getCurrentEssayTopic(): Promise<EssayTopic> {
   const response = await fetch(`${API_BASE_URL}/essay-topic/current`);
   if (!response.ok) {
@@ -168,18 +295,11 @@ export async function getCurrentEssayTopic(): Promise<EssayTopic> {
 
 // 어드민: 현재 활성화된 에세이 주제/읽을거리 조회
 export async function getAdminEssayTopic(id?: string): Promise<EssayTopic | null> {
-  const endpoint = id ? `${API_BASE_URL}/api/admin/essay-topic?id=${id}` : `${API_BASE_URL}/api/admin/essay-topic`;
+  // ID가 있으면 그 주제를, 없으면 현재 활성화된 주제를 읽을거리까지 받는다
+  const endpoint = id ? `${API_BASE_URL}/api/admin/essay-topic/${id}` : `${API_BASE_URL}/essay-topic/current`;
   const response = await fetch(endpoint);
   if (!response.ok) return null;
-  const data = await response.json();
-  
-  if (id) {
-    // ID로 특정 주제 조회
-    return Array.isArray(data) ? data.find((t) => t.id === id) || null : null;
-  } else {
-    // 활성화된 주제 조회
-    return Array.isArray(data) ? data.find((t) => t.is_active) || null : null;
-  }
+  return response.json();
 }
 
 // 어드민: 에세이 주제/읽을거리 저장
@@ -209,10 +329,12 @@ export async function setAdminEssayTopic(
 }
 
 // 어드민: 에세이 주제 전체 목록 조회
-export async function getAdminEssayTopics(): Promise<EssayTopic[]> {
-  const response = await fetch(`${API_BASE_URL}/api/admin/essay-topic`);
-  if (!response.ok) return [];
-  return response.json();
+export async function getAdminEssayTopics(): Promise<EssayTopicSummary[]> {
+  try {
+    return await fetchAllPages<EssayTopicSummary>(`${API_BASE_URL}/api/admin/essay-topic`, '주제 목록을 불러오지 못했습니다.');
+  } catch {
+    return [];
+  }
 }
 
 // 어드민: 에세이 주제 삭제
@@ -224,13 +346,9 @@ export async function deleteAdminEssayTopic(id: string): Promise<boolean> {
 }
 
 // 사용자: 활성화된 에세이 주제 목록 조회
-export async function getActiveEssayTopics(): Promise<EssayTopic[]> {
-  const response = await fetch(`${API_BASE_URL}/essay-topic/`);
-  if (!response.ok) {
-    throw new Error('에세이 주제 목록을 불러오는데 실패했습니다.');
-  }
-  const topics = await response.json();
-  return topics.filter((topic: EssayTopic) => topic.is_active);
+export async function getActiveEssayTopics(): Promise<EssayTopicSummary[]> {
+  const topics = await fetchAllPages<EssayTopicSummary>(`${API_BASE_URL}/essay-topic/`, '에세이 주제 목록을 불러오는데 실패했습니다.');
+  return topics.filter((topic) => topic.is_active);
 }
 
 // 어드민: 에세이 주제 활성/비활성 토글
@@ -263,10 +381,31 @@ export interface User {
 }
 
 export async function getUsers(): Promise<User[]> {
-  const res = await fetch(`${API_BASE_URL}/api/auth/users`, { credentials: 'include' });
-  if (!res.ok) throw new Error('회원 목록을 불러오지 못했습니다');
-  const users = await res.json();
-  return users.map((u: Record<string, unknown>) => ({ ...u, name: u.name || '베리베리' }));
+  const users = await fetchAllPages<User>(`${API_BASE_URL}/api/auth/users`, '회원 목록을 불러오지 못했습니다', { credentials: 'include' });
+  return users.map((u) => ({ ...u, name: u.name || '베리베리' }));
+}
+
+// 어드민: 회원별 에세이 수/제출 수/첨삭 세션 수/단어 수 (topicId를 주면 그 주제만)
+export interface UserEssayStats extends User {
+  created_at: string;
+  essay_count: number;
+  submitted_count: number;
+  last_submitted_at: string | null;
+  session_count: number;
+  word_total: number;
+}
+
+export async function getUserEssayStats(topicId?: string): Promise<UserEssayStats[]> {
+  const query = topicId ? `?topic_id=${encodeURIComponent(topicId)}` : '';
+  const rows = await fetchAllPages<UserEssayStats>(`${API_BASE_URL}/api/admin/essays/user-stats${query}`, '회원별 에세이 현황을 불러오지 못했습니다', { credentials: 'include' });
+  return rows.map((u) => ({ ...u, name: u.name || '베리베리' }));
+}
+
+export async function getUser(userId: string): Promise<User> {
+  const res = await fetch(`${API_BASE_URL}/api/auth/users/${userId}`, { credentials: 'include' });
+  if (!res.ok) throw new Error('회원 정보를 불러오지 못했습니다');
+  const user = await res.json();
+  return { ...user, name: user.name || '베리베리' };
 }
 
 export async function updateUser(userId: string, data: Partial<User>): Promise<User> {
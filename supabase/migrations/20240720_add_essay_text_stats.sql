@@ -0,0 +1,7 @@
+-- 저장 시점에 계산한 plain text와 글 통계를 보관한다
+ALTER TABLE essays ADD COLUMN IF NOT EXISTS plain_text TEXT;
+ALTER TABLE essays ADD COLUMN IF NOT EXISTS char_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE essays ADD COLUMN IF NOT EXISTS sentence_count INTEGER NOT NULL DEFAULT 0;
+
+-- 백필 대상(plain_text가 비어 있는 행)을 빠르게 찾기 위한 인덱스
+CREATE INDEX IF NOT EXISTS idx_essays_plain_text_missing ON essays(id) WHERE plain_text IS NULL;
@@ -0,0 +1,4 @@
+-- 다음 회차에서 바뀐 문단만 다시 첨삭할 수 있도록 첨삭 당시의 plain text를 남긴다
+ALTER TABLE correction_sessions ADD COLUMN IF NOT EXISTS content_snapshot TEXT;
+-- 증분 첨삭 여부, 다시 보낸 문단 수, 절약한 토큰 추정치 등
+ALTER TABLE correction_sessions ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'::jsonb;
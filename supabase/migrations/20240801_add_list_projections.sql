@@ -0,0 +1,10 @@
+-- 목록 화면은 본문 전체 대신 앞부분 미리보기만 읽는다 (저장할 때 DB가 계산해 둔다)
+ALTER TABLE essays ADD COLUMN IF NOT EXISTS preview TEXT
+    GENERATED ALWAYS AS (left(plain_text, 120)) STORED;
+ALTER TABLE essay_topics ADD COLUMN IF NOT EXISTS preview TEXT
+    GENERATED ALWAYS AS (left(regexp_replace(reading_material, '<[^>]+>', '', 'g'), 120)) STORED;
+
+-- (created_at, id) 기준 keyset 페이지네이션: 페이지마다 인덱스에서 바로 이어 읽는다
+CREATE INDEX IF NOT EXISTS idx_essays_user_created ON essays(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_essay_topics_created ON essay_topics(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_accounts_created ON user_accounts(created_at DESC, id DESC);
@@ -0,0 +1,54 @@
+-- 회차 번호를 고르고 세션을 넣는 일을 한 번의 호출(한 트랜잭션)로 처리한다.
+-- 에세이 행을 잠근 뒤 번호를 고르므로 같은 에세이에 동시에 요청이 와도 같은 번호가 두 번 나오지 않는다.
+
+-- 예전에 제약 없이 만든 테이블에도 (essay_id, session_number) 유일 제약을 건다
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'correction_sessions'::regclass
+          AND conname = 'correction_sessions_essay_id_session_number_key'
+    ) THEN
+        ALTER TABLE correction_sessions
+            ADD CONSTRAINT correction_sessions_essay_id_session_number_key UNIQUE (essay_id, session_number);
+    END IF;
+END $$;
+
+-- 비어 있는 가장 작은 회차 번호(1..p_max_sessions)로 세션을 넣고 그 번호를 돌려준다.
+-- 에세이가 없으면 P0002, 회차가 다 찼으면 P0001 에러를 낸다.
+CREATE OR REPLACE FUNCTION create_correction_session(
+    p_essay_id UUID,
+    p_corrections JSONB,
+    p_overall_feedback TEXT,
+    p_content_snapshot TEXT,
+    p_metadata JSONB DEFAULT '{}'::jsonb,
+    p_max_sessions INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_session_number INTEGER;
+BEGIN
+    PERFORM 1 FROM essays WHERE id = p_essay_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Essay not found' USING ERRCODE = 'P0002';
+    END IF;
+
+    SELECT n INTO v_session_number
+    FROM generate_series(1, p_max_sessions) AS n
+    WHERE NOT EXISTS (
+        SELECT 1 FROM correction_sessions s
+        WHERE s.essay_id = p_essay_id AND s.session_number = n
+    )
+    ORDER BY n
+    LIMIT 1;
+
+    IF v_session_number IS NULL THEN
+        RAISE EXCEPTION '최대 %회까지만 첨삭 가능합니다.', p_max_sessions USING ERRCODE = 'P0001';
+    END IF;
+
+    INSERT INTO correction_sessions (essay_id, session_number, corrections, overall_feedback, content_snapshot, metadata)
+    VALUES (p_essay_id, v_session_number, p_corrections, p_overall_feedback, p_content_snapshot, COALESCE(p_metadata, '{}'::jsonb));
+
+    RETURN v_session_number;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,58 @@
+-- 어드민 회원별 에세이 현황을 한 번의 호출로 돌려준다 (회원마다 에세이/세션 목록을 따로 읽지 않도록).
+-- 회원은 가입순 역순(created_at desc, id desc) keyset 페이지로 자르고, 페이지에 든 회원만 집계한다.
+-- p_topic_id를 주면 그 주제의 에세이만 센다 (에세이가 없는 회원도 0으로 포함한다).
+CREATE OR REPLACE FUNCTION admin_user_essay_stats(
+    p_topic_id TEXT DEFAULT NULL,
+    p_after_created_at TIMESTAMPTZ DEFAULT NULL,
+    p_after_id UUID DEFAULT NULL,
+    p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+    id UUID,
+    username TEXT,
+    name TEXT,
+    role TEXT,
+    created_at TIMESTAMPTZ,
+    essay_count INTEGER,
+    submitted_count INTEGER,
+    last_submitted_at TIMESTAMPTZ,
+    session_count INTEGER,
+    word_total BIGINT
+) AS $$
+    WITH page AS (
+        SELECT u.id, u.username::text, u.name::text, u.role::text, u.created_at
+        FROM user_accounts u
+        WHERE p_after_created_at IS NULL
+           OR (u.created_at, u.id) < (p_after_created_at, p_after_id)
+        ORDER BY u.created_at DESC, u.id DESC
+        LIMIT p_limit
+    )
+    SELECT
+        p.id,
+        p.username,
+        p.name,
+        p.role,
+        p.created_at,
+        COALESCE(s.essay_count, 0),
+        COALESCE(s.submitted_count, 0),
+        s.last_submitted_at,
+        COALESCE(s.session_count, 0),
+        COALESCE(s.word_total, 0)
+    FROM page p
+    LEFT JOIN LATERAL (
+        SELECT
+            count(*)::int AS essay_count,
+            count(*) FILTER (WHERE e.is_submitted)::int AS submitted_count,
+            -- 제출 시각 컬럼이 따로 없어 제출된 에세이의 마지막 수정 시각을 쓴다
+            max(e.updated_at) FILTER (WHERE e.is_submitted) AS last_submitted_at,
+            COALESCE(sum(cs.sessions), 0)::int AS session_count,
+            COALESCE(sum(e.word_count), 0)::bigint AS word_total
+        FROM essays e
+        LEFT JOIN LATERAL (
+            SELECT count(*) AS sessions FROM correction_sessions c WHERE c.essay_id = e.id
+        ) cs ON true
+        WHERE e.user_id = p.id
+          AND (p_topic_id IS NULL OR e.topic_id::text = p_topic_id)
+    ) s ON true
+    ORDER BY p.created_at DESC, p.id DESC;
+$$ LANGUAGE sql STABLE;
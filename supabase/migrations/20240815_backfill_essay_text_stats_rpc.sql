@@ -0,0 +1,36 @@
+-- 글 통계 백필이 essays.updated_at을 바꾸지 않게 한다.
+-- updated_at은 ETag와 어드민 회원별 현황(마지막 제출 시각)에 쓰이므로, 파생 컬럼만 채우는 백필로 바뀌면 안 된다.
+
+-- 트랜잭션 안에서 berryessay.keep_updated_at = 'on'이면 updated_at을 그대로 둔다 (백필 함수만 켠다)
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF current_setting('berryessay.keep_updated_at', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+    NEW.updated_at = timezone('utc'::text, now());
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- p_rows: [{"id", "plain_text", "char_count", "word_count", "sentence_count"}, ...] 를 한 번에 반영하고 바꾼 행 수를 돌려준다
+CREATE OR REPLACE FUNCTION backfill_essay_text_stats(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    PERFORM set_config('berryessay.keep_updated_at', 'on', true);
+
+    UPDATE essays e
+    SET plain_text = r.plain_text,
+        char_count = r.char_count,
+        word_count = r.word_count,
+        sentence_count = r.sentence_count
+    FROM jsonb_to_recordset(p_rows) AS r(id UUID, plain_text TEXT, char_count INTEGER, word_count INTEGER, sentence_count INTEGER)
+    WHERE e.id = r.id;
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+
+    PERFORM set_config('berryessay.keep_updated_at', 'off', true);
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql;